@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+"""Analyzes a lot of small bss splits sharing a context with many bss offset symbols.
+
+Run from the root of the repository with `python3 -m benchmarks.bss_splits`"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from spimdisasm import common
+from spimdisasm import mips
+
+
+def runBenchmark(splitsCount: int, symbolsPerSplit: int) -> float:
+    "Returns how many seconds it took to analyze every split"
+    splitSize = 0x10 * symbolsPerSplit
+    context = common.Context()
+    context.globalSegment.changeRanges(0, 0x1000000, 0x80000000, 0x81000000)
+
+    bssSymbols = context.offsetSymbols[common.FileSectionType.Bss]
+    for i in range(splitsCount):
+        for j in range(symbolsPerSplit):
+            offset = i * splitSize + j * 0x10
+            bssSymbols[offset] = common.ContextOffsetSymbol(offset, f"sym_{offset:X}", common.FileSectionType.Bss)
+
+    start = time.perf_counter()
+    for i in range(splitsCount):
+        vram = 0x80100000 + i * splitSize
+        section = mips.sections.SectionBss(context, i * splitSize, (i + 1) * splitSize, vram, vram + splitSize, f"bss_{i}", 0, None)
+        section.analyze()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--splits", help="Amount of bss splits. Defaults to 5000", type=int, default=5000)
+    parser.add_argument("--symbols", help="Amount of offset symbols on each split. Defaults to 4", type=int, default=4)
+    args = parser.parse_args()
+
+    common.GlobalConfig.QUIET = True
+    elapsed = runBenchmark(args.splits, args.symbols)
+    print(f"{args.splits} bss splits with {args.symbols} offset symbols each: {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
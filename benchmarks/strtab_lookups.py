@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+"""Looks up and iterates the strings of a big synthetic `.strtab`, like the ones of C++ objects with many mangled names.
+
+Run from the root of the repository with `python3 -m benchmarks.strtab_lookups`"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from spimdisasm import elf32
+
+
+def makeStringTable(stringsCount: int, seed: int) -> tuple[bytearray, list[int]]:
+    "Returns the contents of the table and the offset of each of its strings"
+    rng = random.Random(seed)
+    strtab = bytearray(b"\0")
+    offsets: list[int] = list()
+    for i in range(stringsCount):
+        offsets.append(len(strtab))
+        strtab += f"_ZN{rng.randint(1, 9)}namespace{i}{'x' * rng.randint(10, 60)}Ev".encode() + b"\0"
+    return strtab, offsets
+
+
+def runBenchmark(stringsCount: int, relocLookups: int, seed: int=1) -> tuple[int, float, float]:
+    """Returns the size of the table, and how many seconds the lookups and a full iteration took.
+
+    Every string is looked up once (like the symbols do), followed by `relocLookups` lookups which keep hitting a skewed set of strings (like the relocations do)"""
+    strtab, offsets = makeStringTable(stringsCount, seed)
+    rng = random.Random(seed)
+    lookups = offsets + [offsets[int(rng.paretovariate(1.2)) % len(offsets)] for _ in range(relocLookups)]
+
+    start = time.perf_counter()
+    table = elf32.Elf32StringTable(strtab, 0, len(strtab))
+    for offset in lookups:
+        table[offset]
+    lookupsTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in table:
+        pass
+    iterationTime = time.perf_counter() - start
+
+    return len(strtab), lookupsTime, iterationTime
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strings", help="Amount of strings of the table. Defaults to 90000 (about 5MB)", type=int, default=90000)
+    parser.add_argument("--lookups", help="Amount of skewed lookups done after looking up every string once. Defaults to 200000", type=int, default=200000)
+    args = parser.parse_args()
+
+    size, lookupsTime, iterationTime = runBenchmark(args.strings, args.lookups)
+    print(f"{size / 1e6:.1f}MB .strtab with {args.strings} strings")
+    print(f"{args.strings + args.lookups} lookups: {lookupsTime:.2f}s")
+    print(f"Iterating every string: {iterationTime:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
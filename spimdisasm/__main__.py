@@ -49,6 +49,9 @@ def exampleMain():
     textSection.analyze()
     textSection.setCommentOffset(start)
 
+    # Once every section has been analyzed, mark the labels found by the analysis as defined by the section which contains them
+    textSection.defineLabels()
+
     # Write the processed section to a file. This method handles '-' to stdout too
     textSection.saveToFile(args.output)
 
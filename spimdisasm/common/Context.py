@@ -7,10 +7,13 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
+from typing import Any, Generator, MutableMapping
 
 from . import Utils
+from .SortedDict import SortedDict
+from .SortedSet import SortedSet
 from .FileSectionType import FileSectionType
-from .ContextSymbols import SymbolSpecialType, ContextOffsetSymbol, ContextRelocSymbol
+from .ContextSymbols import SymbolSpecialType, ContextSymbol, ContextOffsetSymbol, ContextRelocSymbol
 from .SymbolsSegment import SymbolsSegment
 from .GlobalOffsetTable import GlobalOffsetTable
 
@@ -37,35 +40,121 @@ class Context:
         self.bannedSymbols: set[int] = set()
 
         # First key is the section type, sub key is offset relative to the start of that section
-        self.offsetSymbols: dict[FileSectionType, dict[int, ContextOffsetSymbol]] = {
-            FileSectionType.Text: dict(),
-            FileSectionType.Data: dict(),
-            FileSectionType.Rodata: dict(),
-            FileSectionType.Bss: dict(),
+        # Sorted by offset, so the symbols of a given range can be looked up with `getOffsetSymbolsRange`
+        self.offsetSymbols: dict[FileSectionType, SortedDict[ContextOffsetSymbol]] = {
+            FileSectionType.Text: SortedDict(),
+            FileSectionType.Data: SortedDict(),
+            FileSectionType.Rodata: SortedDict(),
+            FileSectionType.Bss: SortedDict(),
         }
 
-        self.relocSymbols: dict[FileSectionType, dict[int, ContextRelocSymbol]] = {
-            FileSectionType.Text: dict(),
-            FileSectionType.Data: dict(),
-            FileSectionType.Rodata: dict(),
-            FileSectionType.Bss: dict(),
+        self.relocSymbols: dict[FileSectionType, SortedDict[ContextRelocSymbol]] = {
+            FileSectionType.Text: SortedDict(),
+            FileSectionType.Data: SortedDict(),
+            FileSectionType.Rodata: SortedDict(),
+            FileSectionType.Bss: SortedDict(),
         }
 
         # Where the jump table is
         self.offsetJumpTables: dict[int, ContextOffsetSymbol] = dict()
         # The addresses every jump table has
-        self.offsetJumpTablesLabels: dict[int, ContextOffsetSymbol] = dict()
+        # Sorted by offset, so the labels of a given range can be looked up with `getOffsetGenericLabelsRange`
+        self.offsetJumpTablesLabels: SortedDict[ContextOffsetSymbol] = SortedDict()
 
         self.got: GlobalOffsetTable = GlobalOffsetTable()
 
+        self.symbolsGeneration: int = 0
+        """Changes every time a symbol is added or modified in a way which may change the result of a symbol lookup (a new symbol or a new size).
+
+        Lookups cached while this value stays the same are still valid, `getSymbolsChangesSince` tells which ones may have changed otherwise.
+        Increased by the segments of this context and by `symbolsChanged`"""
+        self._symbolsChanges: list[tuple[int, int|None]|None] = list()
+        """The addresses whose lookups may have changed by each increase of `symbolsGeneration`, as the address of the changed symbol and
+        the address of the next symbol (`None` if there's none). `None` if any lookup may have changed"""
+
+        self.changedAddresses: SortedSet|None = None
+        """Addresses whose symbol, reference counter or pointer found in data changed since the last `popChangedAddresses` call.
+
+        Only recorded after `trackChangedAddresses` is called"""
+        self._changedAnyAddress: bool = False
+
+        self.globalSegment.changeCallback = self._segmentSymbolsChanged
+        self.unknownSegment.changeCallback = self._segmentSymbolsChanged
+
 
     def addOverlaySegment(self, overlayCategory: str, segmentVromStart: int, segmentVromEnd: int, segmentVramStart: int, segmentVramEnd: int) -> SymbolsSegment:
         if overlayCategory not in self.overlaySegments:
             self.overlaySegments[overlayCategory] = dict()
         segment = SymbolsSegment(segmentVromStart, segmentVromEnd, segmentVramStart, segmentVramEnd, overlayCategory=overlayCategory)
         self.overlaySegments[overlayCategory][segmentVromStart] = segment
+        segment.changeCallback = self._segmentSymbolsChanged
+        self.symbolsChanged()
         return segment
 
+    def _addSymbolsChange(self, change: tuple[int, int|None]|None) -> None:
+        self._symbolsChanges.append(change)
+        self.symbolsGeneration += 1
+
+    def _segmentSymbolsChanged(self, address: int|None, nextAddress: int|None, affectsLookups: bool) -> None:
+        if affectsLookups:
+            self._addSymbolsChange(None if address is None else (address, nextAddress))
+        self.markAddressChanged(address)
+
+    def symbolsChanged(self, address: int|None=None) -> None:
+        """Must be called after changing the size or type of a symbol of this context without using the methods of its segments,
+        so cached symbol lookups are refreshed.
+
+        `address` is the address of the changed symbol, or `None` if any symbol may have changed"""
+        if address is None:
+            self._addSymbolsChange(None)
+        else:
+            # The lookups which can find the changed symbol end at the next symbol of its segment. The segment isn't known, so the furthest one is used
+            end: int|None = address + 1
+            segments = [self.globalSegment, self.unknownSegment] + [segment for segmentsPerVrom in self.overlaySegments.values() for segment in segmentsPerVrom.values()]
+            for segment in segments:
+                if address in segment.symbols:
+                    nextAddress = segment.getNextSymbolAddress(address)
+                    if nextAddress is None or end is None:
+                        end = None
+                    else:
+                        end = max(end, nextAddress)
+            self._addSymbolsChange((address, end))
+        self.markAddressChanged(address)
+
+    def getSymbolsChangesSince(self, generation: int) -> list[tuple[int, int|None]|None]:
+        """Returns the changes of the symbols done after `symbolsGeneration` had the value `generation`.
+
+        Each change is the range of the addresses whose lookups may have changed, as an inclusive start and an exclusive end (`None` if unbounded),
+        or `None` if any lookup may have changed"""
+        return self._symbolsChanges[generation:]
+
+    def trackChangedAddresses(self) -> None:
+        "Starts recording the addresses which change, see `changedAddresses`"
+        if self.changedAddresses is None:
+            self.changedAddresses = SortedSet()
+
+    def markAddressChanged(self, address: int|None) -> None:
+        """Records that the symbol, the reference counter or the pointer found in data at `address` changed.
+
+        `None` means anything may have changed. Does nothing unless `trackChangedAddresses` was called"""
+        if self.changedAddresses is None:
+            return
+        if address is None:
+            self._changedAnyAddress = True
+        else:
+            self.changedAddresses.add(address)
+
+    def popChangedAddresses(self) -> SortedSet|None:
+        """Returns the addresses changed since the last call and starts recording again.
+
+        Returns `None` if anything may have changed"""
+        changedAddresses = self.changedAddresses
+        self.changedAddresses = SortedSet()
+        if self._changedAnyAddress:
+            self._changedAnyAddress = False
+            return None
+        return changedAddresses
+
 
     def getOffsetSymbol(self, offset: int, sectionType: FileSectionType) -> ContextOffsetSymbol|None:
         if sectionType in self.offsetSymbols:
@@ -74,6 +163,11 @@ class Context:
                 return symbolsInSection[offset]
         return None
 
+    def getOffsetSymbolsRange(self, sectionType: FileSectionType, offsetStart: int, offsetEnd: int) -> Generator[tuple[int, ContextOffsetSymbol], None, None]:
+        "Iterates the offset symbols of the given section in the [`offsetStart`, `offsetEnd`) range, sorted by offset"
+        if sectionType in self.offsetSymbols:
+            yield from self.offsetSymbols[sectionType].getRange(offsetStart, offsetEnd)
+
     def getOffsetGenericSymbol(self, offset: int, sectionType: FileSectionType) -> ContextOffsetSymbol|None:
         if offset in self.offsetJumpTables:
             return self.offsetJumpTables[offset]
@@ -92,11 +186,20 @@ class Context:
                 return relocsInSection[offset]
         return None
 
+    def getRelocSymbolsRange(self, sectionType: FileSectionType, offsetStart: int, offsetEnd: int) -> Generator[tuple[int, ContextRelocSymbol], None, None]:
+        "Iterates the relocations of the given section in the [`offsetStart`, `offsetEnd`) range, sorted by offset"
+        if sectionType in self.relocSymbols:
+            yield from self.relocSymbols[sectionType].getRange(offsetStart, offsetEnd)
+
     def getOffsetGenericLabel(self, offset: int, sectionType: FileSectionType) -> ContextOffsetSymbol|None:
         if offset in self.offsetJumpTablesLabels:
             return self.offsetJumpTablesLabels[offset]
         return None
 
+    def getOffsetGenericLabelsRange(self, offsetStart: int, offsetEnd: int) -> Generator[tuple[int, ContextOffsetSymbol], None, None]:
+        "Iterates the jump table labels in the [`offsetStart`, `offsetEnd`) range, sorted by offset"
+        yield from self.offsetJumpTablesLabels.getRange(offsetStart, offsetEnd)
+
 
     def addOffsetJumpTable(self, offset: int, sectionType: FileSectionType) -> ContextOffsetSymbol:
         if offset not in self.offsetJumpTables:
@@ -119,6 +222,54 @@ class Context:
         self.bannedSymbols |= self.N64DefaultBanned
 
 
+    def merge(self, other: Context, base: Context|None=None) -> None:
+        """Merges `other` into this context, for example to join contexts produced by analyzing different files on separate processes.
+
+        Merging is deterministic and every conflict is solved by the rules described in `ContextSymbol.merge` and
+        `SymbolsSegment.merge`, where this context takes precedence.
+
+        `base` should be the state both contexts were created from, if any. Only the references counted by `other` since `base`
+        are added, so merging every context analyzed from the same starting state in file order produces the same result as a
+        sequential run where each context analyzed a different set of files.
+
+        The referencing functions of the merged symbols are remapped to the symbols of this context.
+
+        Overlay segments which only exist in `other` are created with the same ranges. The GOT of `other` is only used if
+        this context does not have one."""
+        mergedSymbols: dict[int, ContextSymbol] = dict()
+
+        self.globalSegment.merge(other.globalSegment, base.globalSegment if base is not None else None, mergedSymbols)
+        self.unknownSegment.merge(other.unknownSegment, base.unknownSegment if base is not None else None, mergedSymbols)
+
+        for overlayCategory, segmentsPerVrom in other.overlaySegments.items():
+            for segmentVrom, otherSegment in segmentsPerVrom.items():
+                segment = self.overlaySegments.get(overlayCategory, dict()).get(segmentVrom, None)
+                if segment is None:
+                    assert otherSegment.vromStart is not None and otherSegment.vromEnd is not None
+                    segment = self.addOverlaySegment(overlayCategory, otherSegment.vromStart, otherSegment.vromEnd, otherSegment.vramStart, otherSegment.vramEnd)
+                baseSegment = base.overlaySegments.get(overlayCategory, dict()).get(segmentVrom, None) if base is not None else None
+                segment.merge(otherSegment, baseSegment, mergedSymbols)
+
+        self.bannedSymbols |= other.bannedSymbols
+
+        for sectionType, otherSymbolsInSection in other.offsetSymbols.items():
+            baseSymbols = base.offsetSymbols.get(sectionType, None) if base is not None else None
+            _mergeSymbolsDict(self.offsetSymbols.setdefault(sectionType, SortedDict()), otherSymbolsInSection, baseSymbols, mergedSymbols)
+        for sectionType, otherRelocsInSection in other.relocSymbols.items():
+            baseRelocs = base.relocSymbols.get(sectionType, None) if base is not None else None
+            _mergeSymbolsDict(self.relocSymbols.setdefault(sectionType, SortedDict()), otherRelocsInSection, baseRelocs, mergedSymbols)
+
+        _mergeSymbolsDict(self.offsetJumpTables, other.offsetJumpTables, base.offsetJumpTables if base is not None else None, mergedSymbols)
+        _mergeSymbolsDict(self.offsetJumpTablesLabels, other.offsetJumpTablesLabels, base.offsetJumpTablesLabels if base is not None else None, mergedSymbols)
+
+        # The referencing functions copied from `other` are still the symbols of `other`
+        for contextSym in mergedSymbols.values():
+            contextSym.referenceFunctions = {mergedSymbols.get(id(func), func) for func in contextSym.referenceFunctions}
+
+        if self.got.tableStart is None:
+            self.got = other.got
+
+
     def saveContextToFile(self, contextPath: Path):
         with contextPath.open("w") as f:
             self.globalSegment.saveContextToFile(f)
@@ -176,3 +327,15 @@ class Context:
         if args.constants is not None:
             for constantsPath in args.constants:
                 self.globalSegment.readConstantsCsv(Path(constantsPath))
+
+
+def _mergeSymbolsDict(symbols: MutableMapping[int, Any], otherSymbols: MutableMapping[int, Any], baseSymbols: MutableMapping[int, Any]|None, mergedSymbols: dict[int, ContextSymbol]) -> None:
+    for key in sorted(otherSymbols.keys()):
+        otherSym = otherSymbols[key]
+        contextSym = symbols.get(key, None)
+        if contextSym is None:
+            contextSym = otherSym.copy()
+            symbols[key] = contextSym
+        else:
+            contextSym.merge(otherSym, baseSymbols.get(key, None) if baseSymbols is not None else None)
+        mergedSymbols[id(otherSym)] = contextSym
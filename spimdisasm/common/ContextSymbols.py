@@ -5,6 +5,7 @@
 
 from __future__ import annotations
 
+import copy
 import dataclasses
 import enum
 from typing import Callable
@@ -271,6 +272,58 @@ class ContextSymbol:
         return label
 
 
+    def merge(self, other: ContextSymbol, base: ContextSymbol|None=None) -> None:
+        """Merges the information of `other`, which should be a symbol at the same address, into this symbol.
+
+        `base` is the symbol at the same address on the state both symbols started from, if any.
+
+        Precedence rules:
+        - The name, size, vrom, section type, overlay category and name callback of this symbol are kept, unless those are unset.
+        - The type follows the same precedence `addFunction`, `addJumpTableLabel` and similar methods use, so a jump table label
+          wins over a function, which wins over a jump table or branch label, which wins over any other type.
+          On a tie this symbol's type is kept.
+        - Flags are or'ed, except for `isAutogenerated` which keeps the value of the symbol created first (this one).
+        - The references counted by `other` since `base` are added to the reference counter and the referencing functions are
+          joined. The referencing functions of `other` are kept as they are, remapping them to the functions of this context is
+          left to the caller.
+        """
+        if self.name is None:
+            self.name = other.name
+        if self.size is None:
+            self.size = other.size
+        if _getTypeMergePriority(other.type) > _getTypeMergePriority(self.type):
+            self.type = other.type
+
+        if self.vromAddress is None:
+            self.vromAddress = other.vromAddress
+        if self.sectionType == FileSectionType.Unknown:
+            self.sectionType = other.sectionType
+
+        self.isDefined = self.isDefined or other.isDefined
+        self.isUserDeclared = self.isUserDeclared or other.isUserDeclared
+        self.isMaybeString = self.isMaybeString or other.isMaybeString
+
+        self.referenceCounter += other.referenceCounter
+        if base is not None:
+            self.referenceCounter -= base.referenceCounter
+        self.referenceFunctions |= other.referenceFunctions
+
+        if self.overlayCategory is None:
+            self.overlayCategory = other.overlayCategory
+        if self.nameGetCallback is None:
+            self.nameGetCallback = other.nameGetCallback
+
+        self.unknownSegment = self.unknownSegment or other.unknownSegment
+        self.isGot = self.isGot or other.isGot
+        self.isGotGlobal = self.isGotGlobal or other.isGotGlobal
+
+    def copy(self) -> ContextSymbol:
+        "Returns a shallow copy of this symbol which does not share the set of referencing functions"
+        newSym = copy.copy(self)
+        newSym.referenceFunctions = set(self.referenceFunctions)
+        return newSym
+
+
     @staticmethod
     def getCsvHeader() -> str:
         output = "address,name,getName,getType,"
@@ -303,6 +356,20 @@ class ContextSymbol:
     def __hash__(self):
         return hash((self.address, self.vromAddress))
 
+
+_typeMergePriority: dict[SymbolSpecialType|str, int] = {
+    SymbolSpecialType.jumptablelabel: 4,
+    SymbolSpecialType.function: 3,
+    SymbolSpecialType.jumptable: 2,
+    SymbolSpecialType.branchlabel: 2,
+}
+
+def _getTypeMergePriority(symType: SymbolSpecialType|str|None) -> int:
+    if symType is None or symType == "":
+        return 0
+    return _typeMergePriority.get(symType, 1)
+
+
 class ContextOffsetSymbol(ContextSymbol):
     def __init__(self, offset: int, name: str, sectionType: FileSectionType, *args, **kwargs):
         super().__init__(offset, *args, **kwargs)
@@ -325,6 +392,8 @@ class ContextOffsetSymbol(ContextSymbol):
 class ContextRelocSymbol(ContextSymbol):
     relocSection: FileSectionType
     relocType: int = -1 # Same number as the .elf specification
+    addend: int|None = None
+    "Addend of the relocation, if it is known. The %hi and %lo relocations of a pair share the addend of the whole pair"
 
     def __init__(self, offset: int, name: str|None, relocSection: FileSectionType, *args, **kwargs):
         super().__init__(offset, *args, **kwargs)
@@ -343,5 +412,14 @@ class ContextRelocSymbol(ContextSymbol):
             return f"{self.getName()} - 0x{-offset:X}"
         return f"{self.getName()} + 0x{offset:X}"
 
+    def merge(self, other: ContextSymbol, base: ContextSymbol|None=None) -> None:
+        """Same as `ContextSymbol.merge`. The relocation type and addend of this symbol are kept, unless those are unknown"""
+        super().merge(other, base)
+        if isinstance(other, ContextRelocSymbol):
+            if self.relocType < 0:
+                self.relocType = other.relocType
+            if self.addend is None:
+                self.addend = other.addend
+
     def toCsv(self) -> str:
         return super().toCsv() + f",{self.relocSection.toStr()},{self.relocType}"
@@ -5,10 +5,11 @@
 
 from __future__ import annotations
 
-from typing import Generator
+from typing import Generator, Iterable, Sequence
 
 from .GlobalConfig import GlobalConfig
 from .ContextSymbols import ContextSymbol
+from .SortedSet import SortedSet
 from .SymbolsSegment import SymbolsSegment
 from .Context import Context
 from .FileSectionType import FileSectionType
@@ -55,6 +56,14 @@ class ElementBase:
 
         self._ownSegmentReference: SymbolsSegment|None = None
 
+        self.analysisDependencies: tuple|None = None
+        "Snapshot of the context taken by `saveAnalysisDependencies` after analyzing this element"
+        self.analysisDependencyRanges: list[tuple[int, int]] = list()
+        "Address ranges looked at by the snapshot taken by `saveAnalysisDependencies`"
+
+        self._consumedPointersInData: list[int] = list()
+        "Pointers found in data which were popped by the analysis of this element, so `resetAnalysis` can restore them"
+
 
     @property
     def sizew(self) -> int:
@@ -104,10 +113,60 @@ class ElementBase:
     def analyze(self):
         """Scans the words of this element, gathering as much info as possible.
 
-        This method should be called only once for each element.
+        This method should be called only once for each element, unless `resetAnalysis` is called first.
         """
         pass
 
+    def getAnalysisDependencies(self) -> tuple:
+        """Returns a snapshot of the parts of the context which can change the result of analyzing this element.
+
+        If the snapshot is different after analyzing other elements then this element should be analyzed again.
+        """
+        return ()
+
+    def getAnalysisDependencyRanges(self) -> list[tuple[int, int]]:
+        "The address ranges, with an exclusive end, of the symbols and pointers looked at by `getAnalysisDependencies`"
+        return []
+
+    def saveAnalysisDependencies(self) -> None:
+        "Should be called right after `analyze`, so `reanalyzeDependents` can know if the context changed since then"
+        self.analysisDependencies = self.getAnalysisDependencies()
+        self.analysisDependencyRanges = self.getAnalysisDependencyRanges()
+        self.context.trackChangedAddresses()
+
+    def resetAnalysis(self) -> None:
+        "Undoes the changes made by `analyze` to the context which would be wrong to do twice, like counting references or consuming pointers"
+        self.addPointersInDataReferences(self._consumedPointersInData)
+        self._consumedPointersInData = list()
+
+    def isAnyDependencyRangeChanged(self, changedAddresses: SortedSet) -> bool:
+        "Checks if any of `changedAddresses` is inside the address ranges recorded by `saveAnalysisDependencies`"
+        for low, high in self.analysisDependencyRanges:
+            for _ in changedAddresses.getRange(low, high):
+                return True
+        return False
+
+    def reanalyzeDependents(self, changedAddresses: SortedSet|None=None) -> bool:
+        """Analyzes this element again if the context changed since `saveAnalysisDependencies` was called in a way which
+        can change the result of its analysis.
+
+        If `changedAddresses` is passed then the snapshot is only taken again if any of those addresses is inside the ranges
+        recorded by `saveAnalysisDependencies`, see `Context.popChangedAddresses`.
+
+        Returns `True` if anything was analyzed again.
+        """
+        if self.analysisDependencies is None:
+            return False
+        if changedAddresses is not None and not self.isAnyDependencyRangeChanged(changedAddresses):
+            return False
+        if self.analysisDependencies == self.getAnalysisDependencies():
+            return False
+
+        self.resetAnalysis()
+        self.analyze()
+        self.saveAnalysisDependencies()
+        return True
+
 
     def disassemble(self) -> str:
         """Produces a disassembly of this element.
@@ -237,6 +296,55 @@ class ElementBase:
             return None
         return contextSym
 
+    def getSymbolsBatch(self, vramAddresses: Sequence[int], tryPlusOffset: bool = True, checkUpperLimit: bool = True, checkGlobalSegment: bool = True) -> list[ContextSymbol|None]:
+        """Batched version of `getSymbol`, returns the symbol found for each one of the passed `vramAddresses`.
+
+        Each segment resolves all the still unresolved addresses at once, following the same segment precedence as `getSymbol`.
+        """
+        result: list[ContextSymbol|None] = [None] * len(vramAddresses)
+        pending = list(range(len(vramAddresses)))
+
+        def searchSegment(segment: SymbolsSegment, indices: list[int]) -> None:
+            if len(indices) == 0:
+                return
+            found = segment.getSymbolsBatch([vramAddresses[i] for i in indices], tryPlusOffset=tryPlusOffset, checkUpperLimit=checkUpperLimit)
+            for i, contextSym in zip(indices, found):
+                if contextSym is not None:
+                    result[i] = contextSym
+
+        def stillPending() -> list[int]:
+            return [i for i in pending if result[i] is None]
+
+        if self.overlayCategory is None or checkGlobalSegment:
+            searchSegment(self.context.globalSegment, pending)
+            pending = stillPending()
+
+        if self.overlayCategory is not None:
+            segmentsPerVrom = self.context.overlaySegments.get(self.overlayCategory, None)
+            if segmentsPerVrom is not None:
+                overlaySegment = segmentsPerVrom.get(self.segmentVromStart, None)
+                if overlaySegment is not None:
+                    searchSegment(overlaySegment, pending)
+                    pending = stillPending()
+
+            for overlayCategory, segmentsPerVrom in self.context.overlaySegments.items():
+                if self.overlayCategory != overlayCategory:
+                    for overlaySegment in segmentsPerVrom.values():
+                        searchSegment(overlaySegment, [i for i in pending if overlaySegment.isVramInRange(vramAddresses[i])])
+                        pending = stillPending()
+
+        if not checkGlobalSegment or not GlobalConfig.ALLOW_UNKSEGMENT:
+            return result
+
+        searchSegment(self.context.unknownSegment, pending)
+        if self._ownSegmentReference is not None:
+            for i in pending:
+                contextSym = result[i]
+                if contextSym is not None and contextSym.vromAddress is not None:
+                    if not self._ownSegmentReference.isVromInRange(contextSym.getVrom()):
+                        result[i] = None
+        return result
+
     def getSymbolByVrom(self, vromAddress: int, tryPlusOffset: bool = True, checkUpperLimit: bool = True) -> ContextSymbol|None:
         segment = self.getSegmentForVrom(vromAddress)
         vram = segment.vromToVram(vromAddress)
@@ -248,6 +356,22 @@ class ElementBase:
         segment = self.getSegmentForVram(addressStart)
         return segment.getSymbolsRange(addressStart, addressEnd)
 
+    def getSymbolsVramsInRange(self, addressStart: int, addressEnd: int) -> set[int]:
+        """Returns the address of every symbol in the range [`addressStart`, `addressEnd`) of every segment `getSymbol` may look at.
+
+        `getSymbol` with `tryPlusOffset=False` can only find a symbol at those addresses, so this can be used to avoid looking up every address of a range.
+        """
+        vrams: set[int] = set()
+        for vram, _ in self.context.globalSegment.getSymbolsRange(addressStart, addressEnd):
+            vrams.add(vram)
+        for segmentsPerVrom in self.context.overlaySegments.values():
+            for overlaySegment in segmentsPerVrom.values():
+                for vram, _ in overlaySegment.getSymbolsRange(addressStart, addressEnd):
+                    vrams.add(vram)
+        for vram, _ in self.context.unknownSegment.getSymbolsRange(addressStart, addressEnd):
+            vrams.add(vram)
+        return vrams
+
 
     def getConstant(self, constantValue: int) -> ContextSymbol|None:
         segment = self.getSegment()
@@ -290,6 +414,21 @@ class ElementBase:
         return segment.addJumpTableLabel(vramAddress, isAutogenerated=isAutogenerated, vromAddress=symbolVrom)
 
 
+    def addJumpTableLabels(self, vramAddresses: list[int], isAutogenerated: bool=False) -> list[ContextSymbol]:
+        "Bulk version of `addJumpTableLabel`, returns the label of each one of the passed `vramAddresses`"
+        addressesPerSegment: dict[int, tuple[SymbolsSegment, list[int]]] = dict()
+        for vramAddress in vramAddresses:
+            segment = self.getSegmentForVram(vramAddress)
+            if id(segment) not in addressesPerSegment:
+                addressesPerSegment[id(segment)] = (segment, [])
+            addressesPerSegment[id(segment)][1].append(vramAddress)
+
+        labels: dict[int, ContextSymbol] = dict()
+        for segment, segmentAddresses in addressesPerSegment.values():
+            labels.update(segment.addJumpTableLabels(segmentAddresses, isAutogenerated=isAutogenerated))
+        return [labels[vramAddress] for vramAddress in vramAddresses]
+
+
     def addConstant(self, constantValue: int, name: str) -> ContextSymbol:
         segment = self.getSegment()
         return segment.addConstant(constantValue, name)
@@ -298,14 +437,39 @@ class ElementBase:
     def addPointerInDataReference(self, pointer: int) -> None:
         segment = self.getSegmentForVram(pointer)
         segment.addPointerInDataReference(pointer)
+        self.context.markAddressChanged(pointer)
+
+    def addPointersInDataReferences(self, pointers: Iterable[int]) -> None:
+        "Bulk version of `addPointerInDataReference`"
+        pointersPerSegment: dict[int, tuple[SymbolsSegment, list[int]]] = dict()
+        for pointer in pointers:
+            segment = self.getSegmentForVram(pointer)
+            if id(segment) not in pointersPerSegment:
+                pointersPerSegment[id(segment)] = (segment, [])
+            pointersPerSegment[id(segment)][1].append(pointer)
+            self.context.markAddressChanged(pointer)
+        for segment, segmentPointers in pointersPerSegment.values():
+            segment.addPointersInDataReferences(segmentPointers)
 
     def popPointerInDataReference(self, pointer: int) -> int|None:
         segment = self.getSegmentForVram(pointer)
-        return segment.popPointerInDataReference(pointer)
+        popped = segment.popPointerInDataReference(pointer)
+        if popped is not None:
+            self._consumedPointersInData.append(popped)
+            self.context.markAddressChanged(popped)
+        return popped
 
     def getAndPopPointerInDataReferencesRange(self, low: int, high: int) -> Generator[int, None, None]:
         segment = self.getSegmentForVram(low)
-        return segment.getAndPopPointerInDataReferencesRange(low, high)
+        poppedPointers = list(segment.getAndPopPointerInDataReferencesRange(low, high))
+        self._consumedPointersInData += poppedPointers
+        for pointer in poppedPointers:
+            self.context.markAddressChanged(pointer)
+        yield from poppedPointers
+
+    def getPointerInDataReferencesRange(self, low: int, high: int) -> Generator[int, None, None]:
+        segment = self.getSegmentForVram(low)
+        return segment.getPointerInDataReferencesRange(low, high)
 
 
     def getLoPatch(self, loInstrVram: int|None) -> int|None:
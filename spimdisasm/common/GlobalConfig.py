@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import argparse
 import enum
+from typing import Any
 
 from . import Utils
 
@@ -93,6 +94,10 @@ class GlobalConfig:
     ALLOW_ALL_ADDENDS_ON_DATA: bool = True
     """Enable using addends on symbols referenced by data"""
 
+    RELOC_DRIVEN_ANALYSIS: bool = False
+    """Use the relocations of the text section as the only source of the symbols referenced by the instructions they relocate,
+    skipping the symbol finder for them. Only relocations whose addend is known are used (see `ContextRelocSymbol.addend`)"""
+
 
     ASM_COMMENT: bool = True
     """Toggle the comments in generated assembly code"""
@@ -136,6 +141,10 @@ class GlobalConfig:
     """Ignores words that starts in 0xXX"""
     WRITE_BINARY: bool = False
     """write to files splitted binaries"""
+    WRITE_IF_CHANGED: bool = False
+    """Only write the output files whose contents changed, keeping the modification time of the rest"""
+    OUTPUT_MANIFEST: str|None = None
+    """Path of a manifest with the size and hash of every generated file. It is used by the next run to skip unchanged files without reading them"""
 
 
     @staticmethod
@@ -187,6 +196,9 @@ class GlobalConfig:
         miscConfig.add_argument("--use-dot-byte", help=f"Disassemble symbols marked as bytes with .byte instead of .word. Defaults to {GlobalConfig.USE_DOT_BYTE}", action=Utils.BooleanOptionalAction)
         miscConfig.add_argument("--use-dot-short", help=f"Disassemble symbols marked as shorts with .short instead of .word. Defaults to {GlobalConfig.USE_DOT_SHORT}", action=Utils.BooleanOptionalAction)
 
+        miscConfig.add_argument("--write-if-changed", help=f"Only write the output files whose contents changed, so their modification times are kept. Defaults to {GlobalConfig.WRITE_IF_CHANGED}", action=Utils.BooleanOptionalAction)
+        miscConfig.add_argument("--output-manifest", help="Path of a manifest with the size and hash of every generated file. When used with --write-if-changed, unchanged files listed on it are skipped without reading them")
+
 
         verbosityConfig = parser.add_argument_group("Verbosity options")
 
@@ -279,6 +291,11 @@ class GlobalConfig:
         if args.use_dot_short is not None:
             GlobalConfig.USE_DOT_SHORT = args.use_dot_short
 
+        if args.write_if_changed is not None:
+            GlobalConfig.WRITE_IF_CHANGED = args.write_if_changed
+        if args.output_manifest is not None:
+            GlobalConfig.OUTPUT_MANIFEST = args.output_manifest
+
 
         if args.verbose is not None:
             GlobalConfig.VERBOSE = args.verbose
@@ -292,3 +309,16 @@ class GlobalConfig:
             GlobalConfig.PRINT_SYMBOL_FINDER_DEBUG_INFO = args.debug_symbol_finder
         if args.debug_unpaired_luis is not None:
             GlobalConfig.PRINT_UNPAIRED_LUIS_DEBUG_INFO = args.debug_unpaired_luis
+
+
+    @staticmethod
+    def getSettings() -> dict[str, Any]:
+        """Returns a snapshot of every setting, which can be restored later with `setSettings`.
+
+        Useful to replicate the current configuration on worker processes."""
+        return {name: value for name, value in vars(GlobalConfig).items() if name.isupper()}
+
+    @staticmethod
+    def setSettings(settings: dict[str, Any]) -> None:
+        for name, value in settings.items():
+            setattr(GlobalConfig, name, value)
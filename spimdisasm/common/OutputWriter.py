@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import concurrent.futures
+import io
+import json
+from pathlib import Path
+import threading
+import warnings
+import zipfile
+
+from . import Utils
+from .GlobalConfig import GlobalConfig
+
+
+class OutputWriter:
+    """Writes files in the background with a pool of threads, so rendering the contents of the next files can overlap with the I/O of the previous ones.
+
+    The amount of pending writes is bounded by `maxPendingWrites`, `write` blocks until there's room for a new one.
+    Writes to the same path are done in the same order they were requested, so the output is the same regardless of the amount of threads.
+
+    The first error (in request order) raised by any write is raised again by `close`, or by `write` if it has already happened.
+
+    If `writeIfChanged` is enabled (defaults to `GlobalConfig.WRITE_IF_CHANGED`) then files which already have the requested contents are not written again.
+    If a `manifestPath` is passed (defaults to `GlobalConfig.OUTPUT_MANIFEST`) then the size and hash of every requested file is saved to it on `close`,
+    and the manifest of the previous run is used to detect unchanged files without reading them.
+
+    Should be used as a context manager:
+    ```
+    with OutputWriter() as writer:
+        writer.write(path, contents)
+    ```
+    """
+
+    def __init__(self, jobs: int|None=None, maxPendingWrites: int=256, writeIfChanged: bool|None=None, manifestPath: Path|None=None):
+        self.jobs = jobs
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="OutputWriter")
+        self.pendingWrites = threading.BoundedSemaphore(maxPendingWrites)
+
+        self._futures: list[concurrent.futures.Future[None]] = list()
+        self._firstUncheckedWrite: int = 0
+        "Index of the first write of `_futures` which is not known to have succeeded"
+        self._lastFuturePerPath: dict[Path, concurrent.futures.Future[None]] = dict()
+
+        self._createdDirectories: set[Path] = set()
+        self._directoriesLock = threading.Lock()
+
+        self.writeIfChanged: bool = writeIfChanged if writeIfChanged is not None else GlobalConfig.WRITE_IF_CHANGED
+        if manifestPath is None and GlobalConfig.OUTPUT_MANIFEST is not None:
+            manifestPath = Path(GlobalConfig.OUTPUT_MANIFEST)
+        self.manifestPath: Path|None = manifestPath
+
+        self._previousManifest: dict[str, tuple[int, str]] = dict()
+        "Size and hash of each file written by the previous run, keyed by path"
+        if self.manifestPath is not None and self.writeIfChanged and self.manifestPath.exists():
+            try:
+                for path, entry in Utils.readJson(self.manifestPath).items():
+                    self._previousManifest[path] = (entry["size"], entry["hash"])
+            except (ValueError, KeyError, TypeError, AttributeError):
+                Utils.eprint(f"Warning: ignoring malformed output manifest '{self.manifestPath}'")
+                self._previousManifest = dict()
+        self._manifest: dict[str, tuple[int, str]] = dict()
+        self._manifestLock = threading.Lock()
+
+        self.writtenFilesCount: int = 0
+        "How many of the requested writes actually wrote a file"
+
+        self._closed = False
+
+
+    def _ensureDirectory(self, directory: Path) -> None:
+        with self._directoriesLock:
+            if directory in self._createdDirectories:
+                return
+            directory.mkdir(parents=True, exist_ok=True)
+            self._createdDirectories.add(directory)
+
+    def _writeFile(self, path: Path, contents: str|bytes, previousWrite: concurrent.futures.Future[None]|None) -> None:
+        try:
+            if previousWrite is not None:
+                # Keep the order of the writes to the same file. The previous write was submitted first, so it is already running or done
+                concurrent.futures.wait([previousWrite])
+
+            self._ensureDirectory(path.parent)
+            if self.writeIfChanged or self.manifestPath is not None:
+                if self.writeIfChanged:
+                    written, size, contentsHash = Utils.writeFileIfChanged(path, contents, self._previousManifest.get(str(path), None))
+                else:
+                    written = True
+                    Utils.writeFile(path, contents)
+                    size = path.stat().st_size
+                    contentsHash = Utils.getStrHash(contents.encode() if isinstance(contents, str) else contents)
+                with self._manifestLock:
+                    self._manifest[str(path)] = (size, contentsHash)
+                    if written:
+                        self.writtenFilesCount += 1
+            else:
+                Utils.writeFile(path, contents)
+                with self._manifestLock:
+                    self.writtenFilesCount += 1
+        finally:
+            self.pendingWrites.release()
+
+    def _raiseFirstError(self, wait: bool) -> None:
+        while self._firstUncheckedWrite < len(self._futures):
+            future = self._futures[self._firstUncheckedWrite]
+            if not wait and not future.done():
+                # Errors of later writes may not be the first ones in request order
+                return
+            error = future.exception()
+            if error is not None:
+                raise error
+            self._firstUncheckedWrite += 1
+
+
+    def write(self, path: Path, contents: str|bytes) -> None:
+        "Requests writing `contents` to `path`, creating its parent directories if needed. Text is written if `contents` is a `str`, raw bytes otherwise"
+        assert not self._closed
+        self._raiseFirstError(wait=False)
+
+        self.pendingWrites.acquire()
+        previousWrite = self._lastFuturePerPath.get(path, None)
+        future = self.executor.submit(self._writeFile, path, contents, previousWrite)
+        self._lastFuturePerPath[path] = future
+        self._futures.append(future)
+
+    @staticmethod
+    def writeOutputFile(writer: OutputWriter|None, path: Path, contents: str|bytes) -> None:
+        "Writes `contents` to `path` with `writer` if one is passed, or right away otherwise. `GlobalConfig.WRITE_IF_CHANGED` is honored in both cases"
+        if writer is not None:
+            writer.write(path, contents)
+        elif GlobalConfig.WRITE_IF_CHANGED:
+            Utils.writeFileIfChanged(path, contents)
+        else:
+            Utils.writeFile(path, contents)
+
+    def addManifestEntries(self, other: OutputWriter) -> None:
+        "Adds the manifest entries of the files written by `other` to the manifest of this writer, so both writers can share the same manifest file"
+        with self._manifestLock, other._manifestLock:
+            self._manifest.update(other._manifest)
+
+    def makeDirectory(self, directory: Path) -> None:
+        "Same as `Path.mkdir(parents=True, exist_ok=True)`, but only done once per directory"
+        self._ensureDirectory(directory)
+
+    def flush(self) -> None:
+        """Waits for every pending write and raises the first error of them, if any.
+
+        The writer threads are stopped until the next write, so processes can be safely forked afterwards"""
+        assert not self._closed
+        self.executor.shutdown(wait=True)
+        # The threads of the new executor are only started by the next write
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="OutputWriter")
+        self._raiseFirstError(wait=True)
+
+    def close(self) -> None:
+        "Waits for every pending write and raises the first error of them, if any"
+        if self._closed:
+            return
+        self._closed = True
+        self.executor.shutdown(wait=True)
+        self._raiseFirstError(wait=True)
+
+        if self.manifestPath is not None:
+            manifest = {path: {"size": size, "hash": contentsHash} for path, (size, contentsHash) in sorted(self._manifest.items())}
+            self.manifestPath.parent.mkdir(parents=True, exist_ok=True)
+            with self.manifestPath.open("w") as f:
+                json.dump(manifest, f, indent=4)
+
+
+    def __enter__(self) -> OutputWriter:
+        return self
+
+    def __exit__(self, excType, excValue, traceback) -> None:
+        if excType is not None:
+            # Don't hide the original error, but still wait for the writes
+            self._closed = True
+            self.executor.shutdown(wait=True)
+            return
+        self.close()
+
+
+class PackedOutputWriter(OutputWriter):
+    """Writes every requested file into a single uncompressed zip container instead of the filesystem.
+
+    Paths are stored relative to `rootPath`, requesting a path outside of it raises a `ValueError`.
+    Writing the same path more than once keeps the last contents when reading the container back.
+
+    The container is only written on `close`, as a single file of the base `OutputWriter`, so `writeIfChanged` and `manifestPath` are honored for it.
+
+    Use `listPackedFiles`, `readPackedFile` and `extractPacked` to read the container.
+    """
+
+    def __init__(self, containerPath: Path, rootPath: Path, writeIfChanged: bool|None=None, manifestPath: Path|None=None):
+        super().__init__(jobs=1, writeIfChanged=writeIfChanged, manifestPath=manifestPath)
+
+        self.containerPath = containerPath
+        self.rootPath = rootPath
+
+        self._buffer = io.BytesIO()
+        self._zipFile = zipfile.ZipFile(self._buffer, "w", compression=zipfile.ZIP_STORED)
+
+        self.packedFilesCount: int = 0
+        "How many writes were packed into the container"
+
+
+    def _getPackedName(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.rootPath).as_posix()
+        except ValueError:
+            raise ValueError(f"Can't pack '{path}', since it is not inside the root path '{self.rootPath}'") from None
+
+    def write(self, path: Path, contents: str|bytes) -> None:
+        assert not self._closed
+        if isinstance(contents, str):
+            contents = contents.encode()
+
+        # Fixed timestamp, so packing the same files always produces the same container
+        info = zipfile.ZipInfo(self._getPackedName(path), date_time=(1980, 1, 1, 0, 0, 0))
+        with warnings.catch_warnings():
+            # Writing the same path twice is allowed
+            warnings.simplefilter("ignore", UserWarning)
+            self._zipFile.writestr(info, contents)
+        self.packedFilesCount += 1
+
+    def makeDirectory(self, directory: Path) -> None:
+        # Directories are implied by the paths of the packed files
+        pass
+
+    def flush(self) -> None:
+        # Nothing is written in the background until the container is closed
+        pass
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._zipFile.close()
+
+        super().write(self.containerPath, self._buffer.getvalue())
+        super().close()
+
+    def __enter__(self) -> PackedOutputWriter:
+        return self
+
+    def __exit__(self, excType, excValue, traceback) -> None:
+        if excType is not None:
+            # Don't write an incomplete container
+            self._zipFile.close()
+        super().__exit__(excType, excValue, traceback)
+
+
+    @staticmethod
+    def listPackedFiles(containerPath: Path) -> list[str]:
+        "Returns the paths of the files of the container, in the order they were written. Paths written more than once are only listed once"
+        with zipfile.ZipFile(containerPath, "r") as zipFile:
+            return list(dict.fromkeys(zipFile.namelist()))
+
+    @staticmethod
+    def readPackedFile(containerPath: Path, packedPath: str) -> str:
+        "Returns the contents of the file `packedPath` of the container"
+        with zipfile.ZipFile(containerPath, "r") as zipFile:
+            return zipFile.read(packedPath).decode()
+
+    @staticmethod
+    def extractPacked(containerPath: Path, outputPath: Path) -> None:
+        """Extracts every file of the container into `outputPath`.
+
+        Raises a `ValueError` before extracting anything if any packed path would be placed outside of `outputPath`"""
+        outputRoot = outputPath.resolve()
+        with zipfile.ZipFile(containerPath, "r") as zipFile:
+            packedPaths = PackedOutputWriter.listPackedFiles(containerPath)
+            filePaths: list[Path] = list()
+            for packedPath in packedPaths:
+                filePath = (outputRoot / packedPath).resolve()
+                try:
+                    filePath.relative_to(outputRoot)
+                except ValueError:
+                    raise ValueError(f"Refusing to extract '{packedPath}' from '{containerPath}', since it would be placed outside of '{outputPath}'") from None
+                filePaths.append(filePath)
+
+            for packedPath, filePath in zip(packedPaths, filePaths):
+                filePath.parent.mkdir(parents=True, exist_ok=True)
+                filePath.write_bytes(zipFile.read(packedPath))
@@ -7,7 +7,12 @@ from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
 import bisect
-from typing import Any, Generator, TypeVar
+from typing import Any, Generator, Iterable, Sequence, TypeVar
+
+try:
+    import numpy # type: ignore
+except ImportError:
+    numpy = None
 
 # typing.Mapping and typing.MutableMapping are deprecated since Python 3.9.
 # Using collections.abc is encouraged instead, but 3.7 and 3.8 will to run this file
@@ -22,12 +27,18 @@ except:
 
 ValueType = TypeVar("ValueType")
 
+_NUMPY_BATCH_MIN_KEYS = 256
+"Minimum amount of keys passed to `SortedDict.getKeysRightIndices` to use NumPy instead of bisecting each key"
+
 
 class SortedDict(MutableMapping[int, ValueType]):
     def __init__(self, other: Mapping[int, ValueType]|None=None):
         self.map: dict[int, ValueType] = dict()
         self.sortedKeys: list[int] = list()
 
+        self._sortedKeysArray: Any = None
+        "NumPy copy of `sortedKeys`, created on demand by `getKeysRightIndices` and discarded when the keys change"
+
         if other is not None:
             for key, value in other.items():
                 self.add(key, value)
@@ -37,11 +48,25 @@ class SortedDict(MutableMapping[int, ValueType]):
         if key not in self.map:
             # Avoid adding the key twice if it is already on the map
             bisect.insort(self.sortedKeys, key)
+            self._sortedKeysArray = None
         self.map[key] = value
 
+    def addMany(self, pairs: Iterable[tuple[int, ValueType]]) -> None:
+        "Bulk version of `add`. The keys are sorted once after adding all of them instead of doing a sorted insertion per key"
+        addedKeys = False
+        for key, value in pairs:
+            if key not in self.map:
+                self.sortedKeys.append(key)
+                addedKeys = True
+            self.map[key] = value
+        if addedKeys:
+            self.sortedKeys.sort()
+            self._sortedKeysArray = None
+
     def remove(self, key: int) -> None:
         del self.map[key]
         self.sortedKeys.remove(key)
+        self._sortedKeysArray = None
 
 
     def getKeyRight(self, key: int, inclusive: bool=True) -> tuple[int, ValueType]|None:
@@ -58,6 +83,30 @@ class SortedDict(MutableMapping[int, ValueType]):
         currentKey = self.sortedKeys[index - 1]
         return currentKey, self.map[currentKey]
 
+    def getKeysRightIndices(self, keys: Sequence[int], inclusive: bool=True) -> list[int]:
+        """Batched version of `getKeyRight`. Returns a list with the same length as `keys`, where each element is the index in `sortedKeys` of
+        the greatest key which is less or equal to the corresponding element of `keys`, or -1 if there's no such key.
+
+        If `inclusive` is `False`, then the found keys will be strictly less than the passed ones.
+
+        The passed keys are sorted and merged against `sortedKeys`, so each search only looks at the keys after the previous result.
+        If NumPy is available then big batches are searched with `numpy.searchsorted` instead.
+        """
+        if numpy is not None and len(keys) >= _NUMPY_BATCH_MIN_KEYS:
+            if self._sortedKeysArray is None:
+                self._sortedKeysArray = numpy.array(self.sortedKeys, dtype=numpy.int64)
+            side = "right" if inclusive else "left"
+            indices = numpy.searchsorted(self._sortedKeysArray, numpy.array(keys, dtype=numpy.int64), side=side) - 1
+            return indices.tolist()
+
+        search = bisect.bisect_right if inclusive else bisect.bisect_left
+        result = [-1] * len(keys)
+        index = 0
+        for i in sorted(range(len(keys)), key=keys.__getitem__):
+            index = search(self.sortedKeys, keys[i], index)
+            result[i] = index - 1
+        return result
+
     def getKeyLeft(self, key: int, inclusive: bool=True) -> tuple[int, ValueType]|None:
         """Returns the pair with the smallest key which is gretest or equal to the `key` parameter, or None if there's no greater pair than the passed `key`.
 
@@ -111,6 +160,9 @@ class SortedDict(MutableMapping[int, ValueType]):
             self.remove(key)
             yield (key, value)
 
+    def get(self, key: int, default: Any=None) -> Any:
+        return self.map.get(key, default)
+
     def __getitem__(self, key: int) -> ValueType:
         return self.map[key]
 
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import bisect
+from typing import Generator, Iterable
+
+# typing.MutableSet is deprecated since Python 3.9.
+# Using collections.abc is encouraged instead, but 3.7 and 3.8 will to run this file
+# with a "'ABCMeta' object is not subscriptable" exception, so this is a hacky way to
+# try to be future proof and not have problems because those types will be removed
+# in the future
+try:
+    from collections.abc import MutableSet
+    MutableSet[int]
+except:
+    from typing import MutableSet
+
+
+class SortedSet(MutableSet[int]):
+    """Set of integers which can be iterated and queried by ranges in ascending order.
+
+    New keys are appended and only sorted when an ordered operation needs them, so adding keys in bulk doesn't pay a sorted insertion per key.
+    Removing a single key doesn't touch the sorted list either, it is skipped by later queries until there are enough removed keys to compact it.
+    """
+
+    def __init__(self, other: Iterable[int]|None=None):
+        self.members: set[int] = set()
+        "The keys currently in the set"
+        self.sortedKeys: list[int] = list()
+        "Sorted keys. May contain keys which were removed from `members`"
+
+        self._unsortedKeys: list[int] = list()
+        "Keys added since the last time `sortedKeys` was sorted"
+        self._removedKeys: set[int] = set()
+        "Keys which are still in `sortedKeys` or `_unsortedKeys` but not in `members`"
+
+        if other is not None:
+            self.update(other)
+
+
+    def add(self, key: int) -> None:
+        if key in self.members:
+            return
+        self.members.add(key)
+        if key in self._removedKeys:
+            # Still present on the lists
+            self._removedKeys.remove(key)
+        else:
+            self._unsortedKeys.append(key)
+
+    def update(self, keys: Iterable[int]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def discard(self, key: int) -> None:
+        if key not in self.members:
+            return
+        self.members.remove(key)
+        self._removedKeys.add(key)
+        if len(self._removedKeys) > len(self.members):
+            self._compact()
+
+    def popKey(self, key: int, default: int|None=None) -> int|None:
+        "Removes `key` from the set and returns it, or returns `default` if it isn't on the set"
+        if key not in self.members:
+            return default
+        self.discard(key)
+        return key
+
+
+    def _compact(self) -> None:
+        self.sortedKeys = [key for key in self.sortedKeys if key in self.members]
+        self._unsortedKeys = [key for key in self._unsortedKeys if key in self.members]
+        self._removedKeys.clear()
+
+    def _sort(self) -> None:
+        if len(self._unsortedKeys) > 0:
+            # The list is made of two sorted runs after sorting the new keys, which `sort` merges in linear time
+            self._unsortedKeys.sort()
+            self.sortedKeys += self._unsortedKeys
+            self.sortedKeys.sort()
+            self._unsortedKeys = list()
+
+    def _getRangeIndices(self, startKey: int, endKey: int, startInclusive: bool, endInclusive: bool) -> tuple[int, int]:
+        self._sort()
+
+        if startInclusive:
+            keyIndexStart = bisect.bisect_left(self.sortedKeys, startKey)
+        else:
+            keyIndexStart = bisect.bisect_right(self.sortedKeys, startKey)
+
+        if endInclusive:
+            keyIndexEnd = bisect.bisect_right(self.sortedKeys, endKey)
+        else:
+            keyIndexEnd = bisect.bisect_left(self.sortedKeys, endKey)
+
+        return keyIndexStart, keyIndexEnd
+
+
+    def getRange(self, startKey: int, endKey: int, startInclusive: bool=True, endInclusive: bool=False) -> Generator[int, None, None]:
+        """Generator which iterates in the range [`startKey`, `endKey`] in ascending order.
+
+        By default the `startKey` is inclusive but the `endKey` isn't, this can be changed with the `startInclusive` and `endInclusive` parameters"""
+        keyIndexStart, keyIndexEnd = self._getRangeIndices(startKey, endKey, startInclusive, endInclusive)
+        for key in self.sortedKeys[keyIndexStart:keyIndexEnd]:
+            if key in self.members:
+                yield key
+
+    def getRangeAndPop(self, startKey: int, endKey: int, startInclusive: bool=True, endInclusive: bool=False) -> Generator[int, None, None]:
+        """Similar to `getRange`, but every key is removed from the set.
+
+        The whole range is removed at once when the iteration starts.
+
+        Please note this generator iterates in reverse/descending order"""
+        keyIndexStart, keyIndexEnd = self._getRangeIndices(startKey, endKey, startInclusive, endInclusive)
+        keysInRange = self.sortedKeys[keyIndexStart:keyIndexEnd]
+        del self.sortedKeys[keyIndexStart:keyIndexEnd]
+
+        poppedKeys: list[int] = list()
+        for key in keysInRange:
+            if key in self.members:
+                self.members.remove(key)
+                poppedKeys.append(key)
+            else:
+                self._removedKeys.remove(key)
+
+        for key in reversed(poppedKeys):
+            yield key
+
+
+    def __iter__(self) -> Generator[int, None, None]:
+        "Iteration is sorted"
+        self._sort()
+        for key in self.sortedKeys:
+            if key in self.members:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def __contains__(self, key: object) -> bool:
+        return self.members.__contains__(key)
+
+
+    def __str__(self) -> str:
+        return "SortedSet({" + ", ".join(repr(key) for key in self) + "})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -6,11 +6,12 @@
 from __future__ import annotations
 
 import ast
-from typing import TextIO, Generator
+from typing import Callable, TextIO, Generator, Iterable, Sequence
 from pathlib import Path
 
 from . import Utils
 from .SortedDict import SortedDict
+from .SortedSet import SortedSet
 from .GlobalConfig import GlobalConfig
 from .FileSectionType import FileSectionType
 from .ContextSymbols import SymbolSpecialType, ContextSymbol
@@ -34,7 +35,7 @@ class SymbolsSegment:
 
         self.constants: dict[int, ContextSymbol] = dict()
 
-        self.newPointersInData: SortedDict[int] = SortedDict()
+        self.newPointersInData: SortedSet = SortedSet()
         "Stuff that looks like pointers, found referenced by data"
 
         self.loPatches: dict[int, int] = dict()
@@ -46,6 +47,14 @@ class SymbolsSegment:
         self.dataReferencingConstants: set[int] = set()
         "Set of addresses of data symbols which are allowed to reference named constants"
 
+        self.changeCallback: Callable[[int|None, int|None, bool], None]|None = None
+        """Called every time a symbol is added to this segment, or when the size, type or vrom of one of its symbols is changed by this segment.
+
+        The parameters are the address of the symbol (or `None` if any symbol of the segment may have changed),
+        the address of the next symbol of this segment (or `None` if there's none), since lookups past it can't find the changed symbol,
+        and whether the change may affect the result of the symbol lookups (a new symbol or a new size) instead of only describing the symbol.
+        Set by the `Context` which owns this segment, see `Context.symbolsChanged`"""
+
 
     @property
     def vromSize(self) -> int|None:
@@ -80,6 +89,8 @@ class SymbolsSegment:
         self.vramStart = vramStart
         self.vramEnd = vramEnd
 
+        self._symbolsChanged(None)
+
 
     def vromToVram(self, vrom: int) -> int|None:
         if self.vromStart is None:
@@ -87,20 +98,39 @@ class SymbolsSegment:
         return vrom - self.vromStart + self.vramStart
 
 
+    def _symbolsChanged(self, address: int|None, affectsLookups: bool=True) -> None:
+        if self.changeCallback is not None:
+            nextAddress = None
+            if address is not None and affectsLookups:
+                nextAddress = self.getNextSymbolAddress(address)
+            self.changeCallback(address, nextAddress, affectsLookups)
+
+    def _setSymbolType(self, contextSym: ContextSymbol, symType: SymbolSpecialType) -> None:
+        if contextSym.type != symType:
+            contextSym.type = symType
+            # Special types don't change the size of the symbol
+            self._symbolsChanged(contextSym.address, affectsLookups=False)
+
+    def _newSymbol(self, address: int, sectionType: FileSectionType, isAutogenerated: bool) -> ContextSymbol:
+        contextSym = ContextSymbol(address)
+        contextSym.isAutogenerated = isAutogenerated
+        contextSym.sectionType = sectionType
+        contextSym.overlayCategory = self.overlayCategory
+        return contextSym
+
     def addSymbol(self, address: int, sectionType: FileSectionType=FileSectionType.Unknown, isAutogenerated: bool=False, vromAddress: int|None=None) -> ContextSymbol:
         contextSym = self.symbols.get(address, None)
         if contextSym is None:
-            contextSym = ContextSymbol(address)
-            contextSym.isAutogenerated = isAutogenerated
-            contextSym.sectionType = sectionType
-            contextSym.overlayCategory = self.overlayCategory
+            contextSym = self._newSymbol(address, sectionType, isAutogenerated)
             self.symbols[address] = contextSym
+            self._symbolsChanged(address)
 
         if contextSym.sectionType == FileSectionType.Unknown:
             contextSym.sectionType = sectionType
 
         if contextSym.vromAddress is None and vromAddress is not None:
             contextSym.vromAddress = vromAddress
+            self._symbolsChanged(address, affectsLookups=False)
 
         if self.vromStart is None or self.vromEnd is None:
             contextSym.unknownSegment = True
@@ -110,28 +140,52 @@ class SymbolsSegment:
     def addFunction(self, address: int, isAutogenerated: bool=False, vromAddress: int|None=None) -> ContextSymbol:
         contextSym = self.addSymbol(address, sectionType=FileSectionType.Text, isAutogenerated=isAutogenerated, vromAddress=vromAddress)
         if contextSym.type != SymbolSpecialType.jumptablelabel:
-            contextSym.type = SymbolSpecialType.function
+            self._setSymbolType(contextSym, SymbolSpecialType.function)
         contextSym.sectionType = FileSectionType.Text
         return contextSym
 
     def addBranchLabel(self, address: int, isAutogenerated: bool=False, vromAddress: int|None=None) -> ContextSymbol:
         contextSym = self.addSymbol(address, sectionType=FileSectionType.Text, isAutogenerated=isAutogenerated, vromAddress=vromAddress)
         if contextSym.type != SymbolSpecialType.jumptablelabel and contextSym.type != SymbolSpecialType.function:
-            contextSym.type = SymbolSpecialType.branchlabel
+            self._setSymbolType(contextSym, SymbolSpecialType.branchlabel)
         return contextSym
 
     def addJumpTable(self, address: int, isAutogenerated: bool=False, vromAddress: int|None=None) -> ContextSymbol:
         contextSym = self.addSymbol(address, sectionType=FileSectionType.Rodata, isAutogenerated=isAutogenerated, vromAddress=vromAddress)
         if contextSym.type != SymbolSpecialType.function:
-            contextSym.type = SymbolSpecialType.jumptable
+            self._setSymbolType(contextSym, SymbolSpecialType.jumptable)
         return contextSym
 
     def addJumpTableLabel(self, address: int, isAutogenerated: bool=False, vromAddress: int|None=None) -> ContextSymbol:
         contextSym = self.addSymbol(address, sectionType=FileSectionType.Text, isAutogenerated=isAutogenerated, vromAddress=vromAddress)
-        contextSym.type = SymbolSpecialType.jumptablelabel
+        self._setSymbolType(contextSym, SymbolSpecialType.jumptablelabel)
         contextSym.sectionType = FileSectionType.Text
         return contextSym
 
+    def addJumpTableLabels(self, addresses: Iterable[int], isAutogenerated: bool=False) -> dict[int, ContextSymbol]:
+        """Bulk version of `addJumpTableLabel`. Returns the label of each address.
+
+        The new labels are inserted all at once."""
+        labels: dict[int, ContextSymbol] = dict()
+        newSymbols: list[tuple[int, ContextSymbol]] = list()
+        for address in addresses:
+            if address in labels:
+                continue
+            contextSym = self.symbols.get(address, None)
+            if contextSym is None:
+                contextSym = self._newSymbol(address, FileSectionType.Text, isAutogenerated)
+                newSymbols.append((address, contextSym))
+
+            if self.vromStart is None or self.vromEnd is None:
+                contextSym.unknownSegment = True
+            self._setSymbolType(contextSym, SymbolSpecialType.jumptablelabel)
+            contextSym.sectionType = FileSectionType.Text
+            labels[address] = contextSym
+
+        # Setting the type of the new labels already reported them as changed
+        self.symbols.addMany(newSymbols)
+        return labels
+
 
     def addConstant(self, constantValue: int, name: str) -> ContextSymbol:
         if constantValue not in self.constants:
@@ -157,6 +211,33 @@ class SymbolsSegment:
 
         return self.symbols.get(address, None)
 
+    def getNextSymbolAddress(self, address: int) -> int|None:
+        "Returns the address of the first symbol after `address`, or `None` if there's none"
+        pair = self.symbols.getKeyLeft(address, inclusive=False)
+        if pair is None:
+            return None
+        return pair[0]
+
+    def getSymbolsBatch(self, addresses: Sequence[int], tryPlusOffset: bool = True, checkUpperLimit: bool = True) -> list[ContextSymbol|None]:
+        """Batched version of `getSymbol`, returns the symbol found for each one of the passed `addresses`.
+
+        All the addresses are resolved with a single merge against the sorted symbols of this segment"""
+        sortedKeys = self.symbols.sortedKeys
+        result: list[ContextSymbol|None] = [None] * len(addresses)
+        for i, index in enumerate(self.symbols.getKeysRightIndices(addresses, inclusive=True)):
+            if index < 0:
+                continue
+            symVram = sortedKeys[index]
+            address = addresses[i]
+            if GlobalConfig.PRODUCE_SYMBOLS_PLUS_OFFSET and tryPlusOffset:
+                contextSym = self.symbols[symVram]
+                if checkUpperLimit and address >= symVram + contextSym.getSize():
+                    continue
+                result[i] = contextSym
+            elif symVram == address:
+                result[i] = self.symbols[symVram]
+        return result
+
     def getSymbolsRange(self, addressStart: int, addressEnd: int) -> Generator[tuple[int, ContextSymbol], None, None]:
         return self.symbols.getRange(addressStart, addressEnd, startInclusive=True, endInclusive=False)
 
@@ -165,13 +246,20 @@ class SymbolsSegment:
 
 
     def addPointerInDataReference(self, pointer: int) -> None:
-        self.newPointersInData[pointer] = pointer
+        self.newPointersInData.add(pointer)
+
+    def addPointersInDataReferences(self, pointers: Iterable[int]) -> None:
+        self.newPointersInData.update(pointers)
 
     def popPointerInDataReference(self, pointer: int) -> int|None:
-        return self.newPointersInData.pop(pointer, None)
+        return self.newPointersInData.popKey(pointer, None)
 
     def getAndPopPointerInDataReferencesRange(self, low: int, high: int) -> Generator[int, None, None]:
-        for key, _ in self.newPointersInData.getRangeAndPop(low, high, startInclusive=True, endInclusive=False):
+        for key in self.newPointersInData.getRangeAndPop(low, high, startInclusive=True, endInclusive=False):
+            yield key
+
+    def getPointerInDataReferencesRange(self, low: int, high: int) -> Generator[int, None, None]:
+        for key in self.newPointersInData.getRange(low, high, startInclusive=True, endInclusive=False):
             yield key
 
 
@@ -181,6 +269,51 @@ class SymbolsSegment:
         return self.loPatches.get(loInstrVram, None)
 
 
+    def merge(self, other: SymbolsSegment, base: SymbolsSegment|None=None, mergedSymbols: dict[int, ContextSymbol]|None=None) -> None:
+        """Merges the symbols and the rest of the information of `other` into this segment. The ranges of this segment are kept.
+
+        Symbols present on both segments are merged with `ContextSymbol.merge`, while the ones only present in `other` are copied.
+        `base` is the segment both segments started from, if any, and it is used to not count twice the references of its symbols.
+        If `mergedSymbols` is passed then it gets filled with the symbol of this segment each symbol of `other` was merged into,
+        indexed by the `id` of the symbol of `other`.
+        Pointers found in data are joined, but the ones pointing to a defined symbol are dropped, since the analysis which defined
+        that symbol would have consumed the pointer if both were done sequentially."""
+        for address, otherSym in other.symbols.items():
+            contextSym = self.symbols.get(address, None)
+            if contextSym is None:
+                contextSym = otherSym.copy()
+                self.symbols[address] = contextSym
+            else:
+                contextSym.merge(otherSym, base.symbols.get(address, None) if base is not None else None)
+            if mergedSymbols is not None:
+                mergedSymbols[id(otherSym)] = contextSym
+
+        for constantValue, otherSym in other.constants.items():
+            contextSym = self.constants.get(constantValue, None)
+            if contextSym is None:
+                contextSym = otherSym.copy()
+                self.constants[constantValue] = contextSym
+            else:
+                contextSym.merge(otherSym, base.constants.get(constantValue, None) if base is not None else None)
+            if mergedSymbols is not None:
+                mergedSymbols[id(otherSym)] = contextSym
+
+        self.newPointersInData.update(other.newPointersInData)
+        for pointer in list(self.newPointersInData):
+            contextSym = self.symbols.get(pointer, None)
+            if contextSym is not None and contextSym.isDefined:
+                self.newPointersInData.discard(pointer)
+
+        for loInstrVram, symVram in other.loPatches.items():
+            if loInstrVram not in self.loPatches:
+                self.loPatches[loInstrVram] = symVram
+
+        self.dataSymbolsWithReferencesWithAddends |= other.dataSymbolsWithReferencesWithAddends
+        self.dataReferencingConstants |= other.dataReferencingConstants
+
+        self._symbolsChanged(None)
+
+
     def saveContextToFile(self, f: TextIO):
         f.write(f"category,{ContextSymbol.getCsvHeader()}\n")
 
@@ -313,6 +446,7 @@ class SymbolsSegment:
             contextSym.size = size
             contextSym.isDefined = True
             contextSym.isUserDeclared = True
+        self._symbolsChanged(None)
 
     def fillHardwareRegs(self, useRealNames: bool=False):
         for vram, name in self.N64HardwareRegs.items():
@@ -325,6 +459,7 @@ class SymbolsSegment:
             contextSym.size = 4
             contextSym.isDefined = True
             contextSym.isUserDeclared = True
+        self._symbolsChanged(None)
 
 
     def readMMAddressMaps(self, functionsPath: str, variablesPath: str):
@@ -348,6 +483,7 @@ class SymbolsSegment:
             contextSym.type = varType
             contextSym.size = varSize
             contextSym.isUserDeclared = True
+        self._symbolsChanged(None)
 
     def readVariablesCsv(self, filepath: Path):
         if not filepath.exists():
@@ -390,6 +526,7 @@ class SymbolsSegment:
             contextSym.type = varType
             contextSym.size = varSize
             contextSym.isUserDeclared = True
+        self._symbolsChanged(None)
 
     def readFunctionsCsv(self, filepath: Path):
         if not filepath.exists():
@@ -6,15 +6,22 @@
 from __future__ import annotations
 
 import argparse
+import array
 import csv
 import hashlib
 import json
+import os
 from pathlib import Path
 import rabbitizer
 import struct
 import subprocess
 import sys
 
+try:
+    import numpy # type: ignore
+except ImportError:
+    numpy = None
+
 from .GlobalConfig import GlobalConfig, InputEndian
 
 
@@ -43,13 +50,58 @@ def isStdoutRedirected() -> bool:
     return not sys.stdout.isatty()
 
 # Returns the md5 hash of a bytearray
-def getStrHash(byte_array: bytearray) -> str:
+def getStrHash(byte_array: bytes|bytearray) -> str:
     return str(hashlib.md5(byte_array).hexdigest())
 
 def writeBytearrayToFile(filepath: Path, array_of_bytes: bytearray):
     with filepath.open(mode="wb") as f:
         f.write(array_of_bytes)
 
+def writeFile(filepath: Path, contents: str|bytes):
+    "Writes `contents` to `filepath`. Text is written if `contents` is a `str`, raw bytes otherwise"
+    if isinstance(contents, str):
+        with filepath.open("w") as f:
+            f.write(contents)
+    else:
+        filepath.write_bytes(contents)
+
+def writeFileIfChanged(filepath: Path, contents: str|bytes, previousEntry: tuple[int, str]|None=None) -> tuple[bool, int, str]:
+    """Writes `contents` to `filepath` unless the file already has exactly those contents. Text is written if `contents` is a `str`, raw bytes otherwise.
+
+    `previousEntry` is the (size, hash) recorded for this file by a previous run, if any. The existing file is not read back if its size and the hash of `contents` match it.
+
+    Returns if the file was written, and the size and hash of the file"""
+    if isinstance(contents, str):
+        contentsHash = getStrHash(contents.encode())
+    else:
+        contentsHash = getStrHash(contents)
+
+    try:
+        size = filepath.stat().st_size
+    except FileNotFoundError:
+        size = -1
+
+    upToDate = False
+    if size >= 0:
+        if previousEntry is not None:
+            upToDate = previousEntry == (size, contentsHash)
+        if not upToDate:
+            try:
+                if isinstance(contents, str):
+                    # Compare against the newlines the file would be written with
+                    with filepath.open(newline="") as f:
+                        upToDate = f.read() == contents.replace("\n", os.linesep)
+                else:
+                    upToDate = filepath.read_bytes() == contents
+            except UnicodeDecodeError:
+                upToDate = False
+
+    if upToDate:
+        return False, size, contentsHash
+
+    writeFile(filepath, contents)
+    return True, filepath.stat().st_size, contentsHash
+
 def readFileAsBytearray(filepath: Path) -> bytearray:
     if not filepath.exists():
         return bytearray(0)
@@ -114,6 +166,51 @@ def wordsToBytes(words_list: list[int], buffer: bytearray) -> bytearray:
 #! deprecated
 beWordsToBytes = wordsToBytes
 
+def getWordsIndicesInRange(words_list: list[int], low: int, high: int) -> list[int]:
+    "Returns the indices of the words which are in the [`low`, `high`) range. The check is done as a single vectorized mask if NumPy is available"
+    if numpy is not None:
+        wordsArray = numpy.array(words_list, dtype=numpy.uint32)
+        return numpy.flatnonzero((wordsArray >= low) & (wordsArray < high)).tolist()
+    return [i for i, w in enumerate(words_list) if low <= w < high]
+
+def unpackColumns(structFormat: str, array_of_bytes: bytes|bytearray, offset: int, count: int) -> list[list[int]]:
+    """Decodes `count` consecutive structs of `structFormat` starting at `offset`, returning one list per field of the struct.
+
+    `structFormat` must start with the byte order and have one integer type per field, without repeat counts.
+    If every field is aligned to its own size then the whole table is read into an `array.array` per field size
+    and each column is taken from it as a strided slice. Otherwise `struct.iter_unpack` is used"""
+    fields = structFormat[1:]
+    if count <= 0:
+        return [list() for _ in fields]
+
+    byteOrder = structFormat[0]
+    structSize = struct.calcsize(structFormat)
+    view = memoryview(array_of_bytes)[offset:offset+count*structSize]
+
+    fieldOffsets: list[int] = list()
+    fieldOffset = 0
+    for field in fields:
+        fieldSize = struct.calcsize(byteOrder + field)
+        if fieldOffset % fieldSize != 0 or structSize % fieldSize != 0 or array.array(field).itemsize != fieldSize:
+            return [list(column) for column in zip(*struct.iter_unpack(structFormat, view))]
+        fieldOffsets.append(fieldOffset)
+        fieldOffset += fieldSize
+
+    needsByteswap = (byteOrder == ">") != (sys.byteorder == "big")
+    arrays: dict[str, array.array] = dict()
+    columns: list[list[int]] = list()
+    for field, fieldOffset in zip(fields, fieldOffsets):
+        fieldArray = arrays.get(field)
+        if fieldArray is None:
+            fieldArray = array.array(field)
+            fieldArray.frombytes(view)
+            if needsByteswap and fieldArray.itemsize > 1:
+                fieldArray.byteswap()
+            arrays[field] = fieldArray
+        itemsize = fieldArray.itemsize
+        columns.append(fieldArray[fieldOffset//itemsize::structSize//itemsize].tolist())
+    return columns
+
 def wordToFloat(word: int) -> float:
     return struct.unpack('>f', struct.pack('>I', word))[0]
 
@@ -4,6 +4,7 @@
 from . import Utils
 
 from .SortedDict import SortedDict
+from .SortedSet import SortedSet
 from .GlobalConfig import GlobalConfig, InputEndian, Compiler
 from .FileSectionType import FileSectionType, FileSections_ListBasic, FileSections_ListAll
 from .ContextSymbols import SymbolSpecialType, ContextSymbol, ContextOffsetSymbol, ContextRelocSymbol
@@ -12,3 +13,4 @@ from .Context import Context
 from .FileSplitFormat import FileSplitFormat, FileSplitEntry
 from .ElementBase import ElementBase
 from .GlobalOffsetTable import GlobalOffsetTable
+from .OutputWriter import OutputWriter, PackedOutputWriter
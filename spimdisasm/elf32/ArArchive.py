@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import dataclasses
+import mmap
+from pathlib import Path
+
+
+@dataclasses.dataclass
+class ArArchiveMember:
+    name:       str
+    offset:     int  # Offset of the contents of the member on the archive
+    size:       int
+
+
+# a.k.a. static library (.a)
+class ArArchive:
+    """Reader of `ar` archives, in both the GNU/SysV and BSD variants.
+
+    Only the member headers are parsed, the contents of each member are returned as a view of the archive without copying them.
+    The symbol index and the long names table are not listed as members"""
+
+    magic = b"!<arch>\n"
+    thinMagic = b"!<thin>\n"
+    headerSize = 60
+
+    def __init__(self, array_of_bytes: bytes|bytearray|mmap.mmap):
+        self.array_of_bytes = array_of_bytes
+        self.members: list[ArArchiveMember] = list()
+
+        if array_of_bytes[:len(ArArchive.thinMagic)] == ArArchive.thinMagic:
+            raise ValueError("Thin ar archives are not supported, since they don't contain their members")
+        if array_of_bytes[:len(ArArchive.magic)] != ArArchive.magic:
+            raise ValueError("Not an ar archive")
+
+        longNames = b""
+        offset = len(ArArchive.magic)
+        while offset + ArArchive.headerSize <= len(array_of_bytes):
+            header = bytes(array_of_bytes[offset:offset + ArArchive.headerSize])
+            if header[58:60] != b"`\n":
+                raise ValueError(f"Invalid ar member header at offset 0x{offset:X}")
+
+            rawName = header[0:16].decode("ascii", errors="replace").rstrip(" ")
+            size = int(header[48:58].decode("ascii").strip() or "0")
+            dataOffset = offset + ArArchive.headerSize
+            # Members are aligned to 2 bytes
+            offset = dataOffset + size + (size & 1)
+
+            if rawName in {"/", "/SYM64/", "__.SYMDEF", "__.SYMDEF SORTED"}:
+                # Symbol index
+                continue
+            if rawName == "//":
+                longNames = bytes(array_of_bytes[dataOffset:dataOffset + size])
+                continue
+
+            if rawName.startswith("#1/"):
+                # BSD: the name is placed right before the contents
+                nameSize = int(rawName[3:])
+                name = bytes(array_of_bytes[dataOffset:dataOffset + nameSize]).rstrip(b"\0").decode("utf-8", errors="replace")
+                dataOffset += nameSize
+                size -= nameSize
+            elif rawName.startswith("/") and rawName[1:].isdigit():
+                # GNU: offset into the long names table, terminated by "/\n"
+                nameStart = int(rawName[1:])
+                nameEnd = longNames.find(b"\n", nameStart)
+                if nameEnd < 0:
+                    nameEnd = len(longNames)
+                name = longNames[nameStart:nameEnd].decode("utf-8", errors="replace").rstrip("/")
+            else:
+                name = rawName.rstrip("/")
+
+            self.members.append(ArArchiveMember(name, dataOffset, size))
+
+
+    def getMemberBytes(self, member: ArArchiveMember) -> memoryview:
+        "Returns the contents of `member` as a view of the archive"
+        return memoryview(self.array_of_bytes)[member.offset:member.offset + member.size]
+
+    def __iter__(self):
+        return iter(self.members)
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+
+    @staticmethod
+    def isArchive(array_of_bytes: bytes|bytearray|mmap.mmap) -> bool:
+        return array_of_bytes[:len(ArArchive.magic)] == ArArchive.magic
+
+    @staticmethod
+    def isArchiveFile(filepath: Path) -> bool:
+        try:
+            with filepath.open("rb") as f:
+                return f.read(len(ArArchive.magic)) == ArArchive.magic
+        except OSError:
+            return False
+
+    @staticmethod
+    def mapFile(filepath: Path) -> mmap.mmap|bytearray:
+        """Maps the file into memory instead of reading it.
+
+        The mapping is copy-on-write, so its views can be modified like a `bytearray` without changing the file"""
+        with filepath.open("rb") as f:
+            if filepath.stat().st_size == 0:
+                # Empty files can't be mapped
+                return bytearray()
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    @staticmethod
+    def fromFile(filepath: Path) -> ArArchive:
+        return ArArchive(ArArchive.mapFile(filepath))
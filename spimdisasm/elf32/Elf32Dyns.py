@@ -29,8 +29,10 @@ class Elf32DynEntry:
         return self.val
 
     @staticmethod
-    def fromBytearray(array_of_bytes: bytearray, offset: int = 0) -> Elf32DynEntry:
-        entryFormat = common.GlobalConfig.ENDIAN.toFormatString() + "II"
+    def fromBytearray(array_of_bytes: bytearray, offset: int = 0, endian: common.InputEndian|None = None) -> Elf32DynEntry:
+        if endian is None:
+            endian = common.GlobalConfig.ENDIAN
+        entryFormat = endian.toFormatString() + "II"
         unpacked = struct.unpack_from(entryFormat, array_of_bytes, offset)
 
         return Elf32DynEntry(*unpacked)
@@ -41,37 +43,61 @@ class Elf32DynEntry:
 
 
 class Elf32Dyns:
-    def __init__(self, array_of_bytes: bytearray, offset: int, rawSize: int):
-        self.dyns: list[Elf32DynEntry] = list()
+    """Dynamic table.
+
+    The entries are decoded in bulk and stored column-wise, an `Elf32DynEntry` is only created the first time its index is accessed"""
+
+    def __init__(self, array_of_bytes: bytearray, offset: int, rawSize: int, endian: common.InputEndian|None = None):
         self.offset: int = offset
         self.rawSize: int = rawSize
 
+        if endian is None:
+            endian = common.GlobalConfig.ENDIAN
+        entryFormat = endian.toFormatString() + "II"
+        columns = common.Utils.unpackColumns(entryFormat, array_of_bytes, offset, rawSize // Elf32DynEntry.structSize())
+
+        self.tags: list[int] = columns[0]
+        self.vals: list[int] = columns[1]
+
+        self._entries: dict[int, Elf32DynEntry] = dict()
+
         self.pltGot: int | None = None
         self.localGotNo: int | None = None
         self.symTabNo: int | None = None
         self.gotSym: int | None = None
 
-        for i in range(rawSize // Elf32DynEntry.structSize()):
-            entry = Elf32DynEntry.fromBytearray(array_of_bytes, offset + i*Elf32DynEntry.structSize())
-            self.dyns.append(entry)
-
-            if entry.tag == Elf32DynamicTable.PLTGOT.value:
-                self.pltGot = entry.val
-            elif entry.tag == Elf32DynamicTable.MIPS_LOCAL_GOTNO.value:
-                self.localGotNo = entry.val
-            elif entry.tag == Elf32DynamicTable.MIPS_SYMTABNO.value:
-                self.symTabNo = entry.val
-            elif entry.tag == Elf32DynamicTable.MIPS_GOTSYM.value:
-                self.gotSym = entry.val
-            elif entry.tag == Elf32DynamicTable.NULL.value:
+        for tag, val in zip(self.tags, self.vals):
+            if tag == Elf32DynamicTable.PLTGOT.value:
+                self.pltGot = val
+            elif tag == Elf32DynamicTable.MIPS_LOCAL_GOTNO.value:
+                self.localGotNo = val
+            elif tag == Elf32DynamicTable.MIPS_SYMTABNO.value:
+                self.symTabNo = val
+            elif tag == Elf32DynamicTable.MIPS_GOTSYM.value:
+                self.gotSym = val
+            elif tag == Elf32DynamicTable.NULL.value:
                 pass
             else:
                 pass
-                # print(f"Unknown dyn value: tag={entry.tag:08X} val={entry.val:08X}")
+                # print(f"Unknown dyn value: tag={tag:08X} val={val:08X}")
+
+    @property
+    def dyns(self) -> list[Elf32DynEntry]:
+        "Every entry of the table. Creates the entries which weren't created yet"
+        return [self[i] for i in range(len(self))]
 
     def __getitem__(self, key: int) -> Elf32DynEntry:
-        return self.dyns[key]
+        if key < 0:
+            key += len(self)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = Elf32DynEntry(self.tags[key], self.vals[key])
+            self._entries[key] = entry
+        return entry
 
     def __iter__(self):
-        for entry in self.dyns:
-            yield entry
+        for i in range(len(self)):
+            yield self[i]
+
+    def __len__(self) -> int:
+        return len(self.tags)
@@ -21,6 +21,11 @@ from .Elf32Rels import Elf32Rels
 
 
 class Elf32File:
+    """Parses the header and the section headers of an elf file.
+
+    The contents of the symbol, string, relocation and dynamic tables and the GOT are only decoded the first time they are accessed,
+    so only looking at a few sections of the file doesn't pay for decoding the rest of them"""
+
     def __init__(self, array_of_bytes: bytearray):
         self.header = Elf32Header.fromBytearray(array_of_bytes)
         # print(self.header)
@@ -31,6 +36,11 @@ class Elf32File:
         elif dataEncoding == Elf32HeaderIdentifier.DataEncoding.DATA2LSB:
             common.GlobalConfig.ENDIAN = common.InputEndian.LITTLE
 
+        self.endian: common.InputEndian = common.GlobalConfig.ENDIAN
+        "Used to decode the sections, even if `GlobalConfig.ENDIAN` is changed before they are accessed"
+
+        self._array_of_bytes = array_of_bytes
+
         elfFlags, unknownElfFlags = Elf32HeaderFlag.parseFlags(self.header.flags)
         self.elfFlags = elfFlags
         self.unknownElfFlags = unknownElfFlags
@@ -38,17 +48,17 @@ class Elf32File:
         if self.unknownElfFlags != 0:
             common.Utils.eprint(f"Warning: Elf header has unknown flags: 0x{self.unknownElfFlags:X}")
 
-        self.strtab: Elf32StringTable | None = None
-        self.symtab: Elf32Syms | None = None
+        self.strtabEntry: Elf32SectionHeaderEntry | None = None
+        self.symtabEntry: Elf32SectionHeaderEntry | None = None
 
-        self.dynamic: Elf32Dyns | None = None
-        self.dynstr: Elf32StringTable | None = None
-        self.dynsym: Elf32Syms | None = None
+        self.dynamicEntry: Elf32SectionHeaderEntry | None = None
+        self.dynstrEntry: Elf32SectionHeaderEntry | None = None
+        self.dynsymEntry: Elf32SectionHeaderEntry | None = None
 
         self.progbits: dict[common.FileSectionType, Elf32SectionHeaderEntry] = dict()
         self.nobits: Elf32SectionHeaderEntry | None = None
 
-        self.rel: dict[common.FileSectionType, Elf32Rels] = dict()
+        self.relEntries: dict[common.FileSectionType, Elf32SectionHeaderEntry] = dict()
 
         self.reginfo: Elf32RegInfo | None = None
 
@@ -57,7 +67,15 @@ class Elf32File:
         shstrtabSectionEntry = self.sectionHeaders.sections[self.header.shstrndx]
         self.shstrtab = Elf32StringTable(array_of_bytes, shstrtabSectionEntry.offset, shstrtabSectionEntry.size)
 
-        self.got: Elf32GlobalOffsetTable | None = None
+        self.gotEntry: Elf32SectionHeaderEntry | None = None
+
+        self._strtab: Elf32StringTable | None = None
+        self._symtab: Elf32Syms | None = None
+        self._dynamic: Elf32Dyns | None = None
+        self._dynstr: Elf32StringTable | None = None
+        self._dynsym: Elf32Syms | None = None
+        self._rel: dict[common.FileSectionType, Elf32Rels] = dict()
+        self._got: Elf32GlobalOffsetTable | None = None
 
         for entry in self.sectionHeaders.sections:
             sectionEntryName = self.shstrtab[entry.name]
@@ -70,8 +88,68 @@ class Elf32File:
             elif common.GlobalConfig.VERBOSE:
                 common.Utils.eprint("Unknown section header type found:", sectionEntryName, entry, "\n")
 
-        if self.got is not None and self.dynamic is not None and self.dynsym is not None:
-            self.got.initTables(self.dynamic, self.dynsym)
+
+    @property
+    def strtab(self) -> Elf32StringTable | None:
+        if self._strtab is None and self.strtabEntry is not None:
+            self._strtab = Elf32StringTable(self._array_of_bytes, self.strtabEntry.offset, self.strtabEntry.size)
+        return self._strtab
+
+    @property
+    def symtab(self) -> Elf32Syms | None:
+        if self._symtab is None and self.symtabEntry is not None:
+            self._symtab = Elf32Syms(self._array_of_bytes, self.symtabEntry.offset, self.symtabEntry.size, self.endian)
+        return self._symtab
+
+    @property
+    def dynamic(self) -> Elf32Dyns | None:
+        if self._dynamic is None and self.dynamicEntry is not None:
+            self._dynamic = Elf32Dyns(self._array_of_bytes, self.dynamicEntry.offset, self.dynamicEntry.size, self.endian)
+        return self._dynamic
+
+    @property
+    def dynstr(self) -> Elf32StringTable | None:
+        if self._dynstr is None and self.dynstrEntry is not None:
+            self._dynstr = Elf32StringTable(self._array_of_bytes, self.dynstrEntry.offset, self.dynstrEntry.size)
+        return self._dynstr
+
+    @property
+    def dynsym(self) -> Elf32Syms | None:
+        if self._dynsym is None and self.dynsymEntry is not None:
+            self._dynsym = Elf32Syms(self._array_of_bytes, self.dynsymEntry.offset, self.dynsymEntry.size, self.endian)
+        return self._dynsym
+
+    @property
+    def got(self) -> Elf32GlobalOffsetTable | None:
+        "Decoding the GOT also decodes the `.dynamic` and `.dynsym` sections, which are needed to fill its tables"
+        if self._got is None and self.gotEntry is not None:
+            self._got = Elf32GlobalOffsetTable(self._array_of_bytes, self.gotEntry.offset, self.gotEntry.size, self.endian)
+            dynamic = self.dynamic
+            dynsym = self.dynsym
+            if dynamic is not None and dynsym is not None:
+                self._got.initTables(dynamic, dynsym)
+        return self._got
+
+    def getRel(self, sectionType: common.FileSectionType) -> Elf32Rels | None:
+        "Returns the relocations of the section `sectionType`, decoding only them"
+        rels = self._rel.get(sectionType)
+        if rels is None:
+            entry = self.relEntries.get(sectionType)
+            if entry is None:
+                return None
+            rels = Elf32Rels(self._array_of_bytes, entry.offset, entry.size, self.endian)
+            self._rel[sectionType] = rels
+        return rels
+
+    @property
+    def rel(self) -> dict[common.FileSectionType, Elf32Rels]:
+        "Decodes the relocations of every section. Use `getRel` to only decode the ones of a single section"
+        rels: dict[common.FileSectionType, Elf32Rels] = dict()
+        for sectionType in self.relEntries:
+            sectionRels = self.getRel(sectionType)
+            assert sectionRels is not None
+            rels[sectionType] = sectionRels
+        return rels
 
 
     def _processSection_NULL(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
@@ -87,7 +165,7 @@ class Elf32File:
             elif fileSecType == common.FileSectionType.Data:
                 self.sectionHeaders.mipsData = entry
         elif sectionEntryName == ".got":
-            self.got = Elf32GlobalOffsetTable(array_of_bytes, entry.offset, entry.size)
+            self.gotEntry = entry
         elif sectionEntryName == ".interp":
             # strings with names of dynamic libraries
             common.Utils.printVerbose(f"Unhandled SYMTAB found: '{sectionEntryName}'")
@@ -102,15 +180,15 @@ class Elf32File:
 
     def _processSection_SYMTAB(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         if sectionEntryName == ".symtab":
-            self.symtab = Elf32Syms(array_of_bytes, entry.offset, entry.size)
+            self.symtabEntry = entry
         elif common.GlobalConfig.VERBOSE:
             common.Utils.eprint("Unhandled SYMTAB found: ", sectionEntryName, entry, "\n")
 
     def _processSection_STRTAB(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         if sectionEntryName == ".strtab":
-            self.strtab = Elf32StringTable(array_of_bytes, entry.offset, entry.size)
+            self.strtabEntry = entry
         elif sectionEntryName == ".dynstr":
-            self.dynstr = Elf32StringTable(array_of_bytes, entry.offset, entry.size)
+            self.dynstrEntry = entry
         elif sectionEntryName == ".shstrtab":
             pass
         elif common.GlobalConfig.VERBOSE:
@@ -126,7 +204,7 @@ class Elf32File:
 
     def _processSection_DYNAMIC(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         if sectionEntryName == ".dynamic":
-            self.dynamic = Elf32Dyns(array_of_bytes, entry.offset, entry.size)
+            self.dynamicEntry = entry
         elif common.GlobalConfig.VERBOSE:
             common.Utils.eprint("Unhandled DYNAMIC found: ", sectionEntryName, entry, "\n")
 
@@ -144,7 +222,7 @@ class Elf32File:
         if sectionEntryName.startswith(".rel."):
             fileSecType = common.FileSectionType.fromStr(sectionEntryName[4:])
             if fileSecType != common.FileSectionType.Invalid:
-                self.rel[fileSecType] = Elf32Rels(array_of_bytes, entry.offset, entry.size)
+                self.relEntries[fileSecType] = entry
             elif common.GlobalConfig.VERBOSE:
                 common.Utils.eprint("Unhandled REL subsection found: ", sectionEntryName, entry, "\n")
         elif common.GlobalConfig.VERBOSE:
@@ -152,7 +230,7 @@ class Elf32File:
 
     def _processSection_DYNSYM(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         if sectionEntryName == ".dynsym":
-            self.dynsym = Elf32Syms(array_of_bytes, entry.offset, entry.size)
+            self.dynsymEntry = entry
         elif common.GlobalConfig.VERBOSE:
             common.Utils.eprint("Unhandled DYNSYM found: ", sectionEntryName, entry, "\n")
 
@@ -15,12 +15,14 @@ from .Elf32Syms import Elf32Syms
 
 
 class Elf32GlobalOffsetTable:
-    def __init__(self, array_of_bytes: bytearray, offset: int, rawSize: int):
+    def __init__(self, array_of_bytes: bytearray, offset: int, rawSize: int, endian: common.InputEndian|None = None):
         self.entries: list[int] = list()
         self.offset: int = offset
         self.rawSize: int = rawSize
 
-        entryFormat = common.GlobalConfig.ENDIAN.toFormatString() + f"{rawSize//4}I"
+        if endian is None:
+            endian = common.GlobalConfig.ENDIAN
+        entryFormat = endian.toFormatString() + f"{rawSize//4}I"
         self.entries = list(struct.unpack_from(entryFormat, array_of_bytes, offset))
 
 
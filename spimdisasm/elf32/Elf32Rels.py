@@ -26,23 +26,51 @@ class Elf32RelEntry:
         return self.info & 0xFF
 
     @staticmethod
-    def fromBytearray(array_of_bytes: bytearray, offset: int = 0) -> Elf32RelEntry:
-        entryFormat = common.GlobalConfig.ENDIAN.toFormatString() + "II"
+    def fromBytearray(array_of_bytes: bytearray, offset: int = 0, endian: common.InputEndian|None = None) -> Elf32RelEntry:
+        if endian is None:
+            endian = common.GlobalConfig.ENDIAN
+        entryFormat = endian.toFormatString() + "II"
         unpacked = struct.unpack_from(entryFormat, array_of_bytes, offset)
 
         return Elf32RelEntry(*unpacked)
 
 
 class Elf32Rels:
-    def __init__(self, array_of_bytes: bytearray, offset: int, rawSize: int):
-        self.relocations: list[Elf32RelEntry] = list()
+    """Relocation table.
+
+    The entries are decoded in bulk and stored column-wise, an `Elf32RelEntry` is only created the first time its index is accessed"""
+
+    def __init__(self, array_of_bytes: bytearray, offset: int, rawSize: int, endian: common.InputEndian|None = None):
         self.offset: int = offset
         self.rawSize: int = rawSize
 
-        for i in range(rawSize // 0x08):
-            entry = Elf32RelEntry.fromBytearray(array_of_bytes, offset + i*0x08)
-            self.relocations.append(entry)
+        if endian is None:
+            endian = common.GlobalConfig.ENDIAN
+        entryFormat = endian.toFormatString() + "II"
+        columns = common.Utils.unpackColumns(entryFormat, array_of_bytes, offset, rawSize // 0x08)
+
+        self.offsets: list[int] = columns[0]
+        self.infos: list[int] = columns[1]
+
+        self._entries: dict[int, Elf32RelEntry] = dict()
+
+    @property
+    def relocations(self) -> list[Elf32RelEntry]:
+        "Every entry of the table. Creates the entries which weren't created yet"
+        return [self[i] for i in range(len(self))]
+
+    def __getitem__(self, key: int) -> Elf32RelEntry:
+        if key < 0:
+            key += len(self)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = Elf32RelEntry(self.offsets[key], self.infos[key])
+            self._entries[key] = entry
+        return entry
 
     def __iter__(self):
-        for entry in self.relocations:
-            yield entry
+        for i in range(len(self)):
+            yield self[i]
+
+    def __len__(self) -> int:
+        return len(self.offsets)
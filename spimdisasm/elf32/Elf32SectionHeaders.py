@@ -45,8 +45,10 @@ class Elf32SectionHeaders:
         self.mipsText: Elf32SectionHeaderEntry | None = None
         self.mipsData: Elf32SectionHeaderEntry | None = None
 
-        for i in range(shnum):
-            sectionHeaderEntry = Elf32SectionHeaderEntry.fromBytearray(array_of_bytes, shoff + i * 0x28)
+        # Every section header is used, so they are decoded in bulk but not stored column-wise
+        headerFormat = common.GlobalConfig.ENDIAN.toFormatString() + "10I"
+        for unpacked in struct.iter_unpack(headerFormat, memoryview(array_of_bytes)[shoff:shoff + shnum * 0x28]):
+            sectionHeaderEntry = Elf32SectionHeaderEntry(*unpacked)
             self.sections.append(sectionHeaderEntry)
             # print(sectionHeaderEntry)
 
@@ -8,24 +8,43 @@ from __future__ import annotations
 
 # a.k.a. strtab (string table)
 class Elf32StringTable:
-    def __init__(self, array_of_bytes: bytearray, offset: int, rawsize: int):
-        self.strings: bytearray = array_of_bytes[offset:offset+rawsize]
+    """String table of an elf file.
+
+    Strings are found with a single search for their NUL terminator and decoded from a view of the file, without copying the table.
+    Each decoded string is remembered, since symbols and relocations usually look up the same names many times"""
+
+    def __init__(self, array_of_bytes: bytearray|memoryview, offset: int, rawsize: int):
+        self.strings: memoryview = memoryview(array_of_bytes)[offset:offset+rawsize]
         self.offset: int = offset
         self.rawsize: int = rawsize
 
-    def __getitem__(self, key: int) -> str:
-        buffer = bytearray()
+        if isinstance(array_of_bytes, (bytes, bytearray)):
+            self._searchBuffer: bytes|bytearray = array_of_bytes
+            self._searchOffset: int = offset
+        else:
+            # Views (like the members of an archive) can't be searched, so only the table is copied
+            self._searchBuffer = bytes(self.strings)
+            self._searchOffset = 0
+        self._decodedStrings: dict[int, str] = dict()
+
+    def _getStringEnd(self, key: int) -> int:
+        "Returns the position on the table of the NUL terminator of the string starting at `key`, or the size of the table if there's none"
+        try:
+            return self._searchBuffer.index(b"\0", self._searchOffset + key, self._searchOffset + self.rawsize) - self._searchOffset
+        except ValueError:
+            return self.rawsize
 
-        i = key
-        while self.strings[i] != 0:
-            buffer.append(self.strings[i])
-            i += 1
-
-        return buffer.decode()
+    def __getitem__(self, key: int) -> str:
+        string = self._decodedStrings.get(key)
+        if string is None:
+            if key < 0 or key >= self.rawsize:
+                raise IndexError(f"String table index out of range: {key}")
+            string = str(self.strings[key:self._getStringEnd(key)], "utf-8")
+            self._decodedStrings[key] = string
+        return string
 
     def __iter__(self):
         i = 0
         while i < self.rawsize:
-            string = self[i]
-            yield string
-            i += len(string.encode()) + 1
+            yield self[i]
+            i = self._getStringEnd(i) + 1
@@ -31,8 +31,10 @@ class Elf32SymEntry:
         return self.info & 0xF
 
     @staticmethod
-    def fromBytearray(array_of_bytes: bytearray, offset: int = 0) -> Elf32SymEntry:
-        entryFormat = common.GlobalConfig.ENDIAN.toFormatString() + "IIIBBH"
+    def fromBytearray(array_of_bytes: bytearray, offset: int = 0, endian: common.InputEndian|None = None) -> Elf32SymEntry:
+        if endian is None:
+            endian = common.GlobalConfig.ENDIAN
+        entryFormat = endian.toFormatString() + "IIIBBH"
         unpacked = struct.unpack_from(entryFormat, array_of_bytes, offset)
 
         return Elf32SymEntry(*unpacked)
@@ -43,21 +45,45 @@ class Elf32SymEntry:
 
 
 class Elf32Syms:
-    def __init__(self, array_of_bytes: bytearray, offset: int, rawSize: int):
-        self.symbols: list[Elf32SymEntry] = list()
+    """Symbol table.
+
+    The entries are decoded in bulk and stored column-wise, an `Elf32SymEntry` is only created the first time its index is accessed"""
+
+    def __init__(self, array_of_bytes: bytearray, offset: int, rawSize: int, endian: common.InputEndian|None = None):
         self.offset: int = offset
         self.rawSize: int = rawSize
 
-        for i in range(rawSize // Elf32SymEntry.structSize()):
-            entry = Elf32SymEntry.fromBytearray(array_of_bytes, offset + i*Elf32SymEntry.structSize())
-            self.symbols.append(entry)
+        if endian is None:
+            endian = common.GlobalConfig.ENDIAN
+        entryFormat = endian.toFormatString() + "IIIBBH"
+        columns = common.Utils.unpackColumns(entryFormat, array_of_bytes, offset, rawSize // Elf32SymEntry.structSize())
+
+        self.names: list[int] = columns[0]
+        self.values: list[int] = columns[1]
+        self.sizes: list[int] = columns[2]
+        self.infos: list[int] = columns[3]
+        self.others: list[int] = columns[4]
+        self.shndxs: list[int] = columns[5]
+
+        self._entries: dict[int, Elf32SymEntry] = dict()
+
+    @property
+    def symbols(self) -> list[Elf32SymEntry]:
+        "Every entry of the table. Creates the entries which weren't created yet"
+        return [self[i] for i in range(len(self))]
 
     def __getitem__(self, key: int) -> Elf32SymEntry:
-        return self.symbols[key]
+        if key < 0:
+            key += len(self)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = Elf32SymEntry(self.names[key], self.values[key], self.sizes[key], self.infos[key], self.others[key], self.shndxs[key])
+            self._entries[key] = entry
+        return entry
 
     def __iter__(self):
-        for entry in self.symbols:
-            yield entry
+        for i in range(len(self)):
+            yield self[i]
 
     def __len__(self) -> int:
-        return len(self.symbols)
+        return len(self.names)
@@ -16,3 +16,4 @@ from .Elf32Syms import Elf32Syms, Elf32SymEntry
 from .Elf32Rels import Elf32Rels, Elf32RelEntry
 
 from .Elf32File import Elf32File
+from .ArArchive import ArArchive, ArArchiveMember
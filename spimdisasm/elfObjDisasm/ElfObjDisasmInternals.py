@@ -6,7 +6,14 @@
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import dataclasses
+import glob
 from pathlib import Path
+import sys
+from typing import Any
+
+import rabbitizer
 
 from .. import common
 from .. import elf32
@@ -18,13 +25,24 @@ def getArgsParser() -> argparse.ArgumentParser:
     description = ""
     parser = argparse.ArgumentParser(description=description)
 
-    parser.add_argument("binary", help="Path to input elf binary file")
+    parser.add_argument("binary", help="Path to input elf binary file or ar archive (static library). Optional in batch mode", nargs="?")
     parser.add_argument("output", help="Path to output. Use '-' to print to stdout instead")
 
     parser.add_argument("--data-output", help="Path to output the data and rodata disassembly")
 
     parser.add_argument("--save-context", help="Saves the context to a file", metavar="FILENAME")
 
+    parser.add_argument("--incremental-analysis", help="Analyze again the sections and functions which depend on symbols found after they were analyzed, until nothing changes", action="store_true")
+    parser.add_argument("--reloc-driven-analysis", help="On relocatable objects, take the symbols referenced by the instructions straight from the relocations of the text section instead of guessing them. "
+        "Instructions without a relocation against a named symbol are still analyzed as usual", action=common.Utils.BooleanOptionalAction)
+
+    parser_batch = parser.add_argument_group("Batch mode options", "Disassemble many elf files in a single run. Each file is analyzed with its own context. Every member of the ar archives is disassembled without extracting them, and ar archives are always disassembled in batch mode. "
+        "The output of each file is placed under the same relative directory as the input file, and --save-context is used as a directory to save the context of each file")
+
+    parser_batch.add_argument("--batch", help="Glob pattern of the elf files to disassemble. '**' matches any amount of directories. Can be passed multiple times", action="append", metavar="PATTERN")
+    parser_batch.add_argument("--batch-list", help="Path to a file with the paths of the elf files to disassemble, one per line. Use '-' to read them from stdin", metavar="FILENAME")
+    parser_batch.add_argument("--jobs", help="Amount of processes used to disassemble the files in batch mode. Printing to stdout always uses a single process. Defaults to 1", type=int, default=1, metavar="N")
+
     common.GlobalConfig.addParametersToArgParse(parser)
 
     mips.InstructionConfig.addParametersToArgParse(parser)
@@ -35,6 +53,9 @@ def applyArgs(args: argparse.Namespace) -> None:
     mips.InstructionConfig.parseArgs(args)
     common.GlobalConfig.parseArgs(args)
 
+    if args.reloc_driven_analysis is not None:
+        common.GlobalConfig.RELOC_DRIVEN_ANALYSIS = args.reloc_driven_analysis
+
 def applyGlobalConfigurations() -> None:
     common.GlobalConfig.REMOVE_POINTERS = False
     common.GlobalConfig.IGNORE_BRANCHES = False
@@ -122,6 +143,13 @@ def changeGlobalSegmentRanges(context: common.Context, processedSegments: dict[c
     return
 
 
+def sectionsShareAddresses(processedSegments: dict[common.FileSectionType, mips.sections.SectionBase]) -> bool:
+    sortedSegments = sorted(processedSegments.values(), key=lambda subSegment: subSegment.vram)
+    for i in range(1, len(sortedSegments)):
+        if sortedSegments[i].vram < sortedSegments[i-1].vramEnd:
+            return True
+    return False
+
 def addRelocatedSymbol(context: common.Context, symEntry: elf32.Elf32SymEntry, symName: str|None):
     if symEntry.value == 0:
         return
@@ -142,7 +170,8 @@ def addRelocatedSymbol(context: common.Context, symEntry: elf32.Elf32SymEntry, s
     if symName is not None:
         contextSym.name = symName
     contextSym.isUserDeclared = True
-    contextSym.setSizeIfUnset(symEntry.size)
+    if contextSym.setSizeIfUnset(symEntry.size):
+        context.symbolsChanged(contextSym.address)
 
 def insertSymtabIntoContext(context: common.Context, symbolTable: elf32.Elf32Syms, stringTable: elf32.Elf32StringTable, elfFile: elf32.Elf32File, processedSegments: dict[common.FileSectionType, mips.sections.SectionBase]):
     # Use the symbol table to replace symbol names present in disassembled sections
@@ -179,22 +208,74 @@ def insertDynsymIntoContext(context: common.Context, symbolTable: elf32.Elf32Sym
         addRelocatedSymbol(context, symEntry, symName)
 
 
+def getTextRelocAddends(elfFile: elf32.Elf32File, rels: elf32.Elf32Rels, words: list[int]) -> dict[int, int]:
+    """Computes the addend of the relocations of the text section, keyed by the offset of the relocated instruction.
+
+    The REL format stores the addend on the relocated instruction, and the addend of a %hi is split between its instruction and
+    the one of its %lo. Assemblers reorder the %hi relocations on the table, so the pairs are made in instruction order instead:
+    every %lo is paired with the previous %hi of the same symbol, and both get the addend of the whole pair.
+    Relocations of unhandled types and %hi relocations without a %lo are not included"""
+    addends: dict[int, int] = dict()
+    symtab = elfFile.symtab
+    if symtab is None:
+        return addends
+
+    pendingHis: dict[int, list[int]] = dict()
+    "Offsets of the %hi relocations which are waiting for their first %lo, per symbol index"
+    lastHiValues: dict[int, int] = dict()
+    "Upper half of the last %hi of each symbol index"
+
+    for offset, info in sorted(zip(rels.offsets, rels.infos)):
+        if offset % 4 != 0 or offset // 4 >= len(words):
+            continue
+        rSym = info >> 8
+        rType = mips.RelocTypes.fromValue(info & 0xFF)
+        word = words[offset // 4]
+        isLocal = rSym < len(symtab) and (symtab.infos[rSym] >> 4) == elf32.Elf32SymbolTableBinding.LOCAL.value
+
+        if rType == mips.RelocTypes.R_MIPS_HI16 or (rType == mips.RelocTypes.R_MIPS_GOT16 and isLocal):
+            pendingHis.setdefault(rSym, []).append(offset)
+            lastHiValues[rSym] = (word & 0xFFFF) << 16
+        elif rType == mips.RelocTypes.R_MIPS_LO16:
+            lowerHalf = rabbitizer.Utils.from2Complement(word & 0xFFFF, 16)
+            for hiOffset in pendingHis.pop(rSym, []):
+                addends[hiOffset] = ((words[hiOffset // 4] & 0xFFFF) << 16) + lowerHalf
+            addends[offset] = lastHiValues.get(rSym, 0) + lowerHalf
+        elif rType == mips.RelocTypes.R_MIPS_GPREL16:
+            addends[offset] = rabbitizer.Utils.from2Complement(word & 0xFFFF, 16)
+        elif rType in {mips.RelocTypes.R_MIPS_GOT16, mips.RelocTypes.R_MIPS_CALL16}:
+            # Global symbols don't have addends on the GOT
+            addends[offset] = 0
+        elif rType == mips.RelocTypes.R_MIPS_26:
+            target = (word & 0x3FFFFFF) << 2
+            if not isLocal:
+                target = rabbitizer.Utils.from2Complement(target, 28)
+            addends[offset] = target
+    return addends
+
 def injectAllElfSymbols(context: common.Context, elfFile: elf32.Elf32File, processedSegments: dict[common.FileSectionType, mips.sections.SectionBase]) -> None:
     if elfFile.symtab is not None and elfFile.strtab is not None:
         # Inject symbols from the reloc table referenced in each section
         if elfFile.header.type == elf32.Elf32ObjectFileType.REL.value:
             for sectType, relocs in elfFile.rel.items():
                 # subSection = processedFiles[sectType][1]
-                for rel in relocs:
-                    symbolEntry = elfFile.symtab[rel.rSym]
-                    symbolName = elfFile.strtab[symbolEntry.name]
+                addends: dict[int, int] = dict()
+                if common.GlobalConfig.RELOC_DRIVEN_ANALYSIS and sectType == common.FileSectionType.Text and sectType in processedSegments:
+                    addends = getTextRelocAddends(elfFile, relocs, processedSegments[sectType].words)
+
+                relocSymbols: list[tuple[int, common.ContextRelocSymbol]] = list()
+                for offset, info in zip(relocs.offsets, relocs.infos):
+                    symbolName = elfFile.strtab[elfFile.symtab.names[info >> 8]]
                     if symbolName == "":
                         continue
 
-                    contextRelocSym = common.ContextRelocSymbol(rel.offset, symbolName, sectType)
+                    contextRelocSym = common.ContextRelocSymbol(offset, symbolName, sectType)
                     contextRelocSym.isDefined = True
-                    contextRelocSym.relocType = rel.rType
-                    context.relocSymbols[sectType][rel.offset] = contextRelocSym
+                    contextRelocSym.relocType = info & 0xFF
+                    contextRelocSym.addend = addends.get(offset)
+                    relocSymbols.append((offset, contextRelocSym))
+                # The offsets are sorted once instead of on every insertion
+                context.relocSymbols[sectType].addMany(relocSymbols)
 
         # Use the symtab to replace symbol names present in disassembled sections
         insertSymtabIntoContext(context, elfFile.symtab, elfFile.strtab, elfFile, processedSegments)
@@ -222,27 +303,15 @@ def processGlobalOffsetTable(context: common.Context, elfFile: elf32.Elf32File)
     return
 
 
-def elfObjDisasmMain():
-    args = getArgsParser().parse_args()
-    applyArgs(args)
-
-    applyGlobalConfigurations()
-
+def disassembleElf(array_of_bytes: bytearray, inputPath: Path, textOutput: Path, dataOutput: Path, saveContextPath: Path|None=None, incrementalAnalysis: bool=False) -> None:
+    "Disassembles the elf file contained in `array_of_bytes`. `inputPath` is only used to name the output files"
     context = common.Context()
 
-    inputPath = Path(args.binary)
-    array_of_bytes = common.Utils.readFileAsBytearray(inputPath)
     elfFile = elf32.Elf32File(array_of_bytes)
 
     if elf32.Elf32HeaderFlag.PIC in elfFile.elfFlags or elf32.Elf32HeaderFlag.CPIC in elfFile.elfFlags:
         common.GlobalConfig.PIC = True
 
-    textOutput = Path(args.output)
-    if args.data_output is None:
-        dataOutput = textOutput
-    else:
-        dataOutput = Path(args.data_output)
-
     processedSegments, segmentPaths = getProcessedSections(context, elfFile, array_of_bytes, inputPath, textOutput, dataOutput)
 
     changeGlobalSegmentRanges(context, processedSegments)
@@ -251,13 +320,204 @@ def elfObjDisasmMain():
 
     for subSegment in processedSegments.values():
         subSegment.analyze()
+        if incrementalAnalysis:
+            subSegment.saveAnalysisDependencies()
         subSegment.printAnalyzisResults()
 
+    if incrementalAnalysis:
+        if sectionsShareAddresses(processedSegments):
+            common.Utils.eprint("Warning: The sections of this elf share addresses (probably a relocatable object), so they can't be analyzed incrementally")
+        else:
+            mips.FilesHandlers.reanalyzeDependents(list(processedSegments.values()))
+
+    for subSegment in processedSegments.values():
+        subSegment.defineLabels()
+
     for sectionType, subSegment in processedSegments.items():
         outputFilePath = segmentPaths[sectionType]
         mips.FilesHandlers.writeSection(outputFilePath, subSegment)
 
+    if saveContextPath is not None:
+        saveContextPath.parent.mkdir(parents=True, exist_ok=True)
+        context.saveContextToFile(saveContextPath)
+
+def disassembleElfFile(inputPath: Path, textOutput: Path, dataOutput: Path, saveContextPath: Path|None=None, incrementalAnalysis: bool=False) -> None:
+    array_of_bytes = common.Utils.readFileAsBytearray(inputPath)
+    disassembleElf(array_of_bytes, inputPath, textOutput, dataOutput, saveContextPath, incrementalAnalysis)
+
+
+def getBatchInputPaths(patterns: list[str]|None, listPath: str|None) -> list[Path]:
+    """Returns the paths matched by every glob pattern of `patterns` plus the paths listed by the file `listPath` ('-' means stdin).
+
+    The paths of each pattern are sorted. Paths found more than once are only returned the first time"""
+    paths: list[str] = list()
+
+    if patterns is not None:
+        for pattern in patterns:
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if len(matches) == 0:
+                common.Utils.eprint(f"Warning: No files matched the pattern '{pattern}'")
+            paths += matches
+
+    if listPath is not None:
+        if listPath == "-":
+            lines = sys.stdin.readlines()
+        else:
+            with open(listPath) as f:
+                lines = f.readlines()
+        paths += [line.strip() for line in lines if line.strip() != ""]
+
+    return [Path(path) for path in dict.fromkeys(paths)]
+
+def getBatchOutputDirectory(inputPath: Path, outputPath: Path) -> Path:
+    "Returns where the output of `inputPath` should be placed, keeping its relative directory. Absolute paths or paths outside the current directory are placed directly on `outputPath`"
+    if str(outputPath) == "-":
+        return outputPath
+    if inputPath.is_absolute() or ".." in inputPath.parts:
+        return outputPath
+    return outputPath / inputPath.parent
+
+
+@dataclasses.dataclass
+class _BatchTask:
+    inputPath: Path
+    "Path used to name the output. For archive members it is the archive path without its extension, followed by the member name"
+    textOutput: Path
+    dataOutput: Path
+    saveContextPath: Path|None
+    incrementalAnalysis: bool
+
+    archivePath: Path|None = None
+    archiveMember: elf32.ArArchiveMember|None = None
+
+    def getName(self) -> str:
+        if self.archivePath is not None and self.archiveMember is not None:
+            return f"{self.archivePath}({self.archiveMember.name})"
+        return str(self.inputPath)
+
+    def run(self) -> None:
+        if self.archivePath is not None and self.archiveMember is not None:
+            # The archive is mapped instead of read, so only this member is copied out of it. The elf parsing and the sections work on bytearrays
+            array_of_bytes = elf32.ArArchive.mapFile(self.archivePath)
+            memberBytes = bytearray(memoryview(array_of_bytes)[self.archiveMember.offset:self.archiveMember.offset + self.archiveMember.size])
+            disassembleElf(memberBytes, self.inputPath, self.textOutput, self.dataOutput, self.saveContextPath, self.incrementalAnalysis)
+        else:
+            disassembleElfFile(self.inputPath, self.textOutput, self.dataOutput, self.saveContextPath, self.incrementalAnalysis)
+
+
+_batchSettings: dict[str, Any] = dict()
+"Configuration of the batch worker processes, restored before disassembling each file"
+
+def _disassembleBatchFile(task: _BatchTask, settings: dict[str, Any]) -> str|None:
+    "Returns the error which made the disassembly fail, if any"
+    # Each file may change the configuration, like the endianness or the PIC mode
+    common.GlobalConfig.setSettings(settings)
+    try:
+        task.run()
+    except (Exception, SystemExit) as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+def _initBatchWorker(globalConfigSettings: dict[str, Any], instructionConfigSettings: dict[str, Any]) -> None:
+    global _batchSettings
+
+    _batchSettings = globalConfigSettings
+    mips.InstructionConfig.setSettings(instructionConfigSettings)
+
+def _disassembleBatchFileWorker(task: _BatchTask) -> str|None:
+    return _disassembleBatchFile(task, _batchSettings)
+
+def disassembleBatch(inputPaths: list[Path], textOutput: Path, dataOutput: Path, saveContextPath: Path|None=None, incrementalAnalysis: bool=False, jobs: int=1) -> int:
+    """Disassembles every file of `inputPaths`, each one with its own context.
+
+    Every member of the ar archives (static libraries) of `inputPaths` is disassembled without extracting them,
+    their output is placed in a directory named like the archive without its extension.
+
+    The errors are reported in the same order as `inputPaths`, a failed file doesn't stop the rest of them.
+    Archives which can't be read are reported before disassembling anything.
+    Returns the amount of files which failed"""
+    failedCount = 0
+
+    tasks: list[_BatchTask] = list()
+    for inputPath in inputPaths:
+        archive: elf32.ArArchive|None = None
+        if elf32.ArArchive.isArchiveFile(inputPath):
+            try:
+                archive = elf32.ArArchive.fromFile(inputPath)
+            except ValueError as e:
+                common.Utils.eprint(f"Error: Failed to read the archive '{inputPath}': {e}")
+                failedCount += 1
+                continue
+
+        if archive is None:
+            taskInputs: list[tuple[Path, elf32.ArArchiveMember|None]] = [(inputPath, None)]
+        else:
+            taskInputs = [(inputPath.with_suffix("") / member.name, member) for member in archive]
+
+        for taskInputPath, member in taskInputs:
+            contextPath = None
+            if saveContextPath is not None:
+                contextPath = getBatchOutputDirectory(taskInputPath, saveContextPath) / (taskInputPath.stem + ".csv")
+            task = _BatchTask(taskInputPath, getBatchOutputDirectory(taskInputPath, textOutput), getBatchOutputDirectory(taskInputPath, dataOutput), contextPath, incrementalAnalysis)
+            if member is not None:
+                task.archivePath = inputPath
+                task.archiveMember = member
+            tasks.append(task)
+
+    settings = common.GlobalConfig.getSettings()
+    if str(textOutput) == "-" or str(dataOutput) == "-":
+        # Keep the output of each file together
+        jobs = 1
+
+    executor: concurrent.futures.ProcessPoolExecutor|None = None
+    try:
+        if jobs > 1 and len(tasks) > 1:
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=_initBatchWorker, initargs=(settings, mips.InstructionConfig.getSettings()))
+            results = executor.map(_disassembleBatchFileWorker, tasks)
+        else:
+            results = (_disassembleBatchFile(task, settings) for task in tasks)
+
+        for task, error in zip(tasks, results):
+            if error is not None:
+                common.Utils.eprint(f"Error: Failed to disassemble '{task.getName()}': {error}")
+                failedCount += 1
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+        common.GlobalConfig.setSettings(settings)
+
+    if failedCount > 0:
+        common.Utils.eprint(f"{failedCount} out of {len(tasks)} files failed to be disassembled")
+    return failedCount
+
+
+def elfObjDisasmMain():
+    parser = getArgsParser()
+    args = parser.parse_args()
+    applyArgs(args)
+
+    applyGlobalConfigurations()
+
+    textOutput = Path(args.output)
+    if args.data_output is None:
+        dataOutput = textOutput
+    else:
+        dataOutput = Path(args.data_output)
+
+    saveContextPath = None
     if args.save_context is not None:
-        contextPath = Path(args.save_context)
-        contextPath.parent.mkdir(parents=True, exist_ok=True)
-        context.saveContextToFile(contextPath)
+        saveContextPath = Path(args.save_context)
+
+    if args.batch is not None or args.batch_list is not None or (args.binary is not None and elf32.ArArchive.isArchiveFile(Path(args.binary))):
+        # Archives are always disassembled in batch mode, since they contain many files
+        inputPaths = getBatchInputPaths(args.batch, args.batch_list)
+        if args.binary is not None:
+            inputPaths.insert(0, Path(args.binary))
+        if disassembleBatch(inputPaths, textOutput, dataOutput, saveContextPath, args.incremental_analysis, args.jobs) > 0:
+            exit(1)
+        return
+
+    if args.binary is None:
+        parser.error("the input binary is required unless the batch mode is used")
+
+    disassembleElfFile(Path(args.binary), textOutput, dataOutput, saveContextPath, args.incremental_analysis)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import concurrent.futures
+from typing import Callable
+
+from .. import common
+
+from . import sections
+
+
+class AnalysisScheduler:
+    """Analyzes the sections of a split file, prefetching the analysis of the next text sections on a pool of processes.
+
+    Every section is analyzed in this thread, one at a time and in the order of `processedFiles`, since analyzing a section modifies the context
+    and the sections of each type depend on the symbols and pointers found by the ones before them. This keeps the output the same regardless of `jobs`.
+
+    If `jobs` is bigger than 1 then the next text sections are prefetched speculatively:
+    while a section is being analyzed, the function boundaries of the next ones are guessed and their functions are analyzed on a pool of processes
+    shared by every section (see `SectionText.startSpeculativeAnalysis`). A section only uses the guessed analysis of the functions whose range
+    matches the final one. Big text sections use the same pool to analyze their own functions in parallel.
+    """
+
+    def __init__(self, processedFiles: dict[common.FileSectionType, list[sections.SectionBase]], jobs: int=1, chunkedBoundaryDetection: bool=False):
+        self.processedFiles = processedFiles
+
+        self.jobs: int = jobs
+        "Amount of worker processes used by the analysis"
+        self.chunkedBoundaryDetection: bool = chunkedBoundaryDetection
+        "Passed to every text section, see `SectionText.chunkedBoundaryDetection`"
+
+
+    def analyze(self, preAnalysisCallback: Callable[[common.FileSectionType, int], None]|None=None, postAnalysisCallback: Callable[[common.FileSectionType, int], None]|None=None) -> None:
+        """Analyzes every section of `processedFiles`, in order.
+
+        The callbacks receive the section type and the index on `processedFiles` of each section, right before and right after analyzing it"""
+        executor: concurrent.futures.ProcessPoolExecutor|None = None
+        if self.jobs > 1:
+            textSections = [section for filesInSection in self.processedFiles.values() for section in filesInSection if isinstance(section, sections.SectionText)]
+            if len(textSections) > 0:
+                executor = sections.SectionText.createAnalysisExecutor(self.jobs, textSections[0].context)
+
+        try:
+            sectionsList = [(sectionType, fileIndex) for sectionType, filesInSection in self.processedFiles.items() for fileIndex in range(len(filesInSection))]
+            self._analyzeWithPrefetch(sectionsList, executor, preAnalysisCallback, postAnalysisCallback)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def _analyzeWithPrefetch(self, sectionsList: list[tuple[common.FileSectionType, int]], executor: concurrent.futures.Executor|None, preAnalysisCallback: Callable[[common.FileSectionType, int], None]|None, postAnalysisCallback: Callable[[common.FileSectionType, int], None]|None) -> None:
+        """Analyzes the sections of `sectionsList` one after the other, in order.
+
+        If an `executor` is passed then the speculative analysis of the next text sections is started before analyzing each section"""
+        # Guessing too far ahead makes the guesses less accurate, since they don't see the symbols found by the sections analyzed in between
+        lookahead = self.jobs * 2
+        speculated = 0
+
+        for i, (sectionType, fileIndex) in enumerate(sectionsList):
+            section = self.processedFiles[sectionType][fileIndex]
+
+            if executor is not None:
+                while speculated < min(i + 1 + lookahead, len(sectionsList)):
+                    nextType, nextIndex = sectionsList[speculated]
+                    nextSection = self.processedFiles[nextType][nextIndex]
+                    if isinstance(nextSection, sections.SectionText):
+                        nextSection.startSpeculativeAnalysis(executor)
+                    speculated += 1
+
+            if preAnalysisCallback is not None:
+                preAnalysisCallback(sectionType, fileIndex)
+
+            if isinstance(section, sections.SectionText):
+                section.jobs = self.jobs
+                section.chunkedBoundaryDetection = self.chunkedBoundaryDetection
+                section.executor = executor
+                try:
+                    section.analyze()
+                finally:
+                    # The pool is shut down after the analysis, so analyzing this section again has to create its own
+                    section.executor = None
+            else:
+                section.analyze()
+
+            if postAnalysisCallback is not None:
+                postAnalysisCallback(sectionType, fileIndex)
@@ -5,7 +5,10 @@
 
 from __future__ import annotations
 
-from typing import TextIO
+import concurrent.futures
+import io
+import multiprocessing
+from typing import Callable, Sequence, TextIO
 from pathlib import Path
 
 import rabbitizer
@@ -52,22 +55,78 @@ def createSectionFromSplitEntry(splitEntry: common.FileSplitEntry, array_of_byte
 
     return f
 
-def writeSection(path: Path, fileSection: sections.SectionBase):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    fileSection.saveToFile(str(path))
+def reanalyzeDependents(sectionsList: list[sections.SectionBase], maxPasses: int=16) -> int:
+    """Analyzes again the sections, or only the symbols of them, which depend on parts of the context that changed after they
+    were analyzed. This is repeated until nothing changes or `maxPasses` is reached.
+
+    `saveAnalysisDependencies` must have been called right after analyzing each section.
+    Each pass only takes again the snapshots whose recorded address ranges contain an address which changed since the previous pass.
+
+    Returns the amount of passes which analyzed anything again."""
+    if len(sectionsList) == 0:
+        return 0
+
+    context = sectionsList[0].context
+    passes = 0
+    while passes < maxPasses:
+        changedAddresses = context.popChangedAddresses()
+        if changedAddresses is not None and len(changedAddresses) == 0:
+            break
+
+        wasReanalyzed = False
+        for section in sectionsList:
+            wasReanalyzed = section.reanalyzeDependents(changedAddresses) or wasReanalyzed
+        if not wasReanalyzed:
+            break
+        passes += 1
+    return passes
+
+
+_renderCallbacks: Sequence[Callable[[], str]] = list()
+"Callbacks of the current `renderInParallel` call. Forked workers inherit them instead of receiving them pickled"
+
+def _renderCallbackWorker(index: int) -> str:
+    return _renderCallbacks[index]()
+
+def renderInParallel(renderCallbacks: Sequence[Callable[[], str]], jobs: int) -> list[str]:
+    """Calls every callback of `renderCallbacks` and returns their results in the same order.
+
+    The callbacks are run by `jobs` forked processes, which inherit the analyzed sections and the context instead of receiving them pickled.
+    This relies on rendering not modifying the context, so `defineLabels` must have been called on every analyzed section beforehand.
+
+    Forking a process with running threads may deadlock, so this should not be called while an `OutputWriter` has pending writes.
+
+    Renders sequentially if `jobs` is 1 or less or if the platform can't fork processes."""
+    global _renderCallbacks
+
+    if jobs <= 1 or len(renderCallbacks) <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return [callback() for callback in renderCallbacks]
+
+    _renderCallbacks = renderCallbacks
+    try:
+        # Small chunks keep the workers balanced, since the size of the sections and functions varies a lot
+        chunksize = max(1, len(renderCallbacks) // (jobs * 8))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("fork")) as executor:
+            return list(executor.map(_renderCallbackWorker, range(len(renderCallbacks)), chunksize=chunksize))
+    finally:
+        _renderCallbacks = list()
+
+
+def writeSection(path: Path, fileSection: sections.SectionBase, writer: common.OutputWriter|None=None, renderedContents: str|None=None):
+    if writer is not None:
+        writer.makeDirectory(path.parent)
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    fileSection.saveToFile(str(path), writer, renderedContents)
     return path
 
 
-def getRdataAndLateRodataForFunctionFromSection(func: symbols.SymbolFunction, rodataSection: sections.SectionRodata) -> tuple[list[symbols.SymbolBase], list[symbols.SymbolBase], int]:
+def _filterRodataForFunction(rodataSymbols: list[symbols.SymbolBase]) -> tuple[list[symbols.SymbolBase], list[symbols.SymbolBase], int]:
     rdataList: list[symbols.SymbolBase] = []
     lateRodataList: list[symbols.SymbolBase] = []
     lateRodataSize = 0
 
-    intersection = func.instrAnalyzer.referencedVrams & rodataSection.symbolsVRams
-    for rodataSym in rodataSection.symbolList:
-        if rodataSym.vram not in intersection:
-            continue
-
+    for rodataSym in rodataSymbols:
         # We only care for rodata that's used once
         if rodataSym.contextSym.referenceCounter != 1:
             if common.GlobalConfig.COMPILER == common.Compiler.IDO:
@@ -88,7 +147,14 @@ def getRdataAndLateRodataForFunctionFromSection(func: symbols.SymbolFunction, ro
 
     return rdataList, lateRodataList, lateRodataSize
 
-def getRdataAndLateRodataForFunction(func: symbols.SymbolFunction, rodataFileList: list[sections.SectionRodata]) -> tuple[list[symbols.SymbolBase], list[symbols.SymbolBase], int]:
+def getRdataAndLateRodataForFunctionFromSection(func: symbols.SymbolFunction, rodataSection: sections.SectionRodata) -> tuple[list[symbols.SymbolBase], list[symbols.SymbolBase], int]:
+    intersection = func.instrAnalyzer.referencedVrams & rodataSection.symbolsVRams
+    return _filterRodataForFunction([rodataSym for rodataSym in rodataSection.symbolList if rodataSym.vram in intersection])
+
+def getRdataAndLateRodataForFunction(func: symbols.SymbolFunction, rodataFileList: list[sections.SectionRodata], rodataIndex: RodataMigrationIndex|None=None) -> tuple[list[symbols.SymbolBase], list[symbols.SymbolBase], int]:
+    if rodataIndex is not None:
+        return rodataIndex.getRdataAndLateRodataForFunction(func)
+
     rdataList: list[symbols.SymbolBase] = []
     lateRodataList: list[symbols.SymbolBase] = []
     lateRodataSize = 0
@@ -107,6 +173,67 @@ def getRdataAndLateRodataForFunction(func: symbols.SymbolFunction, rodataFileLis
 
     return rdataList, lateRodataList, lateRodataSize
 
+
+class RodataMigrationIndex:
+    """Index between the functions and the rodata symbols they reference.
+
+    It is built once after the analysis and answers the same queries as `getRdataAndLateRodataForFunction`,
+    without intersecting the referenced addresses of each function with every rodata section.
+    """
+
+    def __init__(self, textFileList: list[sections.SectionBase], rodataFileList: list[sections.SectionRodata]):
+        self.rodataFileList = rodataFileList
+
+        self.rodataPerVram: dict[int, list[tuple[int, int]]] = dict()
+        "Key is the vram of a rodata symbol, value is a list of (section index, symbol index) of the rodata symbols with that vram"
+
+        for sectionIndex, rodataSection in enumerate(rodataFileList):
+            for symbolIndex, rodataSym in enumerate(rodataSection.symbolList):
+                if rodataSym.vram not in rodataSection.symbolsVRams:
+                    continue
+                self.rodataPerVram.setdefault(rodataSym.vram, []).append((sectionIndex, symbolIndex))
+
+        self.rodataPerFunction: dict[symbols.SymbolFunction, tuple[list[symbols.SymbolBase], list[symbols.SymbolBase], int]] = dict()
+        "The rodata symbols migrated to each function, as returned by `getRdataAndLateRodataForFunction`"
+
+        self.functionsPerRodata: dict[symbols.SymbolBase, list[symbols.SymbolFunction]] = dict()
+        "The functions each rodata symbol is migrated to"
+
+        for textSection in textFileList:
+            for func in textSection.symbolList:
+                assert isinstance(func, symbols.SymbolFunction)
+                rodataForFunction = self._findRodataForFunction(func)
+                self.rodataPerFunction[func] = rodataForFunction
+                for rodataSym in rodataForFunction[0] + rodataForFunction[1]:
+                    self.functionsPerRodata.setdefault(rodataSym, []).append(func)
+
+    def _findRodataForFunction(self, func: symbols.SymbolFunction) -> tuple[list[symbols.SymbolBase], list[symbols.SymbolBase], int]:
+        symbolsIndicesPerSection: dict[int, list[int]] = dict()
+        for vram in func.instrAnalyzer.referencedVrams:
+            for sectionIndex, symbolIndex in self.rodataPerVram.get(vram, []):
+                symbolsIndicesPerSection.setdefault(sectionIndex, []).append(symbolIndex)
+
+        # Use the first section which has anything to migrate, same as `getRdataAndLateRodataForFunction`
+        for sectionIndex in sorted(symbolsIndicesPerSection.keys()):
+            symbolList = self.rodataFileList[sectionIndex].symbolList
+            result = _filterRodataForFunction([symbolList[symbolIndex] for symbolIndex in sorted(symbolsIndicesPerSection[sectionIndex])])
+            if len(result[0]) > 0 or len(result[1]) > 0:
+                return result
+
+        return [], [], 0
+
+    def getRdataAndLateRodataForFunction(self, func: symbols.SymbolFunction) -> tuple[list[symbols.SymbolBase], list[symbols.SymbolBase], int]:
+        rodataForFunction = self.rodataPerFunction.get(func, None)
+        if rodataForFunction is None:
+            # Not part of the indexed sections
+            rodataForFunction = self._findRodataForFunction(func)
+        return rodataForFunction
+
+    def getFunctionsForRodata(self, rodataSym: symbols.SymbolBase) -> list[symbols.SymbolFunction]:
+        "Returns the functions this rodata symbol is migrated to"
+        return self.functionsPerRodata.get(rodataSym, [])
+
+
 def writeFunctionRodataToFile(f: TextIO, func: symbols.SymbolFunction, rdataList: list[symbols.SymbolBase], lateRodataList: list[symbols.SymbolBase], lateRodataSize: int):
     if len(rdataList) > 0:
         # Write the rdata
@@ -132,27 +259,42 @@ def writeFunctionRodataToFile(f: TextIO, func: symbols.SymbolFunction, rdataList
     if len(rdataList) > 0 or len(lateRodataList) > 0:
         f.write(common.GlobalConfig.LINE_ENDS + ".section .text" + common.GlobalConfig.LINE_ENDS)
 
-def writeSplitedFunction(path: Path, func: symbols.SymbolFunction, rodataFileList: list[sections.SectionRodata]):
-    path.mkdir(parents=True, exist_ok=True)
+def renderSplitedFunction(func: symbols.SymbolFunction, rodataFileList: list[sections.SectionRodata], rodataIndex: RodataMigrationIndex|None=None) -> str:
+    "Returns the contents `writeSplitedFunction` writes for `func`"
+    f = io.StringIO()
+    _writeSplitedFunctionToFile(f, func, rodataFileList, rodataIndex)
+    return f.getvalue()
+
+def writeSplitedFunction(path: Path, func: symbols.SymbolFunction, rodataFileList: list[sections.SectionRodata], rodataIndex: RodataMigrationIndex|None=None, writer: common.OutputWriter|None=None, renderedContents: str|None=None):
+    if writer is not None:
+        writer.makeDirectory(path)
+    else:
+        path.mkdir(parents=True, exist_ok=True)
 
     funcPath = path / (func.getName()+ ".s")
-    with funcPath.open("w") as f:
-        rdataList, lateRodataList, lateRodataSize = getRdataAndLateRodataForFunction(func, rodataFileList)
-        writeFunctionRodataToFile(f, func, rdataList, lateRodataList, lateRodataSize)
+    if renderedContents is None:
+        renderedContents = renderSplitedFunction(func, rodataFileList, rodataIndex)
+    common.OutputWriter.writeOutputFile(writer, funcPath, renderedContents)
 
-        # Write the function itself
-        f.write(func.disassemble())
+def _writeSplitedFunctionToFile(f: TextIO, func: symbols.SymbolFunction, rodataFileList: list[sections.SectionRodata], rodataIndex: RodataMigrationIndex|None):
+    rdataList, lateRodataList, lateRodataSize = getRdataAndLateRodataForFunction(func, rodataFileList, rodataIndex)
+    writeFunctionRodataToFile(f, func, rdataList, lateRodataList, lateRodataSize)
 
-def writeOtherRodata(path: Path, rodataFileList: list[sections.SectionRodata]):
+    # Write the function itself
+    f.write(func.disassemble())
+
+def writeOtherRodata(path: Path, rodataFileList: list[sections.SectionRodata], writer: common.OutputWriter|None=None):
     for rodataSection in rodataFileList:
         rodataPath = path / rodataSection.name
-        rodataPath.mkdir(parents=True, exist_ok=True)
+        if writer is not None:
+            writer.makeDirectory(rodataPath)
+        else:
+            rodataPath.mkdir(parents=True, exist_ok=True)
 
         for rodataSym in rodataSection.symbolList:
             if not rodataSym.isRdata():
                 continue
 
             rodataSymbolPath = rodataPath / (rodataSym.getName() + ".s")
-            with rodataSymbolPath.open("w") as f:
-                f.write(".section .rdata" + common.GlobalConfig.LINE_ENDS)
-                f.write(rodataSym.disassemble())
+            contents = ".section .rdata" + common.GlobalConfig.LINE_ENDS + rodataSym.disassemble()
+            common.OutputWriter.writeOutputFile(writer, rodataSymbolPath, contents)
@@ -6,6 +6,7 @@
 from __future__ import annotations
 
 import argparse
+from typing import Any
 import rabbitizer
 
 from ..common import Utils
@@ -77,3 +78,27 @@ class InstructionConfig:
 
         if args.unk_instr_comment is not None:
             rabbitizer.config.misc_unknownInstrComment = args.unk_instr_comment
+
+
+    @staticmethod
+    def getSettings() -> dict[str, Any]:
+        """Returns a snapshot of the current `rabbitizer.config`, which can be restored later with `setSettings`.
+
+        Useful to replicate the current configuration on worker processes."""
+        settings: dict[str, Any] = dict()
+        for name in dir(rabbitizer.config):
+            if name.startswith("_"):
+                continue
+            value = getattr(rabbitizer.config, name)
+            if isinstance(value, rabbitizer.Enum):
+                # Store the abi name instead of the enum itself so it can be pickled
+                value = value.name.lower()
+            settings[name] = value
+        return settings
+
+    @staticmethod
+    def setSettings(settings: dict[str, Any]) -> None:
+        for name, value in settings.items():
+            if isinstance(value, str):
+                value = rabbitizer.Abi.fromStr(value)
+            setattr(rabbitizer.config, name, value)
@@ -5,6 +5,7 @@
 
 from __future__ import annotations
 
+import io
 import sys
 from typing import TextIO
 from pathlib import Path
@@ -57,6 +58,41 @@ class FileBase(common.ElementBase):
         return common.Utils.getStrHash(buffer)
 
 
+    def getAnalysisDependencies(self) -> tuple:
+        "The symbols and the pointers found in data which are inside the address range of this file"
+        symbolsInRange = tuple((vram, contextSym.size, contextSym.type, contextSym.vromAddress, contextSym.isUserDeclared) for vram, contextSym in self.getSymbolsRange(self.vram, self.vramEnd))
+        pointersInRange = tuple(self.getPointerInDataReferencesRange(self.vram, self.vramEnd))
+        return (symbolsInRange, pointersInRange)
+
+    def getAnalysisDependencyRanges(self) -> list[tuple[int, int]]:
+        return [(self.vram, self.vramEnd)]
+
+    def saveAnalysisDependencies(self) -> None:
+        super().saveAnalysisDependencies()
+        for sym in self.symbolList:
+            sym.saveAnalysisDependencies()
+
+    def resetAnalysis(self) -> None:
+        super().resetAnalysis()
+        for sym in self.symbolList:
+            sym.resetAnalysis()
+        self.symbolList = []
+        self.fileBoundaries = []
+        self.symbolsVRams = set()
+
+    def reanalyzeDependents(self, changedAddresses: common.SortedSet|None=None) -> bool:
+        """Analyzes the whole file again if needed. Otherwise only its symbols which need it are analyzed again.
+
+        Returns `True` if anything was analyzed again."""
+        if super().reanalyzeDependents(changedAddresses):
+            return True
+
+        wasReanalyzed = False
+        for sym in self.symbolList:
+            wasReanalyzed = sym.reanalyzeDependents(changedAddresses) or wasReanalyzed
+        return wasReanalyzed
+
+
     def checkAndCreateFirstSymbol(self) -> None:
         "Check if the very start of the file has a symbol and create it if it doesn't exist yet"
 
@@ -151,6 +187,13 @@ class FileBase(common.ElementBase):
 
         return False
 
+    def defineLabels(self) -> None:
+        """Marks the labels of every symbol of this file as defined.
+
+        Must be called after every section has been analyzed. Rendering doesn't modify the context afterwards, so files can be rendered in parallel"""
+        for sym in self.symbolList:
+            sym.defineLabels()
+
 
     def disassemble(self) -> str:
         output = ""
@@ -167,20 +210,34 @@ class FileBase(common.ElementBase):
         f.write(self.disassemble())
 
 
-    def saveToFile(self, filepath: str):
+    def render(self) -> str:
+        "Returns the same text `disassembleToFile` writes"
+        contents = io.StringIO()
+        self.disassembleToFile(contents)
+        return contents.getvalue()
+
+    def saveToFile(self, filepath: str, writer: common.OutputWriter|None=None, renderedContents: str|None=None):
+        """Disassembles this file to `filepath` plus the section's extension.
+
+        If a `writer` is passed then the file is only rendered here and written in the background by it.
+        `renderedContents` can be used to pass the result of an earlier call to `render`, i.e. from `FilesHandlers.renderInParallel`"""
         if len(self.symbolList) == 0:
             return
 
         if filepath == "-":
-            self.disassembleToFile(sys.stdout)
+            if renderedContents is not None:
+                sys.stdout.write(renderedContents)
+            else:
+                self.disassembleToFile(sys.stdout)
         else:
             if common.GlobalConfig.WRITE_BINARY:
                 if self.sizew > 0:
                     buffer = bytearray(4*len(self.words))
                     common.Utils.wordsToBytes(self.words, buffer)
-                    common.Utils.writeBytearrayToFile(Path(filepath + self.sectionType.toStr()), buffer)
-            with open(filepath + self.sectionType.toStr() + ".s", "w") as f:
-                self.disassembleToFile(f)
+                    common.OutputWriter.writeOutputFile(writer, Path(filepath + self.sectionType.toStr()), bytes(buffer))
+            if renderedContents is None:
+                renderedContents = self.render()
+            common.OutputWriter.writeOutputFile(writer, Path(filepath + self.sectionType.toStr() + ".s"), renderedContents)
 
 
 def createEmptyFile() -> FileBase:
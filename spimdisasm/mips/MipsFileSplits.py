@@ -179,9 +179,19 @@ class FileSplits(FileBase):
 
         return was_updated
 
-    def saveToFile(self, filepath: str):
+    def defineLabels(self) -> None:
+        for sectDict in self.sectionsDict.values():
+            for section in sectDict.values():
+                section.defineLabels()
+
+    def saveToFile(self, filepath: str, writer: common.OutputWriter|None=None, renderedContents: str|None=None):
+        "`renderedContents` can only be passed if this file has a single section, since it is the rendered contents of that section"
+        if renderedContents is not None:
+            sectionsCount = sum(len(sectDict) for sectDict in self.sectionsDict.values())
+            if sectionsCount > 1:
+                raise ValueError(f"A single rendered contents was passed for the {sectionsCount} sections of {filepath}")
         for sectDict in self.sectionsDict.values():
             for name, section in sectDict.items():
                 if name != "" and not filepath.endswith("/"):
                     name = " " + name
-                section.saveToFile(filepath + name)
+                section.saveToFile(filepath + name, writer, renderedContents)
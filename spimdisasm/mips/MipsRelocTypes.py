@@ -15,6 +15,9 @@ class RelocTypes(enum.Enum):
     R_MIPS_26    = 4
     R_MIPS_HI16  = 5
     R_MIPS_LO16  = 6
+    R_MIPS_GPREL16 = 7
+    R_MIPS_GOT16 = 9
+    R_MIPS_CALL16 = 11
 
 
     @staticmethod
@@ -27,4 +30,10 @@ class RelocTypes(enum.Enum):
             return RelocTypes.R_MIPS_HI16
         if value == 6:
             return RelocTypes.R_MIPS_LO16
+        if value == 7:
+            return RelocTypes.R_MIPS_GPREL16
+        if value == 9:
+            return RelocTypes.R_MIPS_GOT16
+        if value == 11:
+            return RelocTypes.R_MIPS_CALL16
         return RelocTypes.INVALID
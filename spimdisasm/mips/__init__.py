@@ -10,6 +10,8 @@ from . import symbols
 
 from . import FilesHandlers
 
+from .AnalysisScheduler import AnalysisScheduler
+
 from .InstructionConfig import InstructionConfig
 from .MipsFileBase import FileBase, createEmptyFile
 from .MipsFileSplits import FileSplits
@@ -47,13 +47,8 @@ class SectionBss(SectionBase):
                 self.addSymbol(ptr, sectionType=self.sectionType, isAutogenerated=True)
 
 
-        offsetSymbolsInSection = self.context.offsetSymbols[common.FileSectionType.Bss]
         bssSymbolOffsets: set[int] = set()
-        for offset in offsetSymbolsInSection.keys():
-            if offset < self.vromStart:
-                continue
-            if offset >= self.vromEnd:
-                continue
+        for offset, _ in self.context.getOffsetSymbolsRange(common.FileSectionType.Bss, self.vromStart, self.vromEnd):
             bssSymbolOffsets.add(offset - self.vromStart)
 
         for symbolVram, contextSym in self.getSymbolsRange(self.bssVramStart, self.bssVramEnd):
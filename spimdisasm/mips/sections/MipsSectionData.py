@@ -29,43 +29,64 @@ class SectionData(SectionBase):
 
         needsFurtherAnalyzis = False
 
-        for w in self.words:
-            currentVram = self.getVramOffset(localOffset)
+        wordsVrams = [self.getVramOffset(4*i) for i in range(len(self.words))]
+        wordsSymbols = self.getSymbolsBatch(wordsVrams, tryPlusOffset=False)
 
-            contextSym = self.getSymbol(currentVram, tryPlusOffset=False)
+        # Every word which may be a pointer is found with a single mask over the words of this section, and resolved at once
+        pointersIndices = [i for i in common.Utils.getWordsIndicesInRange(self.words, max(self.vram, 0x80000001), 0x84000000) if self.words[i] not in self.context.bannedSymbols]
+        pointersSymbols = self.getSymbolsBatch([self.words[i] for i in pointersIndices], tryPlusOffset=True, checkUpperLimit=True)
+        wordsPointedSymbols: dict[int, common.ContextSymbol|None] = dict(zip(pointersIndices, pointersSymbols))
+
+        # The pointers found by this section are only consumed by this section until its analysis finishes,
+        # so they are kept here and inserted in bulk at the end
+        newPointers: set[int] = set()
+
+        # The batched results don't know about the symbols added by this loop, so look them up again if they may be affected
+        firstAddedVram: int|None = None
+
+        for i, w in enumerate(self.words):
+            currentVram = wordsVrams[i]
+
+            contextSym = wordsSymbols[i]
             if contextSym is not None:
                 symbolList.append((localOffset, contextSym))
-            elif self.popPointerInDataReference(currentVram) is not None:
+            elif self._popNewPointer(newPointers, currentVram):
                 if common.GlobalConfig.ADD_NEW_SYMBOLS:
                     contextSym = self.addSymbol(currentVram, self.sectionType, isAutogenerated=True)
                     symbolList.append((localOffset, contextSym))
+                    if firstAddedVram is None:
+                        firstAddedVram = currentVram
 
-            if w >= self.vram and w > 0x80000000 and w < 0x84000000:
-                if w not in self.context.bannedSymbols:
-                    if self.getSymbol(w, tryPlusOffset=True, checkUpperLimit=True) is None:
-                        self.addPointerInDataReference(w)
+            if i in wordsPointedSymbols:
+                pointedSym = wordsPointedSymbols[i]
+                if pointedSym is None and firstAddedVram is not None and w >= firstAddedVram:
+                    pointedSym = self.getSymbol(w, tryPlusOffset=True, checkUpperLimit=True)
+                if pointedSym is None:
+                    newPointers.add(w)
 
-                        if w < currentVram and self.containsVram(w):
-                            # References a data symbol from this section and it is behind this current symbol
-                            needsFurtherAnalyzis = True
+                    if w < currentVram and self.containsVram(w):
+                        # References a data symbol from this section and it is behind this current symbol
+                        needsFurtherAnalyzis = True
 
             localOffset += 4
 
         if needsFurtherAnalyzis:
-            localOffset = 0
-            for w in self.words:
-                currentVram = self.getVramOffset(localOffset)
+            # Only the words pointed by the new pointers of this section need to be revisited
+            wordsVramEnd = self.vram + 4*len(self.words)
+            for currentVram in sorted(newPointers):
+                if currentVram < self.vram or currentVram >= wordsVramEnd or (currentVram - self.vram) % 4 != 0:
+                    continue
 
                 contextSym = self.getSymbol(currentVram, tryPlusOffset=True, checkUpperLimit=True)
-                if contextSym is None and self.popPointerInDataReference(currentVram) is not None:
+                if contextSym is None and self._popNewPointer(newPointers, currentVram):
                     if common.GlobalConfig.ADD_NEW_SYMBOLS:
                         contextSym = self.addSymbol(currentVram, self.sectionType, isAutogenerated=True)
-                        symbolList.append((localOffset, contextSym))
-
-                localOffset += 4
+                        symbolList.append((currentVram - self.vram, contextSym))
 
             symbolList.sort()
 
+        self.addPointersInDataReferences(newPointers)
+
         for i, (offset, contextSym) in enumerate(symbolList):
             if i + 1 == len(symbolList):
                 words = self.words[offset//4:]
@@ -84,6 +105,15 @@ class SectionData(SectionBase):
             self.symbolsVRams.add(contextSym.vram)
 
 
+    def _popNewPointer(self, newPointers: set[int], vram: int) -> bool:
+        "Pops `vram` from the pointers found by this section and from the already known pointers. Returns `True` if it was on any of them"
+        popped = self.popPointerInDataReference(vram) is not None
+        if vram in newPointers:
+            newPointers.remove(vram)
+            popped = True
+        return popped
+
+
     def removePointers(self) -> bool:
         if not common.GlobalConfig.REMOVE_POINTERS:
             return False
@@ -27,6 +27,9 @@ class SectionRodata(SectionBase):
 
         self.stringEncoding: str = "EUC-JP"
 
+        self._referencedJumpTableLabels: list[common.ContextSymbol] = list()
+        "Jump table labels whose references were counted by the analysis of this section"
+
 
     def _stringGuesser(self, contextSym: common.ContextSymbol, localOffset: int) -> bool:
         if contextSym.isMaybeString or contextSym.isString():
@@ -68,10 +71,10 @@ class SectionRodata(SectionBase):
             return
 
         # Process reloc symbols (probably from a .elf file)
-        inFileOffset = self.inFileOffset
-        for w in self.words:
-            relocSymbol = self.context.getRelocSymbol(inFileOffset, self.sectionType)
-            if relocSymbol is not None:
+        # Only the relocated words are visited
+        for inFileOffset, relocSymbol in self.context.getRelocSymbolsRange(self.sectionType, self.inFileOffset, self.inFileOffset + self.sizew*4):
+            if (inFileOffset - self.inFileOffset) % 4 == 0:
+                w = self.words[(inFileOffset - self.inFileOffset) // 4]
                 if relocSymbol.name is not None and relocSymbol.name.startswith("."):
                     sectType = common.FileSectionType.fromStr(relocSymbol.name)
                     relocSymbol.sectionType = sectType
@@ -89,7 +92,27 @@ class SectionRodata(SectionBase):
                     self.context.offsetSymbols[sectType][w] = contextOffsetSym
                     relocSymbol.name = relocName
                     # print(relocSymbol.name, f"{w:X}")
-            inFileOffset += 4
+
+    def getAnalysisDependencies(self) -> tuple:
+        # The string guesser also depends on how many times each symbol is referenced
+        referenceCounters = tuple(contextSym.referenceCounter for _, contextSym in self.getSymbolsRange(self.vram, self.vramEnd))
+        return super().getAnalysisDependencies() + (referenceCounters,)
+
+    def resetAnalysis(self) -> None:
+        super().resetAnalysis()
+        for labelSym in self._referencedJumpTableLabels:
+            labelSym.referenceCounter -= 1
+            self.context.markAddressChanged(labelSym.address)
+        self._referencedJumpTableLabels = list()
+
+    def _addJumpTableLabels(self, jumpTableLabels: list[int]) -> None:
+        if len(jumpTableLabels) == 0:
+            return
+        for labelSym in self.addJumpTableLabels(jumpTableLabels, isAutogenerated=True):
+            labelSym.referenceCounter += 1
+            self._referencedJumpTableLabels.append(labelSym)
+            self.context.markAddressChanged(labelSym.address)
+        jumpTableLabels.clear()
 
     def analyze(self):
         self.checkAndCreateFirstSymbol()
@@ -100,6 +123,8 @@ class SectionRodata(SectionBase):
         lastVramSymbol: common.ContextSymbol | None = None
 
         partOfJumpTable = False
+        # Labels of the current jump table, which are added all at once when the table ends
+        jumpTableLabels: list[int] = list()
         for w in self.words:
             currentVram = self.getVramOffset(localOffset)
             contextSym = self.getSymbol(currentVram, tryPlusOffset=False)
@@ -125,13 +150,19 @@ class SectionRodata(SectionBase):
                     if lastVramSymbol is not None and lastVramSymbol.isJumpTable() and lastVramSymbol.isGot and common.GlobalConfig.GP_VALUE is not None:
                         partOfJumpTable = True
 
+            if not partOfJumpTable:
+                # The previous jump table, if any, has ended
+                self._addJumpTableLabels(jumpTableLabels)
+
             if partOfJumpTable:
                 if lastVramSymbol is not None and lastVramSymbol.isGot and common.GlobalConfig.GP_VALUE is not None:
                     labelAddr = common.GlobalConfig.GP_VALUE + rabbitizer.Utils.from2Complement(w, 32)
-                    labelSym = self.addJumpTableLabel(labelAddr, isAutogenerated=True)
                 else:
-                    labelSym = self.addJumpTableLabel(w, isAutogenerated=True)
-                labelSym.referenceCounter += 1
+                    labelAddr = w
+                jumpTableLabels.append(labelAddr)
+                if self.vram <= labelAddr < self.vramEnd:
+                    # The label may be looked up by the next words of this table
+                    self._addJumpTableLabels(jumpTableLabels)
 
             elif self.popPointerInDataReference(currentVram) is not None:
                 if common.GlobalConfig.ADD_NEW_SYMBOLS:
@@ -149,6 +180,8 @@ class SectionRodata(SectionBase):
 
             localOffset += 4
 
+        self._addJumpTableLabels(jumpTableLabels)
+
         previousSymbolWasLateRodata = False
         previousSymbolExtraPadding = 0
 
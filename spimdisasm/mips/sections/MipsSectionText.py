@@ -5,27 +5,107 @@
 
 from __future__ import annotations
 
+import concurrent.futures
+import contextlib
+import dataclasses
+from typing import Generator
 import rabbitizer
 
 from ... import common
 
 from .. import symbols
+from ..InstructionConfig import InstructionConfig
 from ..MipsFileBase import FileBase
 
 from . import SectionBase
 
 
+_CHUNKED_BOUNDARY_DETECTION_MIN_INSTRUCTIONS = 0x4000
+
+
+@dataclasses.dataclass
+class _FunctionsStartsScan:
+    funcsStartsList: list[int]
+    unimplementedInstructionsFuncList: list[bool]
+    fileBoundaries: list[int] = dataclasses.field(default_factory=list)
+    jalTargets: list[int] = dataclasses.field(default_factory=list)
+
+    endedCleanly: bool = False
+    "The last function ended right at the end of the scanned instructions, with no branch pointing past it"
+    pendingFileBoundary: bool = False
+    "Only nops were found after the last function"
+    crossedStart: bool = False
+    "A branch points before the first scanned instruction, so the scan was stopped"
+    foundInvalidBranch: bool = False
+    "A branch points before the start of the section, so the scan was stopped"
+
+
 class SectionText(SectionBase):
     def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytearray, segmentVromStart: int, overlayCategory: str|None):
         super().__init__(context, vromStart, vromEnd, vram, filename, common.Utils.bytesToWords(array_of_bytes, vromStart, vromEnd), common.FileSectionType.Text, segmentVromStart, overlayCategory)
 
         self.instrCat: rabbitizer.Enum = rabbitizer.InstrCategory.CPU
 
+        self.jobs: int = 1
+        """Amount of worker processes used to analyze the functions of this section.
+
+        Values bigger than 1 run the instruction analysis of each function on a process pool.
+        The results are applied to the context in the same order as the sequential analysis, so both modes produce the same output.
+
+        Sections with relocations (i.e. from elf files) are always analyzed sequentially, since the worker processes don't have them.
+        A verbose message is printed when that happens"""
+
+        self.chunkedBoundaryDetection: bool = False
+        """Search the function boundaries of big sections by scanning chunks of the section in parallel.
+
+        Needs `jobs` to be bigger than 1. Only sections which aren't part of an overlay are chunked"""
+
+        self.executor: concurrent.futures.Executor|None = None
+        """Process pool used instead of creating a new one for this section, so it can be shared with other sections.
+
+        Must have been created with `createAnalysisExecutor`"""
+
+        self._speculativeAnalysis: concurrent.futures.Future[dict[tuple[int, int], symbols.analysis.FunctionAnalysisResult]]|None = None
+        "Set by `startSpeculativeAnalysis` and consumed by the next `analyze`"
+
 
     @property
     def nFuncs(self) -> int:
         return len(self.symbolList)
 
+    @staticmethod
+    def createAnalysisExecutor(jobs: int, context: common.Context) -> concurrent.futures.ProcessPoolExecutor:
+        "Creates a process pool which can run the parallel parts of the analysis of any text section which uses `context`"
+        initargs = (common.GlobalConfig.getSettings(), InstructionConfig.getSettings(), context.got)
+        return concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=_initAnalysisWorker, initargs=initargs)
+
+    @contextlib.contextmanager
+    def _getAnalysisExecutor(self) -> Generator[concurrent.futures.Executor, None, None]:
+        if self.executor is not None:
+            yield self.executor
+            return
+        with SectionText.createAnalysisExecutor(self.jobs, self.context) as executor:
+            yield executor
+
+    def startSpeculativeAnalysis(self, executor: concurrent.futures.Executor) -> bool:
+        """Submits to `executor` a guess of the function boundaries of this section, based on the current state of the context,
+        and the analysis of every function found by that guess.
+
+        The next `analyze` finds the function boundaries again, and uses the analysis of the guessed functions whose range matches the final one.
+        The analysis of a function doesn't depend on the context, so the output is the same as without the guess.
+
+        Returns `False` if this section is not suitable for it, like big sections (which are better analyzed in parallel by themselves) or overlays"""
+        nInstr = self.sizew
+        if nInstr == 0 or nInstr >= _CHUNKED_BOUNDARY_DETECTION_MIN_INSTRUCTIONS or self.overlayCategory is not None:
+            return False
+        if len(self.context.relocSymbols[common.FileSectionType.Text]) > 0:
+            # Relocations are applied to the instructions while analyzing
+            return False
+
+        task = self._getFunctionsStartsScanTask(0, nInstr, [])
+        self._speculativeAnalysis = executor.submit(_speculativeAnalysisWorker, task, self.instrCat == rabbitizer.InstrCategory.RSP)
+        return True
+
     @staticmethod
     def wordListToInstructions(wordList: list[int], currentVram: int|None, instrCat: rabbitizer.Enum) -> list[rabbitizer.Instruction]:
         instrsList: list[rabbitizer.Instruction] = list()
@@ -40,18 +120,73 @@ class SectionText(SectionBase):
         return instrsList
 
     def analyze(self):
+        instrsList = self.wordListToInstructions(self.words, self.getVramOffset(0), self.instrCat)
+        nInstr = len(instrsList)
+
+        funcsStartsList, unimplementedInstructionsFuncList = self._findFunctionsStarts(instrsList)
+
+        funcsRanges: list[tuple[int, int, bool]] = list()
+        startsCount = len(funcsStartsList)
+        for startIndex in range(startsCount):
+            start = funcsStartsList[startIndex]
+            hasUnimplementedIntrs = unimplementedInstructionsFuncList[startIndex]
+            end = nInstr
+            if startIndex + 1 < startsCount:
+                end = funcsStartsList[startIndex+1]
+
+            if start >= end:
+                break
+
+            funcsRanges.append((start, end, hasUnimplementedIntrs))
+
+        analysisResults = self._getFunctionsAnalysisResults(funcsRanges)
+
+        i = 0
+        for start, end, hasUnimplementedIntrs in funcsRanges:
+            localOffset = start*4
+            vram = self.getVramOffset(localOffset)
+
+            vrom = self.getVromOffset(localOffset)
+            vromEnd = vrom + (end - start)*4
+
+            if common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS or not hasUnimplementedIntrs:
+                funcSymbol = self.addFunction(vram, isAutogenerated=True, symbolVrom=vrom)
+            elif common.GlobalConfig.ADD_NEW_SYMBOLS:
+                self.addSymbol(vram, sectionType=self.sectionType, isAutogenerated=True, symbolVrom=vrom)
+
+            self.symbolsVRams.add(vram)
+
+            func = symbols.SymbolFunction(self.context, vrom, vromEnd, self.inFileOffset + localOffset, vram, instrsList[start:end], self.segmentVromStart, self.overlayCategory)
+            func.setCommentOffset(self.commentOffset)
+            func.index = i
+            func.pointersOffsets |= self.pointersOffsets
+            func.hasUnimplementedIntrs = hasUnimplementedIntrs
+            func.parent = self
+            func.isRsp = self.instrCat == rabbitizer.InstrCategory.RSP
+            analysisResult = analysisResults.get(i)
+            if analysisResult is not None:
+                func.applyAnalysisResult(analysisResult)
+            else:
+                func.analyze()
+            self.symbolList.append(func)
+            i += 1
+
+    @staticmethod
+    def _scanFunctionsStarts(element: common.ElementBase, instrsList: list[rabbitizer.Instruction], firstIndex: int, isHandwritten: bool, instrCat: rabbitizer.Enum) -> _FunctionsStartsScan:
+        """Finds where each function starts in the passed instructions.
+
+        `instrsList` may be only a part of the section, starting at the instruction `firstIndex` of it.
+        `element` provides the section's addresses and the context used to look up and register symbols"""
+        scan = _FunctionsStartsScan([firstIndex], [])
+
         functionEnded = False
         farthestBranch = 0
-        funcsStartsList = [0]
-        unimplementedInstructionsFuncList = []
-
-        instrsList = self.wordListToInstructions(self.words, self.getVramOffset(0), self.instrCat)
 
-        instructionOffset = 0
-        currentInstructionStart = 0
-        currentFunctionSym = self.getSymbol(self.getVramOffset(instructionOffset), tryPlusOffset=False, checkGlobalSegment=False)
+        instructionOffset = firstIndex*4
+        currentInstructionStart = instructionOffset
+        currentFunctionSym = element.getSymbol(element.getVramOffset(instructionOffset), tryPlusOffset=False, checkGlobalSegment=False)
 
-        isLikelyHandwritten = self.isHandwritten
+        isLikelyHandwritten = isHandwritten
 
         isInstrImplemented = True
         index = 0
@@ -64,7 +199,7 @@ class SectionText(SectionBase):
             if functionEnded:
                 functionEnded = False
 
-                isLikelyHandwritten = self.isHandwritten
+                isLikelyHandwritten = isHandwritten
                 index += 1
                 instructionOffset += 4
                 isboundary = False
@@ -73,25 +208,27 @@ class SectionText(SectionBase):
                     instr = instrsList[index]
                     if not instr.isNop():
                         if isboundary:
-                            self.fileBoundaries.append(self.inFileOffset + index*4)
+                            scan.fileBoundaries.append(element.inFileOffset + instructionOffset)
                         break
                     index += 1
                     instructionOffset += 4
                     isboundary = True
 
                 currentInstructionStart = instructionOffset
-                currentFunctionSym = self.getSymbol(self.getVramOffset(instructionOffset), tryPlusOffset=False, checkGlobalSegment=False)
+                currentFunctionSym = element.getSymbol(element.getVramOffset(instructionOffset), tryPlusOffset=False, checkGlobalSegment=False)
 
-                funcsStartsList.append(index)
-                unimplementedInstructionsFuncList.append(not isInstrImplemented)
-                if index >= len(instrsList):
+                scan.funcsStartsList.append(firstIndex + index)
+                scan.unimplementedInstructionsFuncList.append(not isInstrImplemented)
+                if index >= nInstr:
+                    scan.endedCleanly = not (farthestBranch > 0)
+                    scan.pendingFileBoundary = isboundary
                     break
                 instr = instrsList[index]
                 isInstrImplemented = instr.isImplemented()
 
-            currentVram = self.getVramOffset(instructionOffset)
+            currentVram = element.getVramOffset(instructionOffset)
 
-            if self.instrCat != rabbitizer.InstrCategory.RSP and not isLikelyHandwritten:
+            if instrCat != rabbitizer.InstrCategory.RSP and not isLikelyHandwritten:
                 isLikelyHandwritten = instr.isLikelyHandwritten()
 
             if instr.isBranch() or instr.isUnconditionalBranch():
@@ -100,32 +237,39 @@ class SectionText(SectionBase):
                     # keep track of the farthest branch target
                     farthestBranch = branchOffset
                 if branchOffset < 0:
-                    if branchOffset + instructionOffset < 0:
-                        # Whatever we are reading is not a valid instruction
+                    if branchOffset + instructionOffset < firstIndex*4:
+                        if firstIndex == 0:
+                            # Whatever we are reading is not a valid instruction
+                            scan.foundInvalidBranch = True
+                        else:
+                            # The branch goes into the previous chunk, the caller has to rescan both of them together
+                            scan.crossedStart = True
                         break
                     # make sure to not branch outside of the current function
                     if not isLikelyHandwritten:
+                        funcsStartsList = scan.funcsStartsList
                         j = len(funcsStartsList) - 1
                         while j >= 0:
                             if (branchOffset + instructionOffset) < funcsStartsList[j] * 4:
-                                vram = self.getVramOffset(funcsStartsList[j]*4)
-                                funcSymbol = self.getSymbol(vram, tryPlusOffset=False, checkGlobalSegment=False)
-                                if funcSymbol is not None and funcSymbol.isTrustableFunction(self.instrCat == rabbitizer.InstrCategory.RSP):
+                                vram = element.getVramOffset(funcsStartsList[j]*4)
+                                funcSymbol = element.getSymbol(vram, tryPlusOffset=False, checkGlobalSegment=False)
+                                if funcSymbol is not None and funcSymbol.isTrustableFunction(instrCat == rabbitizer.InstrCategory.RSP):
                                     j -= 1
                                     continue
                                 del funcsStartsList[j]
-                                del unimplementedInstructionsFuncList[j-1]
+                                del scan.unimplementedInstructionsFuncList[j-1]
                             else:
                                 break
                             j -= 1
 
             elif instr.isJumpWithAddress():
                 target = instr.getInstrIndexAsVram()
-                if self.instrCat != rabbitizer.InstrCategory.RSP:
+                if instrCat != rabbitizer.InstrCategory.RSP:
                     if target >= 0x84000000:
                         # RSP address space?
                         isLikelyHandwritten = True
-                self.addFunction(target, isAutogenerated=True)
+                element.addFunction(target, isAutogenerated=True)
+                scan.jalTargets.append(target)
 
             # Try to find the end of the function
             if currentFunctionSym is not None and currentFunctionSym.size is not None:
@@ -141,57 +285,217 @@ class SectionText(SectionBase):
                         # Usually jumptables, ignore
                         pass
                     elif not instr.doesLink():
-                        if isLikelyHandwritten or self.instrCat == rabbitizer.InstrCategory.RSP:
+                        if isLikelyHandwritten or instrCat == rabbitizer.InstrCategory.RSP:
                             # I don't remember the reasoning of this condition...
                             functionEnded = True
 
                 # If there's another function after this then the current function has ended
-                funcSymbol = self.getSymbol(currentVram + 8, tryPlusOffset=False, checkGlobalSegment=False)
-                if funcSymbol is not None and funcSymbol.isTrustableFunction(self.instrCat == rabbitizer.InstrCategory.RSP):
-                    if funcSymbol.vromAddress is None or self.getVromOffset(instructionOffset+8) == funcSymbol.vromAddress:
+                funcSymbol = element.getSymbol(currentVram + 8, tryPlusOffset=False, checkGlobalSegment=False)
+                if funcSymbol is not None and funcSymbol.isTrustableFunction(instrCat == rabbitizer.InstrCategory.RSP):
+                    if funcSymbol.vromAddress is None or element.getVromOffset(instructionOffset+8) == funcSymbol.vromAddress:
                         functionEnded = True
 
             index += 1
             farthestBranch -= 4
             instructionOffset += 4
 
-        unimplementedInstructionsFuncList.append(not isInstrImplemented)
-
-        i = 0
-        startsCount = len(funcsStartsList)
-        for startIndex in range(startsCount):
-            start = funcsStartsList[startIndex]
-            hasUnimplementedIntrs = unimplementedInstructionsFuncList[startIndex]
-            end = nInstr
-            if startIndex + 1 < startsCount:
-                end = funcsStartsList[startIndex+1]
-
-            if start >= end:
-                break
-
-            localOffset = start*4
-            vram = self.getVramOffset(localOffset)
+        scan.unimplementedInstructionsFuncList.append(not isInstrImplemented)
+        return scan
+
+    def _findFunctionsStarts(self, instrsList: list[rabbitizer.Instruction]) -> tuple[list[int], list[bool]]:
+        """Returns the index of the first instruction of each function of this section,
+        and if each one of those functions has unimplemented instructions.
+
+        If the chunked mode is enabled then the section is cut into chunks which are scanned in parallel.
+        Chunks whose seam doesn't match what a sequential scan would have found are joined and scanned again,
+        so both modes produce the same output"""
+        chunks = self._getFunctionsStartsChunks(instrsList)
+        if len(chunks) < 2:
+            scan = self._scanFunctionsStarts(self, instrsList, 0, self.isHandwritten, self.instrCat)
+            self.fileBoundaries += scan.fileBoundaries
+            return scan.funcsStartsList, scan.unimplementedInstructionsFuncList
+
+        jalsList: list[tuple[int, int]] = list()
+        for index, instr in enumerate(instrsList):
+            if instr.isJumpWithAddress():
+                jalsList.append((index, instr.getInstrIndexAsVram()))
+
+        with self._getAnalysisExecutor() as executor:
+            scans = self._scanFunctionsStartsChunks(executor, chunks, instrsList, jalsList)
+
+            while True:
+                newChunks: list[tuple[int, int]] = list()
+                newScans: list[_FunctionsStartsScan|None] = list()
+                for chunk, scan in zip(chunks, scans):
+                    if len(newScans) > 0:
+                        lastScan = newScans[-1]
+                        if lastScan is not None:
+                            if lastScan.foundInvalidBranch:
+                                # The sequential scan would have stopped here
+                                break
+                            if not lastScan.endedCleanly or scan.crossedStart:
+                                newChunks[-1] = (newChunks[-1][0], chunk[1])
+                                newScans[-1] = None
+                                continue
+                    newChunks.append(chunk)
+                    newScans.append(scan)
+
+                chunks = newChunks
+                pendingChunks = [chunk for chunk, scan in zip(chunks, newScans) if scan is None]
+                if len(pendingChunks) == 0:
+                    break
 
-            vrom = self.getVromOffset(localOffset)
-            vromEnd = vrom + (end - start)*4
+                pendingScans = iter(self._scanFunctionsStartsChunks(executor, pendingChunks, instrsList, jalsList))
+                scans = [scan if scan is not None else next(pendingScans) for scan in newScans]
+
+        funcsStartsList: list[int] = list()
+        unimplementedInstructionsFuncList: list[bool] = list()
+        prevScan: _FunctionsStartsScan|None = None
+        for chunkScan in newScans:
+            assert chunkScan is not None
+            if prevScan is not None:
+                # The last start of the previous chunk is the first one of this chunk
+                funcsStartsList.pop()
+                unimplementedInstructionsFuncList.pop()
+                if prevScan.pendingFileBoundary:
+                    self.fileBoundaries.append(self.inFileOffset + chunkScan.funcsStartsList[0]*4)
+            funcsStartsList += chunkScan.funcsStartsList
+            unimplementedInstructionsFuncList += chunkScan.unimplementedInstructionsFuncList
+            self.fileBoundaries += chunkScan.fileBoundaries
+            for target in chunkScan.jalTargets:
+                self.addFunction(target, isAutogenerated=True)
+            prevScan = chunkScan
 
-            if common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS or not hasUnimplementedIntrs:
-                funcSymbol = self.addFunction(vram, isAutogenerated=True, symbolVrom=vrom)
-            elif common.GlobalConfig.ADD_NEW_SYMBOLS:
-                self.addSymbol(vram, sectionType=self.sectionType, isAutogenerated=True, symbolVrom=vrom)
+        return funcsStartsList, unimplementedInstructionsFuncList
 
-            self.symbolsVRams.add(vram)
+    def _getFunctionsStartsChunks(self, instrsList: list[rabbitizer.Instruction]) -> list[tuple[int, int]]:
+        """Cuts the section into ranges of instructions which will probably start a new function.
 
-            func = symbols.SymbolFunction(self.context, vrom, vromEnd, self.inFileOffset + localOffset, vram, instrsList[start:end], self.segmentVromStart, self.overlayCategory)
-            func.setCommentOffset(self.commentOffset)
-            func.index = i
-            func.pointersOffsets |= self.pointersOffsets
-            func.hasUnimplementedIntrs = hasUnimplementedIntrs
-            func.parent = self
-            func.isRsp = self.instrCat == rabbitizer.InstrCategory.RSP
-            func.analyze()
-            self.symbolList.append(func)
-            i += 1
+        The cuts are made after a `jr $ra` and its nop padding or at user declared functions"""
+        nInstr = len(instrsList)
+        if self.jobs <= 1 or not self.chunkedBoundaryDetection or self.overlayCategory is not None:
+            return [(0, nInstr)]
+
+        chunkSize = max(_CHUNKED_BOUNDARY_DETECTION_MIN_INSTRUCTIONS, nInstr // (self.jobs * 4))
+        if nInstr < 2 * chunkSize:
+            return [(0, nInstr)]
+
+        cuts: set[int] = set()
+        for index, instr in enumerate(instrsList):
+            if instr.isJrRa():
+                # Skip the delay slot and the padding
+                cut = index + 2
+                while cut < nInstr and instrsList[cut].isNop():
+                    cut += 1
+                if cut < nInstr:
+                    cuts.add(cut)
+
+        isRsp = self.instrCat == rabbitizer.InstrCategory.RSP
+        for vram, contextSym in self.context.globalSegment.getSymbolsRange(self.getVramOffset(0), self.getVramOffset(nInstr*4)):
+            localOffset = vram - self.vram
+            if localOffset % 4 != 0 or not contextSym.isTrustableFunction(isRsp):
+                continue
+            if contextSym.vromAddress is not None and contextSym.vromAddress != self.getVromOffset(localOffset):
+                continue
+            # A chunk starting with a nop would be scanned differently than the whole section
+            if not instrsList[localOffset//4].isNop():
+                cuts.add(localOffset//4)
+
+        chunks: list[tuple[int, int]] = list()
+        start = 0
+        for cut in sorted(cuts):
+            if cut - start >= chunkSize and nInstr - cut >= chunkSize:
+                chunks.append((start, cut))
+                start = cut
+        chunks.append((start, nInstr))
+        return chunks
+
+    def _getFunctionsStartsScanTask(self, start: int, end: int, jalsList: list[tuple[int, int]]) -> tuple:
+        vramStart = self.getVramOffset(start*4)
+        # The scan looks up symbols up to two instructions after the end of the chunk
+        vramEnd = self.getVramOffset(end*4) + 8
+
+        chunkSymbols: list[common.ContextSymbol] = list()
+        for _, contextSym in self.context.globalSegment.getSymbolsRange(vramStart, vramEnd):
+            contextSym = contextSym.copy()
+            contextSym.referenceFunctions = set()
+            contextSym.nameGetCallback = None
+            chunkSymbols.append(contextSym)
+
+        # A sequential scan would have already registered the `jal` targets of the previous instructions
+        seenTargets = [target for index, target in jalsList if index < start and vramStart <= target < vramEnd]
+
+        segment = self.context.globalSegment
+        segmentRanges = (segment.vromStart, segment.vromEnd, segment.vramStart, segment.vramEnd)
+        sectionInfo = (self.vromStart, self.vromEnd, self.inFileOffset, self.vram, self.segmentVromStart, self.isHandwritten, self.instrCat)
+        return (self.words[start:end], start, sectionInfo, segmentRanges, chunkSymbols, seenTargets)
+
+    def _scanFunctionsStartsChunks(self, executor: concurrent.futures.Executor, chunks: list[tuple[int, int]], instrsList: list[rabbitizer.Instruction], jalsList: list[tuple[int, int]]) -> list[_FunctionsStartsScan]:
+        tasks = [self._getFunctionsStartsScanTask(start, end, jalsList) for start, end in chunks]
+        return list(executor.map(_scanFunctionsStartsWorker, tasks))
+
+    def getAnalysisDependencies(self) -> tuple:
+        "The symbols inside this section which can change where its functions start or end"
+        if len(self.context.relocSymbols[common.FileSectionType.Text]) > 0:
+            # The relocations were already applied by the first analysis
+            return ()
+
+        isRsp = self.instrCat == rabbitizer.InstrCategory.RSP
+        dependencies: list[tuple[int, int|None, int|None]] = list()
+        # The boundary detection looks up symbols up to two instructions after the end of the section
+        for vram, contextSym in self.getSymbolsRange(self.vram, self.vramEnd + 8):
+            if contextSym.size is not None or contextSym.isTrustableFunction(isRsp):
+                dependencies.append((vram, contextSym.size, contextSym.vromAddress))
+        return tuple(dependencies)
+
+    def getAnalysisDependencyRanges(self) -> list[tuple[int, int]]:
+        if len(self.context.relocSymbols[common.FileSectionType.Text]) > 0:
+            return []
+        return [(self.vram, self.vramEnd + 8)]
+
+    def _getFunctionsAnalysisResults(self, funcsRanges: list[tuple[int, int, bool]]) -> dict[int, symbols.analysis.FunctionAnalysisResult]:
+        """Runs the context-independent part of the analysis of every function on a process pool.
+
+        Returns an empty dict if the parallel analysis is disabled, meaning every function should be analyzed normally"""
+        results: dict[int, symbols.analysis.FunctionAnalysisResult] = dict()
+
+        if self._speculativeAnalysis is not None:
+            speculativeResults = self._speculativeAnalysis.result()
+            self._speculativeAnalysis = None
+            for i, (start, end, hasUnimplementedIntrs) in enumerate(funcsRanges):
+                if not common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS and hasUnimplementedIntrs:
+                    continue
+                result = speculativeResults.get((start, end))
+                if result is not None:
+                    results[i] = result
+            # Functions which weren't guessed correctly are analyzed normally
+            return results
+
+        if self.jobs <= 1:
+            return results
+        if len(self.context.relocSymbols[common.FileSectionType.Text]) > 0:
+            # The workers don't have the relocations, which are used while analyzing
+            common.Utils.printVerbose(f"Analyzing the functions of {self.name} sequentially, since the analysis processes don't have the relocations of the section")
+            return results
+
+        isRsp = self.instrCat == rabbitizer.InstrCategory.RSP
+        indices: list[int] = list()
+        tasks: list[tuple[list[int], int, bool]] = list()
+        for i, (start, end, hasUnimplementedIntrs) in enumerate(funcsRanges):
+            if not common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS and hasUnimplementedIntrs:
+                # Those functions take a different path which needs the context
+                continue
+            indices.append(i)
+            tasks.append((self.words[start:end], self.getVramOffset(start*4), isRsp))
+
+        if len(tasks) < 2:
+            return results
+
+        chunksize = max(1, len(tasks) // (self.jobs * 4))
+        with self._getAnalysisExecutor() as executor:
+            for i, result in zip(indices, executor.map(_analyzeFunctionWorker, tasks, chunksize=chunksize)):
+                results[i] = result
+        return results
 
 
     def compareToFile(self, other: FileBase):
@@ -263,3 +567,62 @@ class SectionText(SectionBase):
             was_updated = True
 
         return was_updated
+
+
+_workerContext: common.Context|None = None
+
+def _initAnalysisWorker(globalConfigSettings: dict, instructionConfigSettings: dict, got: common.GlobalOffsetTable) -> None:
+    global _workerContext
+
+    common.GlobalConfig.setSettings(globalConfigSettings)
+    InstructionConfig.setSettings(instructionConfigSettings)
+    _workerContext = common.Context()
+    _workerContext.got = got
+
+def _analyzeFunctionWorker(task: tuple[list[int], int, bool]) -> symbols.analysis.FunctionAnalysisResult:
+    words, vram, isRsp = task
+    assert _workerContext is not None
+
+    instrCat = rabbitizer.InstrCategory.RSP if isRsp else rabbitizer.InstrCategory.CPU
+    instrsList = SectionText.wordListToInstructions(words, vram, instrCat)
+
+    # The function is built on a scratch context since the real one lives on the main process
+    func = symbols.SymbolFunction(_workerContext, 0, len(words)*4, 0, vram, instrsList, 0, None)
+    func.isRsp = isRsp
+    return func.getAnalysisResult()
+
+def _scanFunctionsStartsWorker(task: tuple) -> _FunctionsStartsScan:
+    words, firstIndex, sectionInfo, segmentRanges, chunkSymbols, seenTargets = task
+    vromStart, vromEnd, inFileOffset, vram, segmentVromStart, isHandwritten, instrCat = sectionInfo
+
+    context = common.Context()
+    context.globalSegment.changeRanges(*segmentRanges)
+    for contextSym in chunkSymbols:
+        context.globalSegment.symbols[contextSym.address] = contextSym
+
+    element = common.ElementBase(context, vromStart, vromEnd, inFileOffset, vram, "", [], common.FileSectionType.Text, segmentVromStart, None)
+    for target in seenTargets:
+        element.addFunction(target, isAutogenerated=True)
+
+    instrsList = SectionText.wordListToInstructions(words, element.getVramOffset(firstIndex*4), instrCat)
+    return SectionText._scanFunctionsStarts(element, instrsList, firstIndex, isHandwritten, instrCat)
+
+def _speculativeAnalysisWorker(task: tuple, isRsp: bool) -> dict[tuple[int, int], symbols.analysis.FunctionAnalysisResult]:
+    words, firstIndex, sectionInfo, segmentRanges, chunkSymbols, seenTargets = task
+    vram = sectionInfo[3]
+    scan = _scanFunctionsStartsWorker(task)
+
+    results: dict[tuple[int, int], symbols.analysis.FunctionAnalysisResult] = dict()
+    nInstr = len(words)
+    startsCount = len(scan.funcsStartsList)
+    for startIndex in range(startsCount):
+        start = scan.funcsStartsList[startIndex]
+        end = nInstr
+        if startIndex + 1 < startsCount:
+            end = scan.funcsStartsList[startIndex+1]
+        if start >= end:
+            break
+        if not common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS and scan.unimplementedInstructionsFuncList[startIndex]:
+            continue
+        results[(start, end)] = _analyzeFunctionWorker((words[start:end], vram + start*4, isRsp))
+    return results
@@ -23,16 +23,30 @@ class SymbolBase(common.ElementBase):
             self.contextSym = offsetSym
         else:
             self.contextSym = self.addSymbol(self.vram, sectionType=self.sectionType, isAutogenerated=True)
-        self.contextSym.vromAddress = self.vromStart
+        if self.contextSym.vromAddress != self.vromStart:
+            self.contextSym.vromAddress = self.vromStart
+            self.context.markAddressChanged(self.contextSym.address)
         self.contextSym.isDefined = True
         self.contextSym.sectionType = self.sectionType
 
+        self._symbolsOffsetsCache: set[int]|None = None
+        "Result of `getSymbolsOffsets`, used while rendering this symbol. Only valid while `_symbolsOffsetsCacheKey` doesn't change"
+        self._symbolsOffsetsCacheKey: tuple[int, int] = (-1, -1)
+
+        self._wordsReferencesCache: list[common.ContextSymbol|None]|None = None
+        "Symbol referenced by each word of this symbol, resolved in a single batch by `_getWordsReferencesCached`"
+        self._wordsReferencesCacheKey: tuple[int, bool] = (-1, False)
+
+        self._relocSymbolsByOffset: dict[int, common.ContextRelocSymbol]|None = None
+        "Result of `getRelocSymbolsByOffset`. Relocations are only added to the context before analyzing, so it never has to be discarded"
+
 
     def getName(self) -> str:
         return self.contextSym.getName()
 
     def setNameIfUnset(self, name: str) -> None:
-        self.contextSym.setNameIfUnset(name)
+        if self.contextSym.setNameIfUnset(name):
+            self.context.markAddressChanged(self.contextSym.address)
 
     def setNameGetCallback(self, callback: Callable[[common.ContextSymbol], str]) -> None:
         self.contextSym.setNameGetCallback(callback)
@@ -64,6 +78,31 @@ class SymbolBase(common.ElementBase):
         currentVram = self.getVramOffset(localOffset)
         return self.getSymbol(currentVram, tryPlusOffset=False)
 
+    def getSymbolsOffsets(self) -> set[int]:
+        """Returns the local offsets of this symbol where `getSymbolAtVramOrOffset` may find a symbol.
+
+        Uses range queries instead of looking up every offset of this symbol"""
+        size = self.sizew * 4
+        offsets = {vram - self.vram for vram in self.getSymbolsVramsInRange(self.vram, self.vram + size) if vram < self.vram + size}
+
+        for offset, _ in self.context.getOffsetSymbolsRange(self.sectionType, self.inFileOffset, self.inFileOffset + size):
+            offsets.add(offset - self.inFileOffset)
+        return offsets
+
+    def _getSymbolsOffsetsCached(self) -> set[int]:
+        key = (self.context.symbolsGeneration, len(self.context.offsetSymbols[self.sectionType]))
+        if self._symbolsOffsetsCache is None or key != self._symbolsOffsetsCacheKey:
+            self._symbolsOffsetsCache = self.getSymbolsOffsets()
+            self._symbolsOffsetsCacheKey = key
+        return self._symbolsOffsetsCache
+
+    def _getWordsReferencesCached(self, canReferenceSymbolsWithAddends: bool) -> list[common.ContextSymbol|None]:
+        key = (self.context.symbolsGeneration, canReferenceSymbolsWithAddends)
+        if self._wordsReferencesCache is None or key != self._wordsReferencesCacheKey:
+            self._wordsReferencesCache = self.getSymbolsBatch(self.words, tryPlusOffset=canReferenceSymbolsWithAddends)
+            self._wordsReferencesCacheKey = key
+        return self._wordsReferencesCache
+
     def getLabel(self) -> str:
         if self.contextSym is not None:
             return self.getLabelFromSymbol(self.contextSym)
@@ -80,6 +119,10 @@ class SymbolBase(common.ElementBase):
     def renameBasedOnType(self):
         pass
 
+    def defineLabels(self) -> None:
+        "Marks the labels inside this symbol as defined. Must be called after every section has been analyzed and before rendering"
+        pass
+
 
     def analyze(self):
         self.renameBasedOnType()
@@ -91,19 +134,30 @@ class SymbolBase(common.ElementBase):
             byteStep = 2
 
         if self.sectionType != common.FileSectionType.Bss:
-            for i in range(0, self.sizew):
-                localOffset = 4*i
-                for j in range(0, 4, byteStep):
-                    if i == 0 and j == 0:
-                        continue
-                    contextSym = self.getSymbolAtVramOrOffset(localOffset+j)
-                    if contextSym is not None:
-                        contextSym.vromAddress = self.getVromOffset(localOffset+j)
-                        contextSym.isDefined = True
-                        contextSym.sectionType = self.sectionType
-                        if contextSym.hasNoType():
-                            contextSym.type = contextSym.type
-
+            for localOffset in sorted(self.getSymbolsOffsets()):
+                if localOffset == 0 or localOffset % byteStep != 0:
+                    continue
+                contextSym = self.getSymbolAtVramOrOffset(localOffset)
+                if contextSym is not None:
+                    symbolVrom = self.getVromOffset(localOffset)
+                    if contextSym.vromAddress != symbolVrom:
+                        contextSym.vromAddress = symbolVrom
+                        self.context.markAddressChanged(contextSym.address)
+                    contextSym.isDefined = True
+                    contextSym.sectionType = self.sectionType
+                    if contextSym.hasNoType():
+                        contextSym.type = contextSym.type
+
+
+    def getRelocSymbolsByOffset(self) -> dict[int, common.ContextRelocSymbol]:
+        """The relocations applied to this symbol, keyed by their offset relative to the start of the symbol.
+
+        Found with a single range query over the sorted relocations of the section, so callers only visit the relocated words"""
+        if self._relocSymbolsByOffset is None:
+            self._relocSymbolsByOffset = dict()
+            for offset, relocSymbol in self.context.getRelocSymbolsRange(self.sectionType, self.inFileOffset, self.inFileOffset + self.sizew*4):
+                self._relocSymbolsByOffset[offset - self.inFileOffset] = relocSymbol
+        return self._relocSymbolsByOffset
 
     def getNthWord(self, i: int, canReferenceSymbolsWithAddends: bool=False, canReferenceConstants: bool=False) -> tuple[str, int]:
         output = ""
@@ -126,9 +180,11 @@ class SymbolBase(common.ElementBase):
             dotType = ".short"
             byteStep = 2
 
+        symbolsOffsets = self._getSymbolsOffsetsCached()
+
         for j in range(0, 4, byteStep):
             label = ""
-            if j != 0 or i != 0:
+            if (j != 0 or i != 0) and localOffset+j in symbolsOffsets:
                 contextSym = self.getSymbolAtVramOrOffset(localOffset+j)
                 if contextSym is not None:
                     # Possible symbols in the middle
@@ -156,12 +212,12 @@ class SymbolBase(common.ElementBase):
 
                 # .elf relocated symbol
                 if len(self.context.relocSymbols[self.sectionType]) > 0:
-                    possibleReference = self.context.getRelocSymbol(self.inFileOffset + localOffset, self.sectionType)
+                    possibleReference = self.getRelocSymbolsByOffset().get(localOffset)
                     if possibleReference is not None:
                         value = possibleReference.getNamePlusOffset(w)
                 else:
                     # This word could be a reference to a symbol
-                    symbolRef = self.getSymbol(w, tryPlusOffset=canReferenceSymbolsWithAddends)
+                    symbolRef = self._getWordsReferencesCached(canReferenceSymbolsWithAddends)[i]
                     if symbolRef is not None:
                         value = symbolRef.getSymbolPlusOffset(w)
                     elif canReferenceConstants:
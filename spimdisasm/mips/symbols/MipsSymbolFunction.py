@@ -9,6 +9,7 @@ import rabbitizer
 
 from ... import common
 
+from ..MipsRelocTypes import RelocTypes
 from . import SymbolText, analysis
 
 
@@ -28,6 +29,19 @@ class SymbolFunction(SymbolText):
         self.isRsp: bool = False
         self.isLikelyHandwritten: bool = False
 
+        self._symbolsCache: dict[tuple[int, bool, bool], common.ContextSymbol|None] = dict()
+        "Results of the symbol lookups done by this function, keyed by the parameters of `getSymbol`"
+        self._symbolsCacheGeneration: int = -1
+        "The `symbolsGeneration` of the context when the lookups of `_symbolsCache` were last checked"
+
+        self._referencedSymbols: list[common.ContextSymbol] = list()
+        "Symbols whose references were counted by the analysis of this function"
+
+        self._labelsDefined: bool = False
+        "If `defineLabels` has been called since the last analysis"
+
+        self._drivingRelocSymbols: dict[int, common.ContextRelocSymbol]|None = None
+
     @property
     def nInstr(self) -> int:
         return len(self.instructions)
@@ -37,6 +51,59 @@ class SymbolFunction(SymbolText):
         return self.nInstr
 
 
+    def _discardChangedSymbolLookups(self, generation: int) -> None:
+        "Removes the cached lookups of the addresses whose symbols changed since the last check"
+        if len(self._symbolsCache) > 0:
+            if self._symbolsCacheGeneration < 0 or self._symbolsCacheGeneration > generation:
+                changes: list[tuple[int, int|None]|None] = [None]
+            else:
+                changes = self.context.getSymbolsChangesSince(self._symbolsCacheGeneration)
+            for change in changes:
+                if change is None:
+                    self._symbolsCache.clear()
+                    break
+                start, end = change
+                changedKeys = [key for key in self._symbolsCache if key[0] == start or (key[1] and start < key[0] and (end is None or key[0] < end))]
+                for key in changedKeys:
+                    del self._symbolsCache[key]
+        self._symbolsCacheGeneration = generation
+
+    def _getSymbolCached(self, vramAddress: int, tryPlusOffset: bool = True, checkUpperLimit: bool = True) -> common.ContextSymbol|None:
+        """Same as `getSymbol`, but remembers the result.
+
+        A result is discarded when a symbol is added or resized at an address between `vramAddress` (inclusive) and the next symbol after that address"""
+        generation = self.context.symbolsGeneration
+        if generation != self._symbolsCacheGeneration:
+            self._discardChangedSymbolLookups(generation)
+
+        key = (vramAddress, tryPlusOffset, checkUpperLimit)
+        if key in self._symbolsCache:
+            return self._symbolsCache[key]
+        contextSym = self.getSymbol(vramAddress, tryPlusOffset=tryPlusOffset, checkUpperLimit=checkUpperLimit)
+        self._symbolsCache[key] = contextSym
+        return contextSym
+
+    def _getDrivingRelocSymbols(self) -> dict[int, common.ContextRelocSymbol]:
+        """The relocations which tell what each instruction references, keyed by instruction offset. Empty unless `GlobalConfig.RELOC_DRIVEN_ANALYSIS` is enabled.
+
+        Relocations against a section are not included, since the analysis is still needed to know which symbol of the section is referenced.
+        Computed on the first call, before the analysis renames any relocation"""
+        if self._drivingRelocSymbols is None:
+            self._drivingRelocSymbols = dict()
+            if common.GlobalConfig.RELOC_DRIVEN_ANALYSIS:
+                for instructionOffset, relocSymbol in self.getRelocSymbolsByOffset().items():
+                    if relocSymbol.addend is None or relocSymbol.name is None or relocSymbol.name.startswith("."):
+                        continue
+                    self._drivingRelocSymbols[instructionOffset] = relocSymbol
+        return self._drivingRelocSymbols
+
+    def _processInstr(self, regsTracker: rabbitizer.RegistersTracker, instr: rabbitizer.Instruction, instructionOffset: int, currentVram: int, prevInstr: rabbitizer.Instruction|None, drivingRelocSymbols: dict[int, common.ContextRelocSymbol]) -> None:
+        if instructionOffset in drivingRelocSymbols:
+            # The relocation already tells what this instruction references, so only the registers it overwrites are tracked
+            regsTracker.overwriteRegisters(instr, instructionOffset)
+            return
+        self.instrAnalyzer.processInstr(regsTracker, instr, instructionOffset, currentVram, prevInstr, self.context.got)
+
     def _lookAheadSymbolFinder(self, instr: rabbitizer.Instruction, prevInstr: rabbitizer.Instruction, instructionOffset: int, trackedRegistersOriginal: rabbitizer.RegistersTracker):
         if not prevInstr.isBranch() and not prevInstr.isUnconditionalBranch():
             return
@@ -54,7 +121,8 @@ class SymbolFunction(SymbolText):
 
         regsTracker = rabbitizer.RegistersTracker(trackedRegistersOriginal)
 
-        self.instrAnalyzer.processInstr(regsTracker, instr, instructionOffset, currentVram, None, self.context.got)
+        drivingRelocSymbols = self._getDrivingRelocSymbols()
+        self._processInstr(regsTracker, instr, instructionOffset, currentVram, None, drivingRelocSymbols)
 
         if instructionOffset in self.branchesTaken:
             return
@@ -65,7 +133,7 @@ class SymbolFunction(SymbolText):
             prevTargetInstr = self.instructions[branch//4 - 1]
             targetInstr = self.instructions[branch//4]
 
-            self.instrAnalyzer.processInstr(regsTracker, targetInstr, branch, self.getVramOffset(branch), prevTargetInstr, self.context.got)
+            self._processInstr(regsTracker, targetInstr, branch, self.getVramOffset(branch), prevTargetInstr, drivingRelocSymbols)
 
             if prevTargetInstr.isUnconditionalBranch():
                 return
@@ -75,16 +143,19 @@ class SymbolFunction(SymbolText):
             self.instrAnalyzer.processPrevFuncCall(regsTracker, targetInstr, prevTargetInstr)
             branch += 4
 
+    def _addReference(self, contextSym: common.ContextSymbol) -> None:
+        contextSym.referenceCounter += 1
+        contextSym.referenceFunctions.add(self.contextSym)
+        self._referencedSymbols.append(contextSym)
+        self.context.markAddressChanged(contextSym.address)
+
     def _processElfRelocSymbols(self):
         if len(self.context.relocSymbols[common.FileSectionType.Text]) == 0:
             return
 
         # Process reloc symbols (probably from a .elf file)
-        instructionOffset = 0
-        inFileOffset = self.inFileOffset
-        for instr in self.instructions:
-            relocSymbol = self.context.getRelocSymbol(inFileOffset, common.FileSectionType.Text)
-            if relocSymbol is not None:
+        for instructionOffset, relocSymbol in self.getRelocSymbolsByOffset().items():
+            if instructionOffset % 4 == 0:
                 if relocSymbol.name is not None and relocSymbol.name.startswith("."):
                     sectType = common.FileSectionType.fromStr(relocSymbol.name)
 
@@ -95,13 +166,12 @@ class SymbolFunction(SymbolText):
                             if relocSymbol.name != ".rodata":
                                 common.Utils.eprint(f"Warning. Jumptable referenced in reloc does not have '.rodata' as its name")
                             contextOffsetSym = self.context.addOffsetJumpTable(addressOffset, sectType)
-                            contextOffsetSym.referenceCounter += 1
-                            contextOffsetSym.referenceFunctions.add(self.contextSym)
+                            self._addReference(contextOffsetSym)
                             relocSymbol.name = contextOffsetSym.name
                             self.instrAnalyzer.symbolInstrOffset[instructionOffset] = 0
                             if instructionOffset in self.instrAnalyzer.lowToHiDict:
                                 luiOffset = self.instrAnalyzer.lowToHiDict[instructionOffset]
-                                otherReloc = self.context.getRelocSymbol(self.inFileOffset+luiOffset, common.FileSectionType.Text)
+                                otherReloc = self.getRelocSymbolsByOffset().get(luiOffset)
                                 if otherReloc is not None:
                                     otherReloc.name = relocSymbol.name
                                     self.instrAnalyzer.symbolInstrOffset[luiOffset] = 0
@@ -113,22 +183,14 @@ class SymbolFunction(SymbolText):
                             self.context.offsetSymbols[sectType][addressOffset] = contextOffsetSym
                             relocSymbol.name = relocName
                             self.instrAnalyzer.symbolInstrOffset[instructionOffset] = 0
-            inFileOffset += 4
-            instructionOffset += 4
 
 
-    def analyze(self):
-        if not common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS and self.hasUnimplementedIntrs:
-            offset = 0
-            for instr in self.instructions:
-                currentVram = self.getVramOffset(offset)
-                contextSym = self.getSymbol(currentVram, False)
-                if contextSym is not None:
-                    contextSym.isDefined = True
-                offset += 4
-            return
+    def _analyzeInstructions(self) -> bool:
+        """Runs the instruction analysis without modifying the context.
 
+        Returns False if the analysis was aborted because of an unimplemented instruction"""
         regsTracker = rabbitizer.RegistersTracker()
+        drivingRelocSymbols = self._getDrivingRelocSymbols()
 
         instructionOffset = 0
         for instr in self.instructions:
@@ -143,10 +205,10 @@ class SymbolFunction(SymbolText):
             if not common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS and not instr.isImplemented():
                 # Abort analysis
                 self.hasUnimplementedIntrs = True
-                return
+                return False
 
             if not prevInstr.isBranchLikely() and not prevInstr.isUnconditionalBranch():
-                self.instrAnalyzer.processInstr(regsTracker, instr, instructionOffset, currentVram, prevInstr, self.context.got)
+                self._processInstr(regsTracker, instr, instructionOffset, currentVram, prevInstr, drivingRelocSymbols)
 
             # look-ahead symbol finder
             self._lookAheadSymbolFinder(instr, prevInstr, instructionOffset, regsTracker)
@@ -156,21 +218,21 @@ class SymbolFunction(SymbolText):
             instructionOffset += 4
 
         self.instrAnalyzer.printSymbolFinderDebugInfo_UnpairedLuis()
+        return True
 
+    def _applyAnalysisToContext(self):
         self._processElfRelocSymbols()
 
         # Branches
         for instrOffset, targetBranchVram in self.instrAnalyzer.branchInstrOffsets.items():
             branch = self.instrAnalyzer.branchTargetInstrOffsets[instrOffset]
             labelSym = self.addBranchLabel(targetBranchVram, isAutogenerated=True, symbolVrom=self.getVromOffset(branch))
-            labelSym.referenceCounter += 1
-            labelSym.referenceFunctions.add(self.contextSym)
+            self._addReference(labelSym)
 
         # Function calls
         for targetVram in self.instrAnalyzer.funcCallInstrOffsets.values():
             funcSym = self.addFunction(targetVram, isAutogenerated=True)
-            funcSym.referenceCounter += 1
-            funcSym.referenceFunctions.add(self.contextSym)
+            self._addReference(funcSym)
 
         if not self.isRsp and len(self.instrAnalyzer.funcCallOutsideRangesOffsets) > 0:
             self.isLikelyHandwritten = True
@@ -186,7 +248,7 @@ class SymbolFunction(SymbolText):
                 symVram = patchedAddress
 
             symType = self.instrAnalyzer.possibleSymbolTypes.get(symVram, None)
-            contextSym = self.getSymbol(symVram)
+            contextSym = self._getSymbolCached(symVram)
             if contextSym is None:
                 if not common.GlobalConfig.ADD_NEW_SYMBOLS:
                     continue
@@ -199,14 +261,13 @@ class SymbolFunction(SymbolText):
                             if not (contextSym.getSize() > 4):
                                 if contextSym.size is None or symVram >= contextSym.address + contextSym.size:
                                     if common.GlobalConfig.ADD_NEW_SYMBOLS:
-                                        if symType is not None:
-                                            contextSym.setTypeIfUnset(symType)
+                                        if symType is not None and contextSym.setTypeIfUnset(symType):
+                                            self.context.symbolsChanged(contextSym.address)
                                         contextSym = self.addSymbol(symVram, isAutogenerated=True)
 
-            contextSym.referenceCounter += 1
-            contextSym.referenceFunctions.add(self.contextSym)
-            if symType is not None:
-                contextSym.setTypeIfUnset(symType)
+            self._addReference(contextSym)
+            if symType is not None and contextSym.setTypeIfUnset(symType):
+                self.context.symbolsChanged(contextSym.address)
 
         # Jump tables
         for targetVram in self.instrAnalyzer.jumpRegisterIntrOffset.values():
@@ -221,7 +282,7 @@ class SymbolFunction(SymbolText):
                 # This $gp load was not paired with any other symbol
                 gpSymbolAddress = self.instrAnalyzer.symbolInstrOffset.get(gpLoadOffset)
             if gpSymbolAddress is not None:
-                contextSym = self.getSymbol(gpSymbolAddress, tryPlusOffset=False)
+                contextSym = self._getSymbolCached(gpSymbolAddress, tryPlusOffset=False)
                 if contextSym is not None:
                     contextSym.isGot = True
             elif common.GlobalConfig.GP_VALUE is not None:
@@ -230,11 +291,108 @@ class SymbolFunction(SymbolText):
                 self.instrAnalyzer.symbolInstrOffset[gpLoadOffset] = gpSymbolAddress
                 self.addSymbol(gpSymbolAddress, isAutogenerated=True)
 
+        # Pointers found in data which point inside this function (i.e. tables of labels) need a label which the data can reference
+        for pointer in list(self.getPointerInDataReferencesRange(self.vram + 4, self.vramEnd)):
+            if pointer % 4 == 0 and self.popPointerInDataReference(pointer) is not None:
+                self.addJumpTableLabel(pointer, isAutogenerated=True, symbolVrom=self.getVromOffset(pointer - self.vram))
+
         if self.isLikelyHandwritten:
             for instr in self.instructions:
                 instr.inHandwrittenFunction = self.isLikelyHandwritten
 
 
+    def analyze(self):
+        if not common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS and self.hasUnimplementedIntrs:
+            offset = 0
+            for instr in self.instructions:
+                currentVram = self.getVramOffset(offset)
+                contextSym = self.getSymbol(currentVram, False)
+                if contextSym is not None:
+                    contextSym.isDefined = True
+                offset += 4
+            return
+
+        if not self._analyzeInstructions():
+            return
+
+        self._applyAnalysisToContext()
+
+    def getAnalysisDependencies(self) -> tuple:
+        "The pointers found in data which point inside this function, and the symbols each %lo instruction of this function resolved to"
+        pointersInRange = tuple(self.getPointerInDataReferencesRange(self.vram + 4, self.vramEnd))
+        if len(self.context.relocSymbols[common.FileSectionType.Text]) > 0:
+            # Relocations already tell which symbol is referenced by each instruction
+            return (pointersInRange, ())
+
+        dependencies: list[tuple[int, int|None, int|None, common.SymbolSpecialType|str|None]] = list()
+        for loOffset, symVram in self.instrAnalyzer.symbolLoInstrOffset.items():
+            patchedAddress = self.getLoPatch(self.getVramOffset(loOffset))
+            if patchedAddress is not None:
+                symVram = patchedAddress
+
+            contextSym = self._getSymbolCached(symVram)
+            if contextSym is None:
+                dependencies.append((symVram, None, None, None))
+            else:
+                dependencies.append((symVram, contextSym.address, contextSym.size, contextSym.type))
+        return (pointersInRange, tuple(dependencies))
+
+    def getAnalysisDependencyRanges(self) -> list[tuple[int, int]]:
+        """This function, for the pointers found in data.
+        And from the symbol each %lo instruction resolved to up to the referenced address, since only a symbol added in between can change the result"""
+        ranges: list[tuple[int, int]] = [(self.vram + 4, self.vramEnd)]
+        if len(self.context.relocSymbols[common.FileSectionType.Text]) > 0:
+            return ranges
+
+        for loOffset, symVram in self.instrAnalyzer.symbolLoInstrOffset.items():
+            patchedAddress = self.getLoPatch(self.getVramOffset(loOffset))
+            if patchedAddress is not None:
+                symVram = patchedAddress
+
+            contextSym = self._getSymbolCached(symVram)
+            if contextSym is None:
+                # A symbol without a size added right before the address may contain it
+                ranges.append((symVram - 7, symVram + 1))
+            else:
+                ranges.append((contextSym.address, symVram + 1))
+        return ranges
+
+    def resetAnalysis(self) -> None:
+        super().resetAnalysis()
+        for contextSym in self._referencedSymbols:
+            contextSym.referenceCounter -= 1
+            contextSym.referenceFunctions.discard(self.contextSym)
+            self.context.markAddressChanged(contextSym.address)
+        self._referencedSymbols = list()
+
+        self.instrAnalyzer = analysis.InstrAnalyzer(self.vram)
+        self.branchesTaken = set()
+        self.isLikelyHandwritten = False
+        self._labelsDefined = False
+
+    def getAnalysisResult(self) -> analysis.FunctionAnalysisResult:
+        """Runs only the part of `analyze` which does not modify the context.
+
+        The result can be applied to an equivalent function with `applyAnalysisResult`, even one living on another process.
+        Functions which need the early path of `analyze` (unimplemented instructions found during the section analysis) should not use this method"""
+        completed = self._analyzeInstructions()
+        return analysis.FunctionAnalysisResult(completed, self.isLikelyHandwritten, self.hasUnimplementedIntrs, self.branchesTaken, self.instrAnalyzer.exportState())
+
+    def applyAnalysisResult(self, result: analysis.FunctionAnalysisResult):
+        """Finishes the analysis of this function using a result produced by `getAnalysisResult`.
+
+        Doing `func.applyAnalysisResult(func.getAnalysisResult())` is equivalent to calling `func.analyze()`"""
+        self.isLikelyHandwritten = result.isLikelyHandwritten
+        self.hasUnimplementedIntrs = result.hasUnimplementedIntrs
+        self.branchesTaken = result.branchesTaken
+        self.instrAnalyzer.importState(result.instrAnalyzerState, self.instructions)
+
+        if not result.completed:
+            return
+
+        self._applyAnalysisToContext()
+
+
     def countExtraPadding(self) -> int:
         count = 0
         for i in range(len(self.instructions)-1, 0, -1):
@@ -344,6 +502,24 @@ class SymbolFunction(SymbolText):
 
         return f"%lo({symName})"
 
+    def generateRelocStr(self, instr: rabbitizer.Instruction, relocSymbol: common.ContextRelocSymbol) -> str:
+        "Operand for an instruction relocated by `relocSymbol`, using the operator of its relocation type"
+        assert relocSymbol.addend is not None
+        symName = relocSymbol.getNamePlusOffset(relocSymbol.addend)
+        if not instr.hasOperandAlias(rabbitizer.OperandType.cpu_immediate):
+            return symName
+
+        relocType = RelocTypes.fromValue(relocSymbol.relocType)
+        if relocType == RelocTypes.R_MIPS_HI16:
+            return f"%hi({symName})"
+        if relocType == RelocTypes.R_MIPS_GOT16:
+            return f"%got({symName})"
+        if relocType == RelocTypes.R_MIPS_CALL16:
+            return f"%call16({symName})"
+        if relocType == RelocTypes.R_MIPS_GPREL16:
+            return f"%gp_rel({symName})"
+        return f"%lo({symName})"
+
     def generateHiLoConstantStr(self, constantValue: int, currentInstr: rabbitizer.Instruction, loInstr: rabbitizer.Instruction|None) -> str|None:
         if loInstr is None:
             if currentInstr.canBeHi():
@@ -376,7 +552,11 @@ class SymbolFunction(SymbolText):
     def getImmOverrideForInstruction(self, instr: rabbitizer.Instruction, instructionOffset: int) -> str|None:
         if len(self.context.relocSymbols[self.sectionType]) > 0:
             # Check possible symbols using reloc information (probably from a .o elf file)
-            possibleImmOverride = self.context.getRelocSymbol(self.inFileOffset + instructionOffset, self.sectionType)
+            drivingRelocSymbol = self._getDrivingRelocSymbols().get(instructionOffset)
+            if drivingRelocSymbol is not None:
+                return self.generateRelocStr(instr, drivingRelocSymbol)
+
+            possibleImmOverride = self.getRelocSymbolsByOffset().get(instructionOffset)
             if possibleImmOverride is not None:
                 auxOverride = possibleImmOverride.getName()
                 if instr.hasOperandAlias(rabbitizer.OperandType.cpu_immediate):
@@ -391,7 +571,7 @@ class SymbolFunction(SymbolText):
             if not common.GlobalConfig.IGNORE_BRANCHES:
                 branchOffset = instr.getBranchOffsetGeneric()
                 targetBranchVram = self.getVramOffset(instructionOffset + branchOffset)
-                labelSymbol = self.getSymbol(targetBranchVram, tryPlusOffset=False)
+                labelSymbol = self._getSymbolCached(targetBranchVram, tryPlusOffset=False)
                 if labelSymbol is not None:
                     return labelSymbol.getName()
 
@@ -414,9 +594,9 @@ class SymbolFunction(SymbolText):
                 # Check for user-defined symbol patches
                 patchedAddress = self.getLoPatch(instrVram)
                 if patchedAddress is not None:
-                    symbol = self.getSymbol(patchedAddress, tryPlusOffset=True, checkUpperLimit=False)
+                    symbol = self._getSymbolCached(patchedAddress, tryPlusOffset=True, checkUpperLimit=False)
                 else:
-                    symbol = self.getSymbol(address, tryPlusOffset=True)
+                    symbol = self._getSymbolCached(address, tryPlusOffset=True)
 
                 if symbol is not None:
                     return self.generateHiLoStr(instr, symbol.getSymbolPlusOffset(address), symbol)
@@ -446,16 +626,32 @@ class SymbolFunction(SymbolText):
                 return self.generateHiLoConstantStr(instr.getImmediate()<<16, instr, None)
 
         elif instr.isJumpWithAddress():
-            possibleOverride = self.getSymbol(instr.getInstrIndexAsVram(), tryPlusOffset=False)
+            possibleOverride = self._getSymbolCached(instr.getInstrIndexAsVram(), tryPlusOffset=False)
             if possibleOverride is not None:
                 return possibleOverride.getName()
 
         return None
 
-    def getLabelForOffset(self, instructionOffset: int) -> str:
+    def getLabelsOffsets(self) -> list[int]:
+        """Returns the sorted offsets of the instructions of this function which may have a label.
+
+        `getLabelForOffset` returns an empty string for every other offset"""
+        offsets: set[int] = set()
+        for vram in self.getSymbolsVramsInRange(self.vram, self.vramEnd):
+            offsets.add(vram - self.vram)
+
+        for offset, _ in self.context.getOffsetGenericLabelsRange(self.inFileOffset, self.inFileOffset + self.sizew*4):
+            offsets.add(offset - self.inFileOffset)
+
+        for offset, _ in self.context.getOffsetSymbolsRange(self.sectionType, self.inFileOffset, self.inFileOffset + self.sizew*4):
+            offsets.add(offset - self.inFileOffset)
+
+        return sorted(offset for offset in offsets if offset % 4 == 0)
+
+    def _getLabelSymbolForOffset(self, instructionOffset: int) -> common.ContextSymbol|None:
         if common.GlobalConfig.IGNORE_BRANCHES or instructionOffset == 0:
             # Skip over this function to avoid duplication
-            return ""
+            return None
 
         currentVram = self.getVramOffset(instructionOffset)
         labelSym = self.getSymbol(currentVram, tryPlusOffset=False)
@@ -465,10 +661,33 @@ class SymbolFunction(SymbolText):
             labelSym = self.context.getOffsetSymbol(self.inFileOffset+instructionOffset, common.FileSectionType.Text)
 
         if labelSym is None or labelSym.overlayCategory != self.overlayCategory:
+            return None
+        return labelSym
+
+    def defineLabels(self) -> None:
+        """Marks the symbols of the labels of this function as defined in this section.
+
+        Must be called after every section has been analyzed, since analyzing other sections can add labels to this function (i.e. jump table labels).
+        `disassemble` calls it if it wasn't called since the last analysis, but calling it beforehand makes rendering not modify the context,
+        so every function can be rendered in any order or in parallel"""
+        self._labelsDefined = True
+        if not common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS and self.hasUnimplementedIntrs:
+            # Disassembled as data, so there are no labels
+            return
+
+        for instructionOffset in self.getLabelsOffsets():
+            if instructionOffset >= self.sizew*4:
+                continue
+            labelSym = self._getLabelSymbolForOffset(instructionOffset)
+            if labelSym is not None:
+                labelSym.isDefined = True
+                labelSym.sectionType = self.sectionType
+
+    def getLabelForOffset(self, instructionOffset: int) -> str:
+        labelSym = self._getLabelSymbolForOffset(instructionOffset)
+        if labelSym is None:
             return ""
 
-        labelSym.isDefined = True
-        labelSym.sectionType = self.sectionType
         if labelSym.type == common.SymbolSpecialType.function or labelSym.type == common.SymbolSpecialType.jumptablelabel:
             label = labelSym.getSymbolLabel()
             if label:
@@ -482,6 +701,9 @@ class SymbolFunction(SymbolText):
     def disassemble(self) -> str:
         output = ""
 
+        if not self._labelsDefined:
+            self.defineLabels()
+
         if not common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS:
             if self.hasUnimplementedIntrs:
                 return self.disassembleAsData()
@@ -499,11 +721,15 @@ class SymbolFunction(SymbolText):
         if common.GlobalConfig.ASM_TEXT_FUNC_AS_LABEL:
             output += f"{self.getName()}:" + common.GlobalConfig.LINE_ENDS
 
+        labelsOffsets = self.getLabelsOffsets()
+        labelIndex = 0
+
         wasLastInstABranch = False
         instructionOffset = 0
         for instr in self.instructions:
-            label = self.getLabelForOffset(instructionOffset)
-            output += label
+            if labelIndex < len(labelsOffsets) and labelsOffsets[labelIndex] == instructionOffset:
+                output += self.getLabelForOffset(instructionOffset)
+                labelIndex += 1
 
             cpload = self.instrAnalyzer.cploads.get(instructionOffset)
             if common.GlobalConfig.EMIT_CPLOAD and cpload is not None:
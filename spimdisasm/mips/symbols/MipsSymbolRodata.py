@@ -84,11 +84,13 @@ class SymbolRodata(SymbolBase):
             if self.sizew % 2 != 0:
                 # doubles require an even amount of words
                 self.contextSym.type = None
+                self.context.symbolsChanged(self.contextSym.address)
             else:
                 for i in range(self.sizew // 2):
                     if not self.isDouble(i*2):
                         # checks there's no other overlaping symbols
                         self.contextSym.type = None
+                        self.context.symbolsChanged(self.contextSym.address)
                         break
 
         super().analyze()
@@ -169,7 +171,7 @@ class SymbolRodata(SymbolBase):
                     label += f"{possibleSymbolName.getName()}:" + common.GlobalConfig.LINE_ENDS
 
         if len(self.context.relocSymbols[self.sectionType]) > 0:
-            possibleReference = self.context.getRelocSymbol(self.inFileOffset + localOffset, self.sectionType)
+            possibleReference = self.getRelocSymbolsByOffset().get(localOffset)
             if possibleReference is not None:
                 value = possibleReference.getNamePlusOffset(w)
                 if possibleReference.type == common.SymbolSpecialType.jumptablelabel:
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import dataclasses
+from typing import Any
+
+
+@dataclasses.dataclass
+class FunctionAnalysisResult:
+    """Everything the instruction analysis of a function produces before touching the context.
+
+    It does not hold any rabbitizer object, so it can be produced on a worker process and applied afterwards on the main one"""
+
+    completed: bool
+    "False if the analysis was aborted because of an unimplemented instruction"
+    isLikelyHandwritten: bool
+    hasUnimplementedIntrs: bool
+    branchesTaken: set[int]
+    instrAnalyzerState: dict[str, Any]
+    "See `InstrAnalyzer.exportState`"
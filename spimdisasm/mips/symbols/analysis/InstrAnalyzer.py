@@ -6,6 +6,7 @@
 from __future__ import annotations
 
 import dataclasses
+from typing import Any
 import rabbitizer
 
 from .... import common
@@ -19,6 +20,17 @@ class CploadInfo:
     reg: rabbitizer.Enum|None = None
 
 class InstrAnalyzer:
+    _plainStateFields = (
+        "funcVram", "referencedVrams", "referencedConstants", "referencedVramsInstrOffset",
+        "branchInstrOffsets", "branchTargetInstrOffsets", "branchLabelOffsets",
+        "funcCallInstrOffsets", "funcCallOutsideRangesOffsets",
+        "jumpRegisterIntrOffset", "referencedJumpTableOffsets",
+        "constantHiInstrOffset", "constantLoInstrOffset", "constantInstrOffset",
+        "symbolHiInstrOffset", "symbolLoInstrOffset", "symbolGpInstrOffset", "symbolInstrOffset", "possibleSymbolTypes",
+        "hiToLowDict", "lowToHiDict", "nonLoInstrOffsets", "cploadOffsets",
+    )
+    "Fields exported as they are by `exportState`. The ones which reference rabbitizer objects are converted explicitly"
+
     def __init__(self, funcVram: int) -> None:
         self.funcVram = funcVram
 
@@ -88,6 +100,31 @@ class InstrAnalyzer:
         "Completed cpload, key: offset of last instruction of the cpload"
 
 
+    def exportState(self) -> dict[str, Any]:
+        """Returns the whole analysis state in a form which does not reference any rabbitizer object, so it can be sent between processes.
+
+        Instructions are stored as their offsets and can be recovered with `importState`."""
+        state: dict[str, Any] = {name: getattr(self, name) for name in InstrAnalyzer._plainStateFields}
+        state["luiInstrs"] = list(self.luiInstrs.keys())
+        state["gpLoads"] = list(self.gpLoads.keys())
+        state["unpairedCploads"] = [CploadInfo(cpload.hiOffset, cpload.loOffset, cpload.adduOffset) for cpload in self.unpairedCploads]
+        state["cploads"] = {offset: CploadInfo(cpload.hiOffset, cpload.loOffset, cpload.adduOffset) for offset, cpload in self.cploads.items()}
+        return state
+
+    def importState(self, state: dict[str, Any], instructions: list[rabbitizer.Instruction]) -> None:
+        """Restores a state produced by `exportState`, using the passed instructions to recover the instructions referenced by the state"""
+        for name in InstrAnalyzer._plainStateFields:
+            setattr(self, name, state[name])
+
+        self.luiInstrs = {offset: instructions[offset//4] for offset in state["luiInstrs"]}
+        self.gpLoads = {offset: instructions[offset//4] for offset in state["gpLoads"]}
+        self.unpairedCploads = list(state["unpairedCploads"])
+        self.cploads = dict(state["cploads"])
+        for cpload in self.unpairedCploads + list(self.cploads.values()):
+            if cpload.adduOffset is not None:
+                cpload.reg = instructions[cpload.adduOffset//4].rt
+
+
     def processBranch(self, instr: rabbitizer.Instruction, instrOffset: int, currentVram: int) -> None:
         if instrOffset in self.branchInstrOffsets:
             # Already processed
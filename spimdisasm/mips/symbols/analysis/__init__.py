@@ -6,3 +6,4 @@
 from __future__ import annotations
 
 from .InstrAnalyzer import InstrAnalyzer
+from .FunctionAnalysisResult import FunctionAnalysisResult
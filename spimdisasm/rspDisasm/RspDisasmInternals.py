@@ -84,6 +84,7 @@ def rspDisasmMain():
     f.analyze()
     f.printAnalyzisResults()
 
+    f.defineLabels()
     mips.FilesHandlers.writeSection(Path(args.output), f)
 
     if args.save_context is not None:
@@ -6,6 +6,7 @@
 from __future__ import annotations
 
 import argparse
+import functools
 from pathlib import Path
 
 from .. import common
@@ -34,6 +35,12 @@ def getArgsParser() -> argparse.ArgumentParser:
     parser.add_argument("--file-splits", help="Path to a file splits csv")
 
     parser.add_argument("--split-functions", help="Enables the function and rodata splitter. Expects a path to place the splited functions", metavar="PATH")
+    parser.add_argument("--split-functions-pack", help="Place the splited functions and rodata in a single uncompressed zip file instead of one file per function. Expects a path to the container file. The paths inside the container are relative to the --split-functions path", metavar="PATH")
+
+    parser.add_argument("--incremental-analysis", help="Analyze again the files and functions which depend on symbols found after they were analyzed, until nothing changes", action="store_true")
+
+    parser.add_argument("--jobs", help="Amount of processes used to speculatively prefetch the analysis of the next text files and to render the output files in parallel. Files are still merged into the context one at a time. Rendering in parallel only works on platforms which can fork processes. The output is the same regardless of this value. Defaults to 1", type=int, default=1, metavar="N")
+    parser.add_argument("--chunked-boundary-detection", help="Search the function boundaries of big text files by scanning chunks of them in parallel. Needs --jobs to be bigger than 1", action="store_true")
 
     parser.add_argument("--nuke-pointers", help="Use every technique available to remove pointers", action=common.Utils.BooleanOptionalAction)
     parser.add_argument("--ignore-words", help="A space separated list of hex numbers. Any word differences which starts in any of the provided arguments will be ignored. Max value: FF. Only works when --nuke-pointers is passed", action="extend", nargs="+")
@@ -147,24 +154,46 @@ def changeGlobalSegmentRanges(context: common.Context, processedFiles: dict[comm
     context.globalSegment.changeRanges(0, highestVromEnd, lowestVramStart, highestVramEnd)
     return
 
-def analyzeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount: int):
+def analyzeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount: int, incrementalAnalysis: bool=False, jobs: int=1, chunkedBoundaryDetection: bool=False):
     global sLenLastLine
 
     i = 0
-    for section, filesInSection in processedFiles.items():
-        pathLists = processedFilesOutputPaths[section]
-        for fileIndex, f in enumerate(filesInSection):
-            path = pathLists[fileIndex]
-            common.Utils.printQuietless(sLenLastLine*" " + "\r", end="")
-            progressStr = f"Analyzing: {i/processedFilesCount:%}. File: {path}\r"
-            sLenLastLine = max(len(progressStr), sLenLastLine)
-            common.Utils.printQuietless(progressStr, end="", flush=True)
-            common.Utils.printVerbose("")
+    def preAnalysis(sectionType: common.FileSectionType, fileIndex: int) -> None:
+        global sLenLastLine
 
-            f.analyze()
-            f.printAnalyzisResults()
+        path = processedFilesOutputPaths[sectionType][fileIndex]
+        common.Utils.printQuietless(sLenLastLine*" " + "\r", end="")
+        progressStr = f"Analyzing: {i/processedFilesCount:%}. File: {path}\r"
+        sLenLastLine = max(len(progressStr), sLenLastLine)
+        common.Utils.printQuietless(progressStr, end="", flush=True)
+        common.Utils.printVerbose("")
 
-            i += 1
+    def postAnalysis(sectionType: common.FileSectionType, fileIndex: int) -> None:
+        nonlocal i
+
+        f = processedFiles[sectionType][fileIndex]
+        if incrementalAnalysis:
+            f.saveAnalysisDependencies()
+        f.printAnalyzisResults()
+
+        i += 1
+
+    scheduler = mips.AnalysisScheduler(processedFiles, jobs, chunkedBoundaryDetection)
+    scheduler.analyze(preAnalysis, postAnalysis)
+    return
+
+def reanalyzeDependentFiles(processedFiles):
+    common.Utils.printVerbose("Analyzing dependent files again...")
+    sectionsList = [f for filesInSection in processedFiles.values() for f in filesInSection]
+    passes = mips.FilesHandlers.reanalyzeDependents(sectionsList)
+    common.Utils.printVerbose(f"Done after {passes} passes")
+    return
+
+def defineLabels(processedFiles):
+    common.Utils.printVerbose("Defining labels...")
+    for filesInSection in processedFiles.values():
+        for f in filesInSection:
+            f.defineLabels()
     return
 
 def nukePointers(processedFiles, processedFilesCount: int):
@@ -184,9 +213,14 @@ def nukePointers(processedFiles, processedFilesCount: int):
             i += 1
     return
 
-def writeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount: int):
+def writeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount: int, writer: common.OutputWriter|None=None, jobs: int=1):
     global sLenLastLine
 
+    renderedFiles: list[str]|None = None
+    if jobs > 1:
+        common.Utils.printVerbose("Rendering files...")
+        renderedFiles = mips.FilesHandlers.renderInParallel([f.render for filesInSection in processedFiles.values() for f in filesInSection], jobs)
+
     common.Utils.printVerbose("Writing files...")
     i = 0
     for section, filesInSection in processedFiles.items():
@@ -202,15 +236,23 @@ def writeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFile
             if path == "-":
                 common.Utils.printQuietless()
 
-            mips.FilesHandlers.writeSection(Path(path), f)
+            mips.FilesHandlers.writeSection(Path(path), f, writer, renderedFiles[i] if renderedFiles is not None else None)
             i += 1
     return
 
-def migrateFunctions(processedFiles, functionMigrationPath: Path):
+def migrateFunctions(processedFiles, functionMigrationPath: Path, writer: common.OutputWriter|None=None, jobs: int=1):
     global sLenLastLine
 
     common.Utils.printVerbose("\nSpliting functions...")
     funcTotal = sum(len(x.symbolList) for x in processedFiles[common.FileSectionType.Text])
+    rodataIndex = mips.FilesHandlers.RodataMigrationIndex(processedFiles[common.FileSectionType.Text], processedFiles[common.FileSectionType.Rodata])
+
+    renderedFunctions: list[str]|None = None
+    if jobs > 1:
+        common.Utils.printVerbose("Rendering functions...")
+        renderCallbacks = [functools.partial(mips.FilesHandlers.renderSplitedFunction, func, processedFiles[common.FileSectionType.Rodata], rodataIndex) for f in processedFiles[common.FileSectionType.Text] for func in f.symbolList]
+        renderedFunctions = mips.FilesHandlers.renderInParallel(renderCallbacks, jobs)
+
     i = 0
     for f in processedFiles[common.FileSectionType.Text]:
         for func in f.symbolList:
@@ -223,10 +265,10 @@ def migrateFunctions(processedFiles, functionMigrationPath: Path):
 
             assert isinstance(func, mips.symbols.SymbolFunction)
             functionPath = functionMigrationPath / f.name
-            mips.FilesHandlers.writeSplitedFunction(functionPath, func, processedFiles[common.FileSectionType.Rodata])
+            mips.FilesHandlers.writeSplitedFunction(functionPath, func, processedFiles[common.FileSectionType.Rodata], rodataIndex, writer, renderedFunctions[i] if renderedFunctions is not None else None)
 
             i += 1
-    mips.FilesHandlers.writeOtherRodata(functionMigrationPath, processedFiles[common.FileSectionType.Rodata])
+    mips.FilesHandlers.writeOtherRodata(functionMigrationPath, processedFiles[common.FileSectionType.Rodata], writer)
 
 
 def disassemblerMain():
@@ -264,15 +306,32 @@ def disassemblerMain():
     for sect in processedFiles.values():
         processedFilesCount += len(sect)
 
-    analyzeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount)
+    analyzeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount, args.incremental_analysis, args.jobs, args.chunked_boundary_detection)
+
+    if args.incremental_analysis:
+        reanalyzeDependentFiles(processedFiles)
+
+    # Rendering doesn't modify the context after this point
+    defineLabels(processedFiles)
 
     if args.nuke_pointers:
         nukePointers(processedFiles, processedFilesCount)
 
-    writeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount)
-
-    if args.split_functions is not None:
-        migrateFunctions(processedFiles, Path(args.split_functions))
+    # Files are rendered in this thread (or in parallel before writing them if jobs > 1) while the previous ones are written in the background
+    with common.OutputWriter() as writer:
+        writeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount, writer, args.jobs)
+
+        if args.split_functions is not None:
+            if args.jobs > 1:
+                # The render processes must not be forked while the writer threads are running
+                writer.flush()
+            if args.split_functions_pack is not None:
+                with common.PackedOutputWriter(Path(args.split_functions_pack), Path(args.split_functions)) as packedWriter:
+                    migrateFunctions(processedFiles, Path(args.split_functions), packedWriter, args.jobs)
+                # Both writers save the same manifest, the outer one is closed last
+                writer.addManifestEntries(packedWriter)
+            else:
+                migrateFunctions(processedFiles, Path(args.split_functions), writer, args.jobs)
 
     if args.save_context is not None:
         contextPath = Path(args.save_context)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from spimdisasm import common
+from spimdisasm import mips
+from spimdisasm.mips.sections import MipsSectionText
+
+
+VRAM = 0x80000400
+
+NOP = 0x00000000
+JR_RA = 0x03E00008
+SW_RA = 0xAFBF0014
+LW_RA = 0x8FBF0014
+
+
+def addiuSp(value: int) -> int:
+    return 0x27BD0000 | (value & 0xFFFF)
+
+def jal(target: int) -> int:
+    return 0x0C000000 | ((target >> 2) & 0x03FFFFFF)
+
+def b(offset: int) -> int:
+    "`offset` is relative to the delay slot, in instructions"
+    return 0x10000000 | (offset & 0xFFFF)
+
+def bnez(offset: int) -> int:
+    return 0x14400000 | (offset & 0xFFFF)
+
+
+def makeFunctions(seed: int, count: int) -> list[int]:
+    """Generates the words of `count` functions, including loops, branches over the `jr $ra`, calls to any of the functions
+    and nop padding between them"""
+    rng = random.Random(seed)
+    words: list[int] = list()
+    starts: list[int] = list()
+    calls: list[int] = list()
+    for _ in range(count):
+        for _ in range(rng.choice((0, 0, 1, 3))):
+            words.append(NOP)
+        starts.append(len(words))
+
+        body: list[int] = list()
+        for _ in range(rng.randrange(2, 24)):
+            kind = rng.randrange(6)
+            if kind == 0:
+                calls.append(len(words) + 2 + len(body))
+                body += [jal(0), NOP]
+            elif kind == 1 and len(body) > 0:
+                # Loop back to the start of the body
+                body += [bnez(-len(body) - 1), NOP]
+            else:
+                body.append(0x24420001) # addiu $v0, $v0, 1
+
+        if rng.randrange(4) == 0:
+            # Branch over the first return to a second one
+            tail = [0x24420001] * rng.randrange(1, 4)
+            words += [addiuSp(-0x18), SW_RA] + body + [b(3), NOP, JR_RA, NOP] + tail + [LW_RA, JR_RA, addiuSp(0x18)]
+        else:
+            words += [addiuSp(-0x18), SW_RA] + body + [LW_RA, JR_RA, addiuSp(0x18)]
+
+    for index in calls:
+        words[index] = jal(VRAM + rng.choice(starts) * 4)
+    return words
+
+
+def analyzeSection(words: list[int], jobs: int, chunked: bool) -> tuple[list, list[int], list[int]]:
+    context = common.Context()
+    size = len(words) * 4
+    context.globalSegment.changeRanges(0, size, VRAM, VRAM + size)
+
+    array_of_bytes = bytearray()
+    for word in words:
+        array_of_bytes += word.to_bytes(4, "big")
+
+    section = mips.sections.SectionText(context, 0, size, VRAM, "test", array_of_bytes, 0, None)
+    section.jobs = jobs
+    section.chunkedBoundaryDetection = chunked
+    section.analyze()
+
+    functions = [(func.vram, func.sizew) for func in section.symbolList]
+    contextFunctions = [vram for vram, contextSym in context.globalSegment.symbols.items() if contextSym.type == common.SymbolSpecialType.function]
+    return functions, section.fileBoundaries, contextFunctions
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_chunked_starts_match_sequential(seed: int, monkeypatch: pytest.MonkeyPatch):
+    # Small chunks, so every seam between functions is tested
+    monkeypatch.setattr(MipsSectionText, "_CHUNKED_BOUNDARY_DETECTION_MIN_INSTRUCTIONS", 0x40)
+    words = makeFunctions(seed, 200)
+
+    sequential = analyzeSection(words, 1, False)
+    chunked = analyzeSection(words, 4, True)
+
+    assert len(sequential[0]) > 1
+    assert chunked == sequential
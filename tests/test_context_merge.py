@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from spimdisasm import common
+
+
+VRAM_START = 0x80000000
+FILE_SIZE = 0x100
+BASE_FUNCTIONS = 4
+
+
+def makeBaseContext() -> common.Context:
+    "The state every analysis starts from, for example the symbols declared by the user"
+    context = common.Context()
+    for i in range(BASE_FUNCTIONS):
+        contextSym = context.globalSegment.addFunction(VRAM_START + i * FILE_SIZE)
+        contextSym.isUserDeclared = True
+        contextSym.referenceCounter = 1
+    return context
+
+
+def makeFiles(seed: int, fileCount: int) -> list[list[tuple]]:
+    """Generates the analysis of each file as a list of operations.
+
+    Every file owns a range of addresses where it defines its functions, but it may reference any address of any file"""
+    rng = random.Random(seed)
+    totalSize = fileCount * FILE_SIZE
+    files: list[list[tuple]] = list()
+    for fileIndex in range(fileCount):
+        fileStart = VRAM_START + fileIndex * FILE_SIZE
+        operations: list[tuple] = list()
+        functions = sorted(rng.sample(range(fileStart, fileStart + FILE_SIZE, 4), 3))
+        for func in functions:
+            operations.append(("function", func))
+            for _ in range(rng.randrange(1, 8)):
+                target = VRAM_START + rng.randrange(0, totalSize, 4)
+                kind = rng.choice(("symbol", "branchlabel", "function"))
+                size = rng.choice((None, 4, 8))
+                operations.append(("reference", func, target, kind, size))
+        for _ in range(rng.randrange(0, 4)):
+            offset = fileIndex * FILE_SIZE + rng.randrange(0, FILE_SIZE, 4)
+            addend = rng.choice((None, 0, 0x10))
+            operations.append(("reloc", offset, f"sym_{offset:X}", rng.choice((4, 5, 6)), addend))
+        files.append(operations)
+    return files
+
+
+def analyzeFile(context: common.Context, operations: list[tuple]) -> None:
+    for operation in operations:
+        if operation[0] == "function":
+            contextSym = context.globalSegment.addFunction(operation[1])
+            contextSym.isDefined = True
+        elif operation[0] == "reference":
+            _, func, target, kind, size = operation
+            funcSym = context.globalSegment.getSymbol(func, tryPlusOffset=False)
+            assert funcSym is not None
+            if kind == "function":
+                contextSym = context.globalSegment.addFunction(target)
+            elif kind == "branchlabel":
+                contextSym = context.globalSegment.addBranchLabel(target)
+            else:
+                contextSym = context.globalSegment.addSymbol(target)
+            if contextSym.size is None:
+                contextSym.size = size
+            contextSym.referenceCounter += 1
+            contextSym.referenceFunctions.add(funcSym)
+        elif operation[0] == "reloc":
+            _, offset, name, relocType, addend = operation
+            relocSym = common.ContextRelocSymbol(offset, name, common.FileSectionType.Text)
+            relocSym.relocType = relocType
+            relocSym.addend = addend
+            context.relocSymbols[common.FileSectionType.Text][offset] = relocSym
+
+
+def summarizeContext(context: common.Context) -> tuple[list[tuple], list[tuple]]:
+    symbols: list[tuple] = list()
+    for address, contextSym in context.globalSegment.symbols.items():
+        for func in contextSym.referenceFunctions:
+            # The referencing functions must be the ones from this context
+            assert context.globalSegment.symbols[func.address] is func
+        referenceFunctions = sorted(func.address for func in contextSym.referenceFunctions)
+        symbols.append((address, contextSym.type, contextSym.size, contextSym.sectionType, contextSym.isDefined, contextSym.referenceCounter, referenceFunctions))
+
+    relocs: list[tuple] = list()
+    for offset, relocSym in context.relocSymbols[common.FileSectionType.Text].items():
+        relocs.append((offset, relocSym.name, relocSym.relocType, relocSym.addend))
+
+    return symbols, relocs
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("shardCount", (1, 2, 3, 5))
+def test_sharded_analysis_matches_sequential(seed: int, shardCount: int):
+    files = makeFiles(seed, 8)
+
+    sequential = makeBaseContext()
+    for operations in files:
+        analyzeFile(sequential, operations)
+
+    shards: list[common.Context] = list()
+    chunkSize = (len(files) + shardCount - 1) // shardCount
+    for start in range(0, len(files), chunkSize):
+        shard = makeBaseContext()
+        for operations in files[start:start + chunkSize]:
+            analyzeFile(shard, operations)
+        shards.append(shard)
+
+    base = makeBaseContext()
+    merged = makeBaseContext()
+    for shard in shards:
+        merged.merge(shard, base)
+
+    assert summarizeContext(merged) == summarizeContext(sequential)
+
+
+def test_merge_fills_unknown_reloc_fields():
+    context = common.Context()
+    relocSym = common.ContextRelocSymbol(0x10, "sym", common.FileSectionType.Text)
+    context.relocSymbols[common.FileSectionType.Text][0x10] = relocSym
+
+    other = common.Context()
+    otherReloc = common.ContextRelocSymbol(0x10, "sym", common.FileSectionType.Text)
+    otherReloc.relocType = 5
+    otherReloc.addend = 0x20
+    other.relocSymbols[common.FileSectionType.Text][0x10] = otherReloc
+
+    context.merge(other)
+
+    assert relocSym.relocType == 5
+    assert relocSym.addend == 0x20
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import pytest
+
+from spimdisasm import common
+from spimdisasm import mips
+
+
+DATA_VRAM = 0x80000100
+TEXT_VRAM = 0x80000400
+
+NOP = 0x00000000
+JR_RA = 0x03E00008
+ADDIU_V0 = 0x24420001 # addiu $v0, $v0, 1
+
+
+def hiLo(address: int) -> tuple[int, int]:
+    return ((address + 0x8000) >> 16) & 0xFFFF, address & 0xFFFF
+
+def makeFunction(body: list[int]) -> list[int]:
+    return [0x27BDFFE8, 0xAFBF0014] + body + [0x8FBF0014, JR_RA, 0x27BD0018]
+
+
+def toBytes(words: list[int]) -> bytearray:
+    array_of_bytes = bytearray()
+    for word in words:
+        array_of_bytes += word.to_bytes(4, "big")
+    return array_of_bytes
+
+def makeSections() -> tuple[mips.sections.SectionText, mips.sections.SectionData, int]:
+    """Returns a text section with 3 functions and a data section which contains a pointer to the middle of the second function.
+
+    The second function references the data section, so the text is analyzed before the data discovers that pointer"""
+    hi, lo = hiLo(DATA_VRAM + 8)
+    firstFunction = makeFunction([0x3C010000 | hiLo(DATA_VRAM)[0], 0x8C220000 | hiLo(DATA_VRAM)[1]])
+    secondFunction = makeFunction([0x3C080000 | hi, 0x25080000 | lo, ADDIU_V0, ADDIU_V0])
+    thirdFunction = makeFunction([ADDIU_V0])
+    textWords = firstFunction + secondFunction + thirdFunction
+    pointer = TEXT_VRAM + (len(firstFunction) + 3) * 4
+    dataWords = [pointer, 0, DATA_VRAM + 4, 0, 0, 0, 0, 0]
+
+    context = common.Context()
+    context.globalSegment.changeRanges(0, 0x1000, 0x80000000, 0x80010000)
+    array_of_bytes = toBytes(textWords + dataWords)
+    textSize = len(textWords) * 4
+    text = mips.sections.SectionText(context, 0, textSize, TEXT_VRAM, "text", array_of_bytes, 0, None)
+    data = mips.sections.SectionData(context, textSize, len(array_of_bytes), DATA_VRAM, "data", array_of_bytes, 0, None)
+    return text, data, pointer
+
+def render(sectionsList: list[mips.sections.SectionBase]) -> list[str]:
+    for section in sectionsList:
+        section.defineLabels()
+    return [section.render() for section in sectionsList]
+
+
+@pytest.fixture
+def analyzedElements(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, int]]:
+    "Class name and vram of each element analyzed after the fixture was requested"
+    analyzed: list[tuple[str, int]] = list()
+    for cls in (mips.sections.SectionText, mips.sections.SectionData, mips.symbols.SymbolFunction, mips.symbols.SymbolData):
+        def countedAnalyze(self, analyze=cls.analyze, name=cls.__name__):
+            analyzed.append((name, self.vram))
+            return analyze(self)
+        monkeypatch.setattr(cls, "analyze", countedAnalyze)
+    return analyzed
+
+
+def test_pointer_into_analyzed_function(analyzedElements: list[tuple[str, int]]):
+    text, data, pointer = makeSections()
+    sectionsList: list[mips.sections.SectionBase] = [text, data]
+    for section in sectionsList:
+        section.analyze()
+        section.saveAnalysisDependencies()
+    secondFunction = text.symbolList[1]
+    assert secondFunction.vram < pointer < secondFunction.vramEnd
+    assert text.getSymbol(pointer, tryPlusOffset=False) is None
+
+    analyzedElements.clear()
+    assert mips.FilesHandlers.reanalyzeDependents(sectionsList) == 1
+    assert analyzedElements == [("SymbolFunction", secondFunction.vram)]
+
+    label = text.getSymbol(pointer, tryPlusOffset=False)
+    assert label is not None
+    incrementalOutput = render(sectionsList)
+    assert f"glabel {label.getName()}\n" in incrementalOutput[0]
+    assert f".word {label.getName()}\n" in incrementalOutput[1]
+
+    # Nothing is left to be analyzed again
+    assert mips.FilesHandlers.reanalyzeDependents(sectionsList) == 0
+
+    # A second full run sees every pointer from the start
+    for section in sectionsList:
+        section.resetAnalysis()
+        section.analyze()
+    assert render(sectionsList) == incrementalOutput
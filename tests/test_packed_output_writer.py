@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import zipfile
+
+import pytest
+
+from spimdisasm import common
+
+
+def test_roundtrip(tmp_path: Path):
+    containerPath = tmp_path / "functions.zip"
+    rootPath = tmp_path / "functions"
+    with common.PackedOutputWriter(containerPath, rootPath, writeIfChanged=False) as writer:
+        writer.write(rootPath / "text" / "func_80000000.s", "glabel func_80000000\n")
+        writer.write(rootPath / "text" / "func_80000010.s", "glabel func_80000010\n")
+    assert writer.packedFilesCount == 2
+    assert writer.writtenFilesCount == 1
+
+    assert common.PackedOutputWriter.listPackedFiles(containerPath) == ["text/func_80000000.s", "text/func_80000010.s"]
+    assert common.PackedOutputWriter.readPackedFile(containerPath, "text/func_80000010.s") == "glabel func_80000010\n"
+
+    outputPath = tmp_path / "extracted"
+    common.PackedOutputWriter.extractPacked(containerPath, outputPath)
+    assert (outputPath / "text" / "func_80000000.s").read_text() == "glabel func_80000000\n"
+
+
+def test_path_outside_root(tmp_path: Path):
+    with common.PackedOutputWriter(tmp_path / "functions.zip", tmp_path / "functions", writeIfChanged=False) as writer:
+        with pytest.raises(ValueError):
+            writer.write(tmp_path / "other" / "func_80000000.s", "")
+
+
+def test_manifest_and_write_if_changed(tmp_path: Path):
+    containerPath = tmp_path / "functions.zip"
+    rootPath = tmp_path / "functions"
+    manifestPath = tmp_path / "manifest.json"
+
+    writtenFilesCounts = []
+    for _ in range(2):
+        with common.PackedOutputWriter(containerPath, rootPath, writeIfChanged=True, manifestPath=manifestPath) as writer:
+            writer.write(rootPath / "func_80000000.s", "glabel func_80000000\n")
+        writtenFilesCounts.append(writer.writtenFilesCount)
+    assert writtenFilesCounts == [1, 0]
+
+    manifest = json.loads(manifestPath.read_text())
+    assert list(manifest.keys()) == [str(containerPath)]
+    assert manifest[str(containerPath)]["size"] == containerPath.stat().st_size
+
+
+@pytest.mark.parametrize("packedPath", ["../escaped.s", "text/../../escaped.s"])
+def test_extract_outside_output(tmp_path: Path, packedPath: str):
+    containerPath = tmp_path / "malicious.zip"
+    with zipfile.ZipFile(containerPath, "w") as zipFile:
+        zipFile.writestr("text/func_80000000.s", "")
+        zipFile.writestr(packedPath, "")
+
+    outputPath = tmp_path / "extracted"
+    with pytest.raises(ValueError):
+        common.PackedOutputWriter.extractPacked(containerPath, outputPath)
+    assert not (tmp_path / "escaped.s").exists()
+    assert not (outputPath / "text" / "func_80000000.s").exists()
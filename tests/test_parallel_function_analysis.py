@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+from pathlib import Path
+import random
+
+import pytest
+
+from spimdisasm import common
+from spimdisasm import mips
+
+
+VRAM = 0x80000400
+DATA_VRAM = 0x80100000
+
+NOP = 0x00000000
+JR_RA = 0x03E00008
+SW_RA = 0xAFBF0014
+LW_RA = 0x8FBF0014
+ADDIU_SP_NEG = 0x27BDFFE8 # addiu $sp, $sp, -0x18
+ADDIU_SP_POS = 0x27BD0018 # addiu $sp, $sp, 0x18
+
+
+def hiLo(address: int) -> tuple[int, int]:
+    return ((address + 0x8000) >> 16) & 0xFFFF, address & 0xFFFF
+
+def jal(target: int) -> int:
+    return 0x0C000000 | ((target >> 2) & 0x03FFFFFF)
+
+
+def makeFunctions(seed: int, count: int) -> list[int]:
+    """Generates the words of `count` functions which load, store and take the address of data symbols (some of them shared between functions),
+    call each other, branch and use jump tables"""
+    rng = random.Random(seed)
+    dataAddresses = [DATA_VRAM + rng.randrange(0x1000) * 4 for _ in range(count // 2)]
+
+    words: list[int] = list()
+    starts: list[int] = list()
+    calls: list[int] = list()
+    for _ in range(count):
+        starts.append(len(words))
+        body: list[int] = list()
+        for _ in range(rng.randrange(2, 12)):
+            kind = rng.randrange(6)
+            hi, lo = hiLo(rng.choice(dataAddresses) + rng.choice((0, 0, 4, 8)))
+            if kind == 0:
+                body += [0x3C010000 | hi, 0x8C220000 | lo] # lui $at, %hi(sym); lw $v0, %lo(sym)($at)
+            elif kind == 1:
+                body += [0x3C080000 | hi, 0x25080000 | lo] # lui $t0, %hi(sym); addiu $t0, $t0, %lo(sym)
+            elif kind == 2:
+                body += [0x3C080000 | hi, 0xAD020000 | lo] # lui $t0, %hi(sym); sw $v0, %lo(sym)($t0)
+            elif kind == 3:
+                calls.append(len(words) + 2 + len(body))
+                body += [jal(0), NOP]
+            elif kind == 4 and len(body) > 0:
+                body += [0x14400000 | ((-len(body) - 1) & 0xFFFF), NOP] # bnez $v0, start of the body
+            else:
+                tableHi, tableLo = hiLo(DATA_VRAM + 0x8000 + len(words) * 4)
+                body += [
+                    0x00047080, # sll $t6, $a0, 2
+                    0x3C010000 | tableHi, # lui $at, %hi(jtbl)
+                    0x002E0821, # addu $at, $at, $t6
+                    0x8C2E0000 | tableLo, # lw $t6, %lo(jtbl)($at)
+                    0x01C00008, # jr $t6
+                    NOP,
+                ]
+        words += [ADDIU_SP_NEG, SW_RA] + body + [LW_RA, JR_RA, ADDIU_SP_POS]
+
+    for index in calls:
+        words[index] = jal(VRAM + rng.choice(starts) * 4)
+    return words
+
+
+def analyzeSection(words: list[int], jobs: int, contextPath: Path, relocs: bool=False) -> tuple[list[tuple[int, int]], str, str]:
+    "Returns the functions found, the saved context and the rendered section"
+    context = common.Context()
+    size = len(words) * 4
+    context.globalSegment.changeRanges(0, size, VRAM, DATA_VRAM + 0x10000)
+    if relocs:
+        context.relocSymbols[common.FileSectionType.Text][0] = common.ContextRelocSymbol(0, ".data", common.FileSectionType.Text)
+
+    array_of_bytes = bytearray()
+    for word in words:
+        array_of_bytes += word.to_bytes(4, "big")
+
+    section = mips.sections.SectionText(context, 0, size, VRAM, "test", array_of_bytes, 0, None)
+    section.jobs = jobs
+    section.analyze()
+    section.defineLabels()
+
+    context.saveContextToFile(contextPath)
+    functions = [(func.vram, func.sizew) for func in section.symbolList]
+    return functions, contextPath.read_text(), section.render()
+
+
+@pytest.fixture
+def appliedResults(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    "Vram of each function whose analysis came from a worker process"
+    applied: list[int] = list()
+    applyAnalysisResult = mips.symbols.SymbolFunction.applyAnalysisResult
+    def countedApplyAnalysisResult(self, *args, **kwargs):
+        applied.append(self.vram)
+        return applyAnalysisResult(self, *args, **kwargs)
+    monkeypatch.setattr(mips.symbols.SymbolFunction, "applyAnalysisResult", countedApplyAnalysisResult)
+    return applied
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_parallel_analysis_matches_sequential(seed: int, tmp_path: Path, appliedResults: list[int]):
+    words = makeFunctions(seed, 60)
+
+    sequential = analyzeSection(words, 1, tmp_path / "sequential.csv")
+    assert appliedResults == []
+    parallel = analyzeSection(words, 4, tmp_path / "parallel.csv")
+
+    assert len(sequential[0]) == 60
+    assert appliedResults == [vram for vram, _ in parallel[0]]
+    assert parallel[0] == sequential[0]
+    assert parallel[1] == sequential[1]
+    assert parallel[2] == sequential[2]
+
+
+def test_relocations_fall_back_to_sequential(tmp_path: Path, appliedResults: list[int]):
+    words = makeFunctions(0, 20)
+
+    sequential = analyzeSection(words, 1, tmp_path / "sequential.csv", relocs=True)
+    parallel = analyzeSection(words, 4, tmp_path / "parallel.csv", relocs=True)
+
+    assert appliedResults == []
+    assert parallel == sequential
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from spimdisasm import common
+from spimdisasm import mips
+
+
+VRAM = 0x80000400
+
+WORDS = [
+    0x27BDFFE8, # addiu $sp, $sp, -0x18
+    0xAFBF0014, # sw    $ra, 0x14($sp)
+    0x10400002, # beqz  $v0, .L80000414
+    0x00000000, # nop
+    0x24420001, # addiu $v0, $v0, 1
+    0x8FBF0014, # lw    $ra, 0x14($sp)
+    0x03E00008, # jr    $ra
+    0x27BD0018, # addiu $sp, $sp, 0x18
+]
+
+
+def makeBytes() -> bytearray:
+    array_of_bytes = bytearray()
+    for word in WORDS:
+        array_of_bytes += word.to_bytes(4, "big")
+    return array_of_bytes
+
+def makeContext() -> common.Context:
+    context = common.Context()
+    context.globalSegment.changeRanges(0, 0x1000, VRAM, VRAM + 0x1000)
+    return context
+
+
+def test_save_without_define_labels(tmp_path: Path):
+    "Analyzing and saving a section, like the `__main__` example does, defines its labels when disassembling"
+    array_of_bytes = makeBytes()
+    outputs: list[str] = list()
+    for defineLabels in (False, True):
+        section = mips.sections.SectionText(makeContext(), 0, len(array_of_bytes), VRAM, "test", array_of_bytes, 0, None)
+        section.analyze()
+        if defineLabels:
+            section.defineLabels()
+        section.saveToFile(str(tmp_path / f"defined_{defineLabels}"))
+        outputs.append((tmp_path / f"defined_{defineLabels}.text.s").read_text())
+
+    assert ".L80000414:\n" in outputs[0]
+    assert outputs[0] == outputs[1]
+
+
+def test_split_rendered_contents(tmp_path: Path):
+    array_of_bytes = makeBytes()
+    context = makeContext()
+    splits = mips.FileSplits(context, 0, len(array_of_bytes), VRAM, "test", array_of_bytes, 0, None)
+    splits.analyze()
+    splits.defineLabels()
+    (section,) = splits.sectionsDict[common.FileSectionType.Text].values()
+
+    splits.saveToFile(str(tmp_path / "test"), renderedContents=section.render())
+    assert (tmp_path / "test test.text.s").read_text() == section.render()
+
+    dataSection = mips.sections.SectionData(context, 0, len(array_of_bytes), VRAM + 0x100, "test", array_of_bytes, 0, None)
+    splits.sectionsDict[common.FileSectionType.Data]["test"] = dataSection
+    with pytest.raises(ValueError):
+        splits.saveToFile(str(tmp_path / "multiple"), renderedContents=section.render())
+    assert not (tmp_path / "multiple test.text.s").exists()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import pytest
+
+from spimdisasm import common
+from spimdisasm import mips
+
+
+DATA_VRAM = 0x80100000
+
+
+@pytest.fixture
+def function(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(common.GlobalConfig, "PRODUCE_SYMBOLS_PLUS_OFFSET", True)
+    context = common.Context()
+    context.globalSegment.changeRanges(0, 0x1000000, 0x80000000, 0x81000000)
+    func = mips.symbols.SymbolFunction(context, 0, 0, 0, 0x80000000, [], 0, None)
+
+    lookups: list[int] = []
+    getSymbol = func.getSymbol
+    def countedGetSymbol(vramAddress: int, *args, **kwargs):
+        lookups.append(vramAddress)
+        return getSymbol(vramAddress, *args, **kwargs)
+    monkeypatch.setattr(func, "getSymbol", countedGetSymbol)
+    return func, lookups
+
+
+def test_repeated_lookups(function):
+    func, lookups = function
+    sym = func.context.globalSegment.addSymbol(DATA_VRAM)
+    sym.size = 0x10
+
+    assert func._getSymbolCached(DATA_VRAM + 4) is sym
+    assert func._getSymbolCached(DATA_VRAM + 4) is sym
+    assert lookups == [DATA_VRAM + 4]
+
+
+def test_unrelated_symbols_keep_the_cache(function):
+    func, lookups = function
+    segment = func.context.globalSegment
+    sym = segment.addSymbol(DATA_VRAM)
+    sym.size = 0x10
+    segment.addSymbol(DATA_VRAM + 0x20)
+
+    assert func._getSymbolCached(DATA_VRAM + 4) is sym
+    # Before the cached address, and after the next symbol
+    segment.addSymbol(DATA_VRAM - 0x10)
+    segment.addSymbol(DATA_VRAM + 0x30)
+    # Only the special type changes, not the size
+    segment.addFunction(DATA_VRAM)
+    assert func._getSymbolCached(DATA_VRAM + 4) is sym
+    assert lookups == [DATA_VRAM + 4]
+
+
+def test_symbols_covering_the_address_discard_it(function):
+    func, lookups = function
+    segment = func.context.globalSegment
+    sym = segment.addSymbol(DATA_VRAM)
+    sym.size = 0x10
+
+    assert func._getSymbolCached(DATA_VRAM + 8) is sym
+    newSym = segment.addSymbol(DATA_VRAM + 4)
+    newSym.size = 4
+    assert func._getSymbolCached(DATA_VRAM + 8) is None
+
+    newSym.size = 8
+    func.context.symbolsChanged(newSym.address)
+    assert func._getSymbolCached(DATA_VRAM + 8) is newSym
+    assert lookups == [DATA_VRAM + 8] * 3
+
+
+def test_missing_symbols_are_found_once_added(function):
+    func, lookups = function
+    assert func._getSymbolCached(DATA_VRAM, tryPlusOffset=False) is None
+
+    sym = func.context.globalSegment.addSymbol(DATA_VRAM)
+    assert func._getSymbolCached(DATA_VRAM, tryPlusOffset=False) is sym
+
+    func.context.globalSegment.changeRanges(0, 0x1000000, 0x80000000, 0x81000000)
+    assert func._getSymbolCached(DATA_VRAM, tryPlusOffset=False) is sym
+    assert lookups == [DATA_VRAM] * 3